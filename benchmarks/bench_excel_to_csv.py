@@ -0,0 +1,79 @@
+"""
+Benchmark of the extraction engines of excel_to_csv.
+
+A synthetic ledger workbook (see ledger_generator) is generated in a temporary folder and converted to CSV with
+every engine. The script reports the throughput of each engine, the speedup of the native XML engine over
+openpyxl, and checks that both engines produce the same CSV.
+
+### Usage:
+   ```bash
+   python .\\benchmarks\\bench_excel_to_csv.py --rows 200000
+"""
+
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from benchmarks.ledger_generator import generate_ledger_workbook
+from common.utilities.logger import SingletonLogger
+from common.xlsx.large_xlsx_splitter_utils import (
+    EXTRACT_ENGINE_OPENPYXL,
+    EXTRACT_ENGINE_XML,
+    excel_to_csv,
+)
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+
+def time_engine(input_xlsx: str, output_csv: str, engine: str, repeat: int) -> float:
+    """Returns the best time in seconds of excel_to_csv with the given engine."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        excel_to_csv(input_xlsx, output_csv, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the excel_to_csv engines.")
+    parser.add_argument("--rows", type=int, default=100000, help="Number of data rows.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (best is kept).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_xlsx = os.path.join(tmp_dir, "bench.xlsx")
+        logger.info("Generating a workbook with %d rows...", args.rows)
+        generate_ledger_workbook(input_xlsx, args.rows)
+
+        timings = {}
+        for engine in (EXTRACT_ENGINE_OPENPYXL, EXTRACT_ENGINE_XML):
+            output_csv = os.path.join(tmp_dir, f"{engine}.csv")
+            timings[engine] = time_engine(input_xlsx, output_csv, engine, args.repeat)
+            logger.info(
+                "%s: %.2f s, %s rows/s", engine, timings[engine], f"{args.rows / timings[engine]:,.0f}"
+            )
+
+        same_output = filecmp.cmp(
+            os.path.join(tmp_dir, f"{EXTRACT_ENGINE_OPENPYXL}.csv"),
+            os.path.join(tmp_dir, f"{EXTRACT_ENGINE_XML}.csv"),
+            shallow=False,
+        )
+        logger.info(
+            "Speedup of %s over %s: %.1fx (identical output: %s)",
+            EXTRACT_ENGINE_XML,
+            EXTRACT_ENGINE_OPENPYXL,
+            timings[EXTRACT_ENGINE_OPENPYXL] / timings[EXTRACT_ENGINE_XML],
+            same_output,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the cost of the merged ranges of the data table against the number of rows.
+
+For every row count, a sheet with styled data rows is built and the merge of the model row spans is timed with
+the row by row sheet.merge_cells() calls and with merge_row_spans(). The script reports the time per row of both
+methods: it grows with the table for merge_cells() and stays constant for merge_row_spans().
+
+### Usage:
+   ```bash
+   python .\\benchmarks\\bench_merge_cells.py --rows 1000 5000 20000 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+
+from openpyxl import Workbook
+from openpyxl.styles import Border, Side
+from openpyxl.worksheet.worksheet import Worksheet
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import SingletonLogger
+from common.xlsx.large_xlsx_splitter_utils import merge_row_spans
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+ROW_MERGE_SPANS: List[Tuple[int, int]] = [(3, 4), (7, 9)]
+MAX_COLUMN = 14
+
+
+def build_sheet(rows: int) -> Worksheet:
+    """Returns a sheet with the given number of data rows, with values and alternating borders."""
+    sheet = Workbook().active
+    borders = [
+        Border(bottom=Side(border_style="thin")),
+        Border(left=Side(border_style="thin"), right=Side(border_style="thin")),
+    ]
+    for row_index in range(1, rows + 1):
+        for col_index in range(1, MAX_COLUMN + 1):
+            cell = sheet.cell(row=row_index, column=col_index, value=row_index)
+            cell.border = borders[row_index % 2]
+    return sheet
+
+
+def merge_row_by_row(sheet: Worksheet, rows: int) -> None:
+    for start_col, end_col in ROW_MERGE_SPANS:
+        for row_index in range(1, rows + 1):
+            sheet.merge_cells(
+                start_row=row_index,
+                start_column=start_col,
+                end_row=row_index,
+                end_column=end_col,
+            )
+
+
+def time_merge(rows: int, bulk: bool) -> float:
+    """Returns the time in seconds spent merging the spans of a sheet with the given number of rows."""
+    sheet = build_sheet(rows)
+    start = time.perf_counter()
+    if bulk:
+        merge_row_spans(sheet, ROW_MERGE_SPANS, 1, rows)
+    else:
+        merge_row_by_row(sheet, rows)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the merged ranges of the data table.")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 2000, 5000, 10000], help="Row counts to measure."
+    )
+    parser.add_argument(
+        "--max_legacy_rows",
+        type=int,
+        default=20000,
+        help="Largest row count measured with merge_cells() (its cost is quadratic).",
+    )
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        bulk = time_merge(rows, bulk=True)
+        message = f"{rows} rows: merge_row_spans {bulk * 1e6 / rows:.1f} us/row"
+        if rows <= args.max_legacy_rows:
+            legacy = time_merge(rows, bulk=False)
+            message += (
+                f", merge_cells {legacy * 1e6 / rows:.1f} us/row ({legacy / bulk:.1f}x slower)"
+            )
+        logger.info(message)
+
+
+if __name__ == "__main__":
+    main()
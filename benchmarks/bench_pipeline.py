@@ -0,0 +1,239 @@
+"""
+Benchmark of the stages of the splitter pipeline on synthetic ledgers.
+
+For every row count, a ledger workbook and a model workbook are generated (see ledger_generator) and the stages
+excel_to_csv, process_csv and split_csv_to_excel are run one after the other, then the whole pipeline is run
+end to end. Every measurement runs in a new process, which reports its time and its peak resident memory (and,
+with --tracemalloc, the peak of the memory allocated by Python, at the cost of a slower run).
+
+The results can be saved as a baseline JSON file, and compared with a baseline: a metric larger than the
+baseline by more than the tolerance is reported as a regression.
+
+### Usage:
+   ```bash
+   python .\\benchmarks\\bench_pipeline.py --rows 10000 100000 2000000 --save_baseline baseline.json
+   python .\\benchmarks\\bench_pipeline.py --rows 10000 100000 2000000 --baseline baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from benchmarks.ledger_generator import (
+    HEADER_ROWS,
+    ROW_REF_EVEN,
+    ROW_REF_ODD,
+    generate_ledger_workbook,
+    generate_model_workbook,
+)
+from common.utilities.logger import SingletonLogger
+from common.utilities.metrics import peak_rss_mb
+from common.xlsx.large_xlsx_splitter_utils import (
+    EXTRACT_ENGINE_XML,
+    OUTPUT_ENGINE_WRITE_ONLY,
+    excel_to_csv,
+    process_csv,
+    split_csv_to_excel,
+)
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+STAGES = ["excel_to_csv", "process_csv", "split_csv_to_excel", "end_to_end"]
+METRICS = ["seconds", "peak_rss_mb", "peak_traced_mb"]
+
+
+def _run_stage(stage: str, paths: Dict[str, str], options: Dict) -> None:
+    if stage in ("excel_to_csv", "end_to_end"):
+        excel_to_csv(paths["input_xlsx"], paths["csv"], engine=options["extract_engine"])
+    if stage in ("process_csv", "end_to_end"):
+        process_csv(paths["csv"], paths["processed_csv"], header_lines=HEADER_ROWS)
+    if stage in ("split_csv_to_excel", "end_to_end"):
+        os.makedirs(paths["output_folder"], exist_ok=True)
+        split_csv_to_excel(
+            model_xlsx_path=paths["model_xlsx"],
+            source_csv_file=paths["processed_csv"],
+            output_folder=paths["output_folder"],
+            product_name="bench",
+            N=options["parts"],
+            table_start_row=HEADER_ROWS + 1,
+            header_rows=HEADER_ROWS,
+            row_ref_odd=ROW_REF_ODD,
+            row_ref_even=ROW_REF_EVEN,
+            workers=options["workers"],
+            engine=options["output_engine"],
+            pipeline_depth=options["pipeline_depth"],
+            compression_level=options["compression_level"],
+        )
+
+
+def _measure_stage(stage: str, paths: Dict[str, str], options: Dict) -> Dict:
+    """Runs a stage in the current (new) process and returns its metrics."""
+    if options["tracemalloc"]:
+        tracemalloc.start()
+    start = time.perf_counter()
+    _run_stage(stage, paths, options)
+    seconds = time.perf_counter() - start
+    peak_traced_mb = None
+    if options["tracemalloc"]:
+        peak_traced_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_traced_mb": peak_traced_mb,
+    }
+
+
+def measure_in_new_process(stage: str, paths: Dict[str, str], options: Dict) -> Dict:
+    """Runs a stage in a new process, so that its peak memory is not mixed with the previous stages."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_measure_stage, stage, paths, options).result()
+
+
+def bench_rows(rows: int, work_dir: str, options: Dict) -> Dict[str, Dict]:
+    """Generates the workbooks for the given row count (unless already generated) and measures every stage."""
+    model_xlsx = os.path.join(work_dir, "model.xlsx")
+    if not os.path.exists(model_xlsx):
+        generate_model_workbook(model_xlsx)
+    input_xlsx = os.path.join(work_dir, f"ledger_{rows}.xlsx")
+    if not os.path.exists(input_xlsx):
+        logger.info("Generating a ledger with %d rows...", rows)
+        generate_ledger_workbook(input_xlsx, rows, seed=options["seed"])
+
+    paths = {
+        "model_xlsx": model_xlsx,
+        "input_xlsx": input_xlsx,
+        "csv": os.path.join(work_dir, f"ledger_{rows}.csv"),
+        "processed_csv": os.path.join(work_dir, f"ledger_{rows}_proc.csv"),
+        "output_folder": os.path.join(work_dir, f"output_{rows}"),
+    }
+    results = {}
+    for stage in STAGES:
+        results[stage] = measure_in_new_process(stage, paths, options)
+        logger.info("%d rows, %s: %s", rows, stage, format_metrics(results[stage]))
+    return results
+
+
+def format_metrics(metrics: Dict) -> str:
+    text = f"{metrics['seconds']:.2f} s"
+    if metrics.get("peak_rss_mb") is not None:
+        text += f", peak RSS {metrics['peak_rss_mb']:.0f} MB"
+    if metrics.get("peak_traced_mb") is not None:
+        text += f", peak traced {metrics['peak_traced_mb']:.0f} MB"
+    return text
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compares the results with a baseline and returns the regressions, the metrics larger than the baseline by
+    more than the tolerance. Row counts, stages and metrics missing from either side are not compared.
+    """
+    regressions = []
+    for rows, stages in results.items():
+        for stage, metrics in stages.items():
+            baseline_metrics = baseline.get(rows, {}).get(stage, {})
+            for metric in METRICS:
+                current, previous = metrics.get(metric), baseline_metrics.get(metric)
+                if current is None or not previous:
+                    continue
+                ratio = current / previous
+                logger.info("%d rows, %s, %s: %.2f (%.2fx baseline)", rows, stage, metric, current, ratio)
+                if ratio > 1 + tolerance:
+                    regressions.append(f"{rows} rows, {stage}, {metric}: {ratio:.2f}x baseline")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the stages of the splitter pipeline.")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000], help="Row counts of the generated ledgers."
+    )
+    parser.add_argument("--parts", type=int, default=4, help="Number of output files of the split.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes of the split.")
+    parser.add_argument("--extract_engine", default=EXTRACT_ENGINE_XML, help="Engine of excel_to_csv.")
+    parser.add_argument("--output_engine", default=OUTPUT_ENGINE_WRITE_ONLY, help="Output engine of the split.")
+    parser.add_argument(
+        "--pipeline_depth", type=int, default=0, help="Pipeline depth of the split (0: no pipeline)."
+    )
+    parser.add_argument(
+        "--compression_level",
+        type=int,
+        default=None,
+        help="Zip compression level of the output files (0: stored, 1-9: deflate, default: openpyxl default).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the ledger generator.")
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="Also measure the peak memory allocated by Python (slower)."
+    )
+    parser.add_argument(
+        "--work_dir", default=None, help="Folder of the generated files, kept between runs (default: temporary)."
+    )
+    parser.add_argument("--baseline", default=None, help="Baseline JSON file to compare the results with.")
+    parser.add_argument("--save_baseline", default=None, help="Saves the results as a baseline JSON file.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="Relative increase over the baseline reported as a regression."
+    )
+    args = parser.parse_args()
+
+    options = {
+        "parts": args.parts,
+        "workers": args.workers,
+        "extract_engine": args.extract_engine,
+        "output_engine": args.output_engine,
+        "pipeline_depth": args.pipeline_depth,
+        "compression_level": args.compression_level,
+        "seed": args.seed,
+        "tracemalloc": args.tracemalloc,
+    }
+
+    def run(work_dir: str) -> Dict[str, Dict]:
+        return {str(rows): bench_rows(rows, work_dir, options) for rows in args.rows}
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        results = run(args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results = run(tmp_dir)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "environment": {"python": platform.python_version(), "platform": platform.platform()},
+                    "options": options,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        logger.info("Baseline saved: %s", args.save_baseline)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("options") != options:
+            logger.warning("The baseline was measured with different options.")
+        regressions = compare_with_baseline(results, baseline.get("results", {}), args.tolerance)
+        for regression in regressions:
+            logger.warning("Regression: %s", regression)
+        if regressions:
+            sys.exit(1)
+        logger.info("No regression over the baseline.")
+
+
+if __name__ == "__main__":
+    main()
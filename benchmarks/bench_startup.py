@@ -0,0 +1,169 @@
+"""
+Benchmark of the start-up time of the splitter command line.
+
+Every scenario is started in a new interpreter under `-X importtime`: the import times it reports are summed and
+compared with the budget of the scenario, and the modules it must not load (pandas is only needed by the processing
+stage, openpyxl and numpy only by the stages) are looked up in the imported modules. The script reports the import
+time, the wall time of the process and the slowest top-level imports of every scenario, and exits with status 1 if
+a scenario is over its budget or loads a module it must not load.
+
+Scenarios:
+- help: `main.py --help`.
+- csv_split: the modules loaded by a run splitting a ready CSV file (main, its stages, and the split module the
+  worker processes load).
+
+### Usage:
+   ```bash
+   python .\\benchmarks\\bench_startup.py
+   python .\\benchmarks\\bench_startup.py --help_budget 0.2 --csv_split_budget 0.5 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import SingletonLogger
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+MAIN_SCRIPT = os.path.join("service_xlsx_splitter", "main.py")
+
+# Modules imported when a run splits a ready CSV file (see main.run_job())
+CSV_SPLIT_IMPORTS = (
+    "import service_xlsx_splitter.main, service_xlsx_splitter.subroutines, "
+    "common.xlsx.large_xlsx_splitter_utils"
+)
+
+
+class Scenario(NamedTuple):
+    """
+    A start-up scenario.
+
+    Attributes:
+        name (str): Name of the scenario.
+        arguments (List[str]): Arguments of the interpreter after -X importtime.
+        budget_seconds (float): Largest accepted import time.
+        forbidden_modules (Tuple[str, ...]): Top-level packages the scenario must not import.
+    """
+
+    name: str
+    arguments: List[str]
+    budget_seconds: float
+    forbidden_modules: Tuple[str, ...]
+
+
+class StartupResult(NamedTuple):
+    import_seconds: float
+    wall_seconds: float
+    forbidden_imported: List[str]
+    slowest: List[Tuple[str, float]]  # Slowest top-level imports, with their cumulative time in seconds
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float], List[str]]:
+    """
+    Parses the -X importtime report of a process.
+
+    Returns:
+        Tuple[float, Dict[str, float], List[str]]: The total import time in seconds, the cumulative time of every
+        top-level import in seconds, and the names of all the imported modules.
+    """
+    total_us, top_level, modules = 0, {}, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        total_us += self_us
+        module = name.strip()
+        modules.append(module)
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level[module] = cumulative_us / 1e6
+    return total_us / 1e6, top_level, modules
+
+
+def measure_startup(scenario: Scenario, repeat: int, top: int) -> StartupResult:
+    """Starts the scenario repeat times and returns its best import and wall times."""
+    best_import, best_wall, report = float("inf"), float("inf"), ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime"] + scenario.arguments,
+            cwd=CWD,
+            capture_output=True,
+            text=True,
+        )
+        wall_seconds = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise RuntimeError(f"Scenario {scenario.name} failed:\n{completed.stderr[-2000:]}")
+        import_seconds, _, _ = parse_importtime(completed.stderr)
+        best_wall = min(best_wall, wall_seconds)
+        if import_seconds < best_import:
+            best_import, report = import_seconds, completed.stderr
+
+    _, top_level, modules = parse_importtime(report)
+    packages = {module.split(".")[0] for module in modules}
+    forbidden_packages = sorted(packages.intersection(scenario.forbidden_modules))
+    slowest = sorted(top_level.items(), key=lambda item: -item[1])[:top]
+    return StartupResult(best_import, best_wall, forbidden_packages, slowest)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Start-up time budget of the splitter command line.")
+    parser.add_argument(
+        "--help_budget", type=float, default=0.25, help="Import time budget of --help, in seconds."
+    )
+    parser.add_argument(
+        "--csv_split_budget",
+        type=float,
+        default=0.6,
+        help="Import time budget of a split of a ready CSV file, in seconds.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Starts per scenario (best is kept).")
+    parser.add_argument("--top", type=int, default=5, help="Slowest top-level imports reported.")
+    args = parser.parse_args()
+
+    scenarios = [
+        Scenario("help", [MAIN_SCRIPT, "--help"], args.help_budget, ("pandas", "numpy", "openpyxl")),
+        Scenario("csv_split", ["-c", CSV_SPLIT_IMPORTS], args.csv_split_budget, ("pandas",)),
+    ]
+
+    failures = []
+    for scenario in scenarios:
+        result = measure_startup(scenario, args.repeat, args.top)
+        logger.info(
+            "%s: imports %.3f s (budget %.3f s), process %.3f s",
+            scenario.name,
+            result.import_seconds,
+            scenario.budget_seconds,
+            result.wall_seconds,
+        )
+        for module, seconds in result.slowest:
+            logger.info("    %-45s %.3f s", module, seconds)
+        if result.import_seconds > scenario.budget_seconds:
+            failures.append(
+                f"{scenario.name}: imports take {result.import_seconds:.3f} s, "
+                f"over the budget of {scenario.budget_seconds:.3f} s"
+            )
+        if result.forbidden_imported:
+            failures.append(
+                f"{scenario.name}: imports {', '.join(result.forbidden_imported)}"
+            )
+
+    for failure in failures:
+        logger.error("Start-up budget exceeded: %s", failure)
+    if failures:
+        sys.exit(1)
+    logger.info("All the start-up scenarios are within their budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Generator of synthetic input and model workbooks shaped like the ledgers split by service_xlsx_splitter.
+
+The model workbook has a 12-row header with merged cells, the alternating style rows 13 and 14 with merged spans,
+and the style of the last row in row 45. The input workbook has the same 12-row header, the data rows ('N. riga',
+codes with leading zeros, dates, comma decimals, integers, text, 'N. doc.' series of 1 to 8 rows) and a footer
+row. The data is drawn from a seeded random generator, so the same arguments always give the same workbook.
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+HEADER_ROWS = 12
+MAX_COLUMN = 14
+ROW_REF_ODD = 13
+ROW_REF_EVEN = 14
+MODEL_LAST_ROW = 45
+
+# (start_col, end_col) of the merged spans of the data rows
+ROW_MERGE_SPANS = [(3, 4), (7, 9)]
+
+
+def generate_model_workbook(path: str) -> None:
+    """
+    Writes a model workbook with the header, the alternating data row styles and the last row style.
+
+    Args:
+        path (str): Path of the xlsx file to create.
+    """
+    wb = Workbook()
+    sheet = wb.active
+    thin = Side(border_style="thin", color="A0A0A0")
+
+    for row_index in range(1, HEADER_ROWS + 1):
+        for col_index in range(1, MAX_COLUMN + 1):
+            value = f"Header {row_index}-{col_index}" if row_index in (1, 5, HEADER_ROWS) else None
+            cell = sheet.cell(row=row_index, column=col_index, value=value)
+            if row_index == HEADER_ROWS:
+                cell.font = Font(bold=True)
+                cell.fill = PatternFill("solid", fgColor="DDDDDD")
+                cell.border = Border(bottom=thin)
+    sheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
+    sheet.merge_cells(start_row=5, start_column=1, end_row=5, end_column=4)
+
+    for row_index, color, height in (
+        (ROW_REF_ODD, "FFFFFF", 18),
+        (ROW_REF_EVEN, "EEF3FF", 18),
+        (MODEL_LAST_ROW, "FFF2CC", 22),
+    ):
+        for col_index in range(1, MAX_COLUMN + 1):
+            cell = sheet.cell(row=row_index, column=col_index)
+            cell.fill = PatternFill("solid", fgColor=color)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal="left")
+            cell.number_format = "#,##0.00" if col_index == 5 else "General"
+        sheet.row_dimensions[row_index].height = height
+        if row_index != MODEL_LAST_ROW:
+            for start_col, end_col in ROW_MERGE_SPANS:
+                sheet.merge_cells(
+                    start_row=row_index,
+                    start_column=start_col,
+                    end_row=row_index,
+                    end_column=end_col,
+                )
+
+    for col_index in range(1, MAX_COLUMN + 1):
+        sheet.column_dimensions[get_column_letter(col_index)].width = 10 + col_index
+    wb.save(path)
+
+
+def generate_ledger_workbook(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes an input workbook with the header, the given number of data rows and a footer row.
+
+    Args:
+        path (str): Path of the xlsx file to create.
+        rows (int): Number of data rows.
+        seed (int): Seed of the random generator.
+    """
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    sheet = wb.create_sheet()
+    for row_index in range(1, HEADER_ROWS + 1):
+        sheet.append([f"Header {row_index}-{col_index}" for col_index in range(1, MAX_COLUMN + 1)])
+
+    start = datetime(2023, 1, 1)
+    doc_number = 0
+    group_left = 0
+    for row_index in range(rows):
+        if group_left == 0:
+            doc_number += 1
+            group_left = rng.randint(1, 8)
+        group_left -= 1
+        sheet.append(
+            [
+                f"R{row_index}",
+                f"{row_index + 1:08d}",
+                start + timedelta(days=row_index % 365),
+                None,
+                f"{rng.randint(0, 99999)},{rng.randint(0, 99):02d}",
+                rng.randint(1, 500),
+                "Description of the accounting entry",
+                f"{rng.randint(0, 9999):04d}",
+                None,
+                None,
+                "EUR",
+                f"DOC{doc_number:08d}",
+                None,
+                "end",
+            ]
+        )
+    sheet.append(["TOTAL"] + [None] * (MAX_COLUMN - 2) + ["end"])
+    wb.save(path)
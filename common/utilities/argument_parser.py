@@ -1,5 +1,7 @@
 import argparse
 
+from common.utilities.metrics import STAGES
+
 
 def parse_args():
     # Argument parser setup for command-line options
@@ -10,4 +12,36 @@ def parse_args():
     parser.add_argument(
         "--process_csv", action="store_true", help="Process CSV file before split"
     )
+    parser.add_argument(
+        "--direct_xlsx",
+        action="store_true",
+        help="Split the input Excel file directly, without the intermediate CSV file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes used to build the output files (overrides config.json)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every stage and output file, even if the run manifest says they are up to date",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Write the metrics of every stage to metrics.jsonl in the output folder",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and split every new or changed Excel file of the input folder",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=STAGES,
+        default=None,
+        help="Run the given stage under cProfile and write its statistics to the output folder",
+    )
     return parser.parse_args()
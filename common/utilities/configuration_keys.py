@@ -12,3 +12,21 @@ class ConfigKeys(Enum):
     HEADER_ROWS = "header_rows"
     ROW_REF_ODD = "row_ref_odd"
     ROW_REF_EVEN = "row_ref_even"
+    WORKERS = "workers"
+    OUTPUT_ENGINE = "output_engine"
+    EXTRACT_ENGINE = "extract_engine"
+    MANIFEST_HASH = "manifest_hash"
+    PARTITIONS = "partitions"
+    SPLIT_STRATEGY = "split_strategy"
+    SPLIT_TOLERANCE = "split_tolerance"
+    MAX_ROWS_PER_PART = "max_rows_per_part"
+    MAX_BYTES_PER_PART = "max_bytes_per_part"
+    PIPELINE_DEPTH = "pipeline_depth"
+    COMPRESSION_LEVEL = "compression_level"
+    BUNDLE_ARCHIVE = "bundle_archive"
+    INTERMEDIATE_FORMAT = "intermediate_format"
+    EXPORT_CSV = "export_csv"
+    JOBS = "jobs"
+    INPUT_GLOB = "input_glob"
+    WATCH_PATTERN = "watch_pattern"
+    WATCH_POLL_SECONDS = "watch_poll_seconds"
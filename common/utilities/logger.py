@@ -1,10 +1,75 @@
+import atexit
 import logging
+import multiprocessing
+import os
+import queue
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Tuple
+
 from colorlog import ColoredFormatter
 
+# Extra fields of a log call that is rate limited, e.g. logger.debug("Row %d", i, extra=RATE_LIMITED)
+RATE_LIMITED = {"rate_limited": True}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most one rate limited record with the same message template every interval seconds.
+    The next record let through reports how many records were dropped in the meantime.
+    Records logged without the RATE_LIMITED extra fields are never dropped.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        super().__init__()
+        self.interval = interval
+        self._last: Dict[Tuple[str, object], Tuple[float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "rate_limited", False):
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        last_time, dropped = self._last.get(key, (None, 0))
+        if last_time is not None and now - last_time < self.interval:
+            self._last[key] = (last_time, dropped + 1)
+            return False
+        self._last[key] = (now, 0)
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages dropped)"
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Queue handler that does not format the record in the logging thread: only the message is merged with its
+    arguments (and the exception rendered), the handlers of the listener apply their own formatters.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 class SingletonLogger:
+    """
+    Process-wide logger. The logging calls only put the records on a queue: a listener thread writes them to
+    the console and file handlers, so the log I/O never runs in the calling thread. Worker processes send their
+    records to the listener of the main process through a multiprocessing queue (see worker_queue() and
+    configure_worker()), so that their lines are written by a single writer and never interleaved.
+    """
+
     _instance = None
+    _handlers: List[logging.Handler] = []
+    _listeners: List[QueueListener] = []
+    _listeners_pid = None  # Process running the listener threads
+    _worker_queue = None
 
     @staticmethod
     def get_instance(
@@ -15,15 +80,55 @@ class SingletonLogger:
                 logger_name, log_to_console, log_file_path
             )
             SingletonLogger._instance.setLevel(logging.INFO)
+        elif log_file_path and not any(
+            isinstance(handler, logging.FileHandler)
+            and handler.baseFilename == os.path.abspath(log_file_path)
+            for handler in SingletonLogger._handlers
+        ):
+            SingletonLogger.add_handler(SingletonLogger._file_handler(log_file_path))
         return SingletonLogger._instance
 
+    @staticmethod
+    def _console_handler() -> logging.Handler:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)  # or DEBUG based on your needs
+
+        # Define the log format for console output
+        console_formatter = ColoredFormatter(
+            "%(log_color)s[%(asctime)s] [%(levelname)s] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            log_colors={
+                "DEBUG": "cyan",
+                "INFO": "green",
+                "WARNING": "yellow",
+                "ERROR": "red",
+                "CRITICAL": "bold_red",
+            },
+        )
+        console_handler.setFormatter(console_formatter)
+        return console_handler
+
+    @staticmethod
+    def _file_handler(log_file_path: str) -> logging.Handler:
+        file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
+        file_handler.setLevel(logging.INFO)
+
+        # Define the log format for file output
+        file_formatter = logging.Formatter(
+            "[%(asctime)s] [%(levelname)s] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+        file_handler.setFormatter(file_formatter)
+        return file_handler
+
     @staticmethod
     def get_logger(
         logger_name: str, log_to_console: bool = True, log_file_path: str = None
     ) -> logging.Logger:
         """
         Initializes and configures a logger with structured and optionally colored output.
-        The logger can log to the console or to a specified log file.
+        The logger can log to the console, to a specified log file, or both. The records are written by a
+        listener thread, the logger itself only puts them on a queue.
 
         Args:
             logger_name (str): The name of the logger.
@@ -36,40 +141,83 @@ class SingletonLogger:
         # Create a logger instance
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            return logger  # Already configured
 
-        # If logging to console is enabled, configure the console handler
+        handlers: List[logging.Handler] = []
         if log_to_console:
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setLevel(logging.INFO)  # or DEBUG based on your needs
-
-            # Define the log format for console output
-            console_formatter = ColoredFormatter(
-                "%(log_color)s[%(asctime)s] [%(levelname)s] - %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S",
-                log_colors={
-                    "DEBUG": "cyan",
-                    "INFO": "green",
-                    "WARNING": "yellow",
-                    "ERROR": "red",
-                    "CRITICAL": "bold_red",
-                },
-            )
-            console_handler.setFormatter(console_formatter)
-            if not logger.handlers:  # Prevent adding duplicate handlers
-                logger.addHandler(console_handler)
-
-        # If a log file path is provided, configure the file handler
+            handlers.append(SingletonLogger._console_handler())
         if log_file_path:
-            file_handler = logging.FileHandler(log_file_path)
-            file_handler.setLevel(logging.INFO)
-
-            # Define the log format for file output
-            file_formatter = logging.Formatter(
-                "[%(asctime)s] [%(levelname)s] - %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S",
-            )
-            file_handler.setFormatter(file_formatter)
-            if not logger.handlers:  # Prevent adding duplicate handlers
-                logger.addHandler(file_handler)
+            handlers.append(SingletonLogger._file_handler(log_file_path))
+        SingletonLogger._handlers = handlers
 
+        log_queue: queue.Queue = queue.Queue()
+        logger.addHandler(_LazyQueueHandler(log_queue))
+        logger.addFilter(RateLimitFilter())
+        SingletonLogger._start_listener(log_queue)
         return logger
+
+    @staticmethod
+    def _start_listener(log_queue) -> None:
+        listener = QueueListener(log_queue, *SingletonLogger._handlers, respect_handler_level=True)
+        listener.start()
+        if not SingletonLogger._listeners:
+            atexit.register(SingletonLogger.stop)
+        SingletonLogger._listeners.append(listener)
+        SingletonLogger._listeners_pid = os.getpid()
+
+    @staticmethod
+    def _restart_listeners() -> None:
+        """Restarts the listeners, so that they write to the current list of handlers."""
+        for listener in SingletonLogger._listeners:
+            listener.stop()
+            listener.handlers = tuple(SingletonLogger._handlers)
+            listener.start()
+
+    @staticmethod
+    def handlers() -> List[logging.Handler]:
+        """Returns the handlers the records are written to (console, files)."""
+        return list(SingletonLogger._handlers)
+
+    @staticmethod
+    def add_handler(handler: logging.Handler) -> None:
+        """Adds a handler the records are written to by the listener thread."""
+        SingletonLogger._handlers.append(handler)
+        SingletonLogger._restart_listeners()
+
+    @staticmethod
+    def worker_queue():
+        """
+        Returns the multiprocessing queue through which worker processes send their records to the handlers of
+        this process. The queue, and its listener thread, are created on the first call.
+        """
+        if SingletonLogger._worker_queue is None:
+            SingletonLogger._worker_queue = multiprocessing.Queue()
+            SingletonLogger._start_listener(SingletonLogger._worker_queue)
+        return SingletonLogger._worker_queue
+
+    @staticmethod
+    def configure_worker(log_queue) -> None:
+        """
+        Configures the logger of a worker process to send all its records to the given queue, obtained from
+        worker_queue() in the main process. Used as (part of) the initializer of the process pools.
+        """
+        logger = SingletonLogger._instance
+        if logger is None:
+            return
+        SingletonLogger.stop()
+        SingletonLogger._handlers = []
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(_LazyQueueHandler(log_queue))
+
+    @staticmethod
+    def stop() -> None:
+        """Writes the records still in the queues and stops the listener threads."""
+        # A forked process inherits the listeners without their threads: stopping them would put the stop
+        # sentinel on the queue shared with the parent, and stop its listener instead
+        if SingletonLogger._listeners_pid == os.getpid():
+            for listener in SingletonLogger._listeners:
+                listener.stop()
+        SingletonLogger._listeners = []
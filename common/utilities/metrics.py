@@ -0,0 +1,222 @@
+"""
+Instrumentation of the stages of a run.
+
+Every stage (CSV extraction, CSV processing, template load, for each output file the fill, styling and save, and
+in batch mode every job as a whole) is wrapped in measure_stage(), which records its wall time, CPU time, rows per
+second, the peak resident memory of the process and the size of its output files. When metrics are enabled, each
+measurement is emitted by the SingletonLogger as one JSON line, written only to the metrics file. A single stage can
+also be run under cProfile: its statistics accumulate over the occurrences of the stage and are dumped next to the
+metrics once, when the process exits, one file per process.
+
+The settings are module-level, and are passed to the worker processes of the split through configure_worker():
+their metrics records are written by the main process.
+"""
+
+import atexit
+import cProfile
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from multiprocessing import parent_process
+from multiprocessing import util as multiprocessing_util
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import SingletonLogger
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+METRICS_FILE_NAME = "metrics.jsonl"
+
+# Stages that can be measured and profiled
+STAGE_EXTRACT = "extract"
+STAGE_PROCESS = "process"
+STAGE_TEMPLATE_LOAD = "template_load"
+STAGE_FILL = "fill"
+STAGE_STYLE = "style"
+STAGE_SAVE = "save"
+STAGE_SPLIT = "split"
+STAGE_JOB = "job"
+STAGES = (
+    STAGE_EXTRACT,
+    STAGE_PROCESS,
+    STAGE_TEMPLATE_LOAD,
+    STAGE_FILL,
+    STAGE_STYLE,
+    STAGE_SAVE,
+    STAGE_SPLIT,
+    STAGE_JOB,
+)
+
+
+class MetricsSettings(NamedTuple):
+    """
+    Instrumentation settings of the run.
+
+    Attributes:
+        metrics_path (Optional[str]): Path of the JSON-lines metrics file, None to disable the metrics.
+        profile_stage (Optional[str]): Stage run under cProfile, if any.
+        profile_dir (Optional[str]): Folder of the cProfile statistics files.
+    """
+
+    metrics_path: Optional[str] = None
+    profile_stage: Optional[str] = None
+    profile_dir: Optional[str] = None
+
+
+_settings = MetricsSettings()
+_profilers: Dict[str, cProfile.Profile] = {}
+_profilers_pid: Optional[int] = None
+
+# The profiles are dumped before the log queue of a worker process is closed (exit priority 10)
+_PROFILE_EXIT_PRIORITY = 20
+
+
+class _MetricsRecordFilter(logging.Filter):
+    """Lets through only the metrics records (include=True), or all the other records (include=False)."""
+
+    def __init__(self, include: bool):
+        super().__init__()
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "metrics") == self.include
+
+
+class _JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.metrics, sort_keys=True)
+
+
+def configure(settings: MetricsSettings) -> None:
+    """
+    Applies the instrumentation settings in the main process: with a metrics path, a handler writing the
+    metrics records to it is added to the logger, and the metrics records are kept out of the other handlers.
+
+    Args:
+        settings (MetricsSettings): The instrumentation settings.
+    """
+    global _settings
+    _settings = settings
+    if settings.metrics_path is None:
+        return
+    handlers = SingletonLogger.handlers()
+    if any(isinstance(f, _MetricsRecordFilter) and f.include for h in handlers for f in h.filters):
+        return  # Already configured
+
+    for handler in handlers:
+        handler.addFilter(_MetricsRecordFilter(include=False))
+    metrics_handler = logging.FileHandler(settings.metrics_path, mode="a", encoding="utf-8")
+    metrics_handler.setLevel(logging.INFO)
+    metrics_handler.addFilter(_MetricsRecordFilter(include=True))
+    metrics_handler.setFormatter(_JsonLinesFormatter())
+    SingletonLogger.add_handler(metrics_handler)
+
+
+def configure_worker(settings: MetricsSettings, log_queue) -> None:
+    """
+    Initializer of the worker processes: applies the instrumentation settings and sends the log records, metrics
+    included, to the handlers of the main process through log_queue (see SingletonLogger.worker_queue()).
+
+    Args:
+        settings (MetricsSettings): The instrumentation settings of the main process.
+        log_queue: The multiprocessing queue of the log records.
+    """
+    global _settings
+    _settings = settings
+    SingletonLogger.configure_worker(log_queue)
+
+
+def current_settings() -> MetricsSettings:
+    """Returns the instrumentation settings of the current process, to be passed to the worker processes."""
+    return _settings
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Returns the peak resident memory of the current process in MB, or None if it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _output_bytes(output_paths: Iterable[str]) -> int:
+    return sum(os.path.getsize(path) for path in output_paths if os.path.exists(path))
+
+
+def _stage_profiler(stage: str) -> cProfile.Profile:
+    """
+    Returns the profiler of the stage in the current process. The profilers inherited from a parent process are
+    dropped, and the first profiler of a process registers the dump of the profiles at its exit.
+    """
+    global _profilers_pid
+    if _profilers_pid != os.getpid():
+        _profilers.clear()
+        _profilers_pid = os.getpid()
+        if parent_process() is None:
+            # Registered after the log listeners, so it runs before they are stopped
+            atexit.register(_dump_profiles)
+        else:
+            # Worker processes skip the atexit hooks, but run the exit finalizers of multiprocessing
+            multiprocessing_util.Finalize(None, _dump_profiles, exitpriority=_PROFILE_EXIT_PRIORITY)
+    return _profilers.setdefault(stage, cProfile.Profile())
+
+
+def _dump_profiles() -> None:
+    """Writes the statistics collected by the profilers of the current process, one file per stage."""
+    for stage, profiler in _profilers.items():
+        profile_path = os.path.join(_settings.profile_dir or CWD, f"{stage}_{os.getpid()}.prof")
+        profiler.dump_stats(profile_path)
+        logger.info("Profile of stage %s written to %s", stage, profile_path)
+
+
+@contextmanager
+def measure_stage(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Measures the stage run in the with block. The block can set "rows" (number of rows processed) and
+    "outputs" (paths of the files written) in the yielded record, the other fields are emitted as they are.
+
+    Args:
+        stage (str): Name of the stage.
+        **fields: Additional fields of the metrics record (e.g. the output file of a part).
+
+    Yields:
+        Dict[str, Any]: The metrics record of the stage.
+    """
+    record: Dict[str, Any] = {"stage": stage, **fields}
+    profiler = None
+    if stage == _settings.profile_stage:
+        profiler = _stage_profiler(stage)
+        profiler.enable()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        wall_seconds = time.perf_counter() - start_wall
+        cpu_seconds = time.process_time() - start_cpu
+        if profiler is not None:
+            profiler.disable()
+        if _settings.metrics_path is not None:
+            outputs = record.pop("outputs", [])
+            rows = record.get("rows")
+            record.update(
+                wall_seconds=round(wall_seconds, 6),
+                cpu_seconds=round(cpu_seconds, 6),
+                rows_per_second=round(rows / wall_seconds, 1) if rows and wall_seconds else None,
+                peak_rss_mb=peak_rss_mb(),
+                output_bytes=_output_bytes(outputs),
+                pid=os.getpid(),
+            )
+            logger.info("Metrics of stage %s", stage, extra={"metrics": record})
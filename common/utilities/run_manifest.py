@@ -0,0 +1,142 @@
+"""
+On-disk manifest of the stages of a run, used to skip the work that is already up to date.
+
+For every stage (CSV extraction, CSV processing, split) the manifest records the fingerprints of its input files,
+the parameters it was run with, and the fingerprint of each output file as soon as it is written. A stage, or a
+single output file of a stage, is up to date when its inputs and parameters did not change since it was recorded
+and the output file still has the recorded fingerprint. The manifest is rewritten atomically after every update,
+so that an interrupted run keeps track of the outputs it completed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import SingletonLogger
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+MANIFEST_FILE_NAME = "run_manifest.json"
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Manifest of the stages of a run, stored as JSON.
+
+    Attributes:
+        path (str): Path of the manifest file.
+        use_hash (bool): If True, files whose modification time changed are compared by SHA-256 content hash
+                         before being considered changed; otherwise size and modification time are enough.
+
+    Passing reset=True ignores the content of an existing manifest, so that every stage is run again.
+    """
+
+    def __init__(self, path: str, use_hash: bool = False, reset: bool = False):
+        self.path = path
+        self.use_hash = use_hash
+        self._stages: Dict[str, Dict] = {}
+        if reset:
+            # Everything is rebuilt, and recorded again
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._stages = json.load(f).get("stages", {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError):
+            logger.warning("Ignoring unreadable run manifest: %s", path)
+
+    def fingerprint(self, path: str) -> Optional[Dict]:
+        """Returns the fingerprint of a file, or None if the file does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if self.use_hash:
+            fingerprint["sha256"] = _file_hash(path)
+        return fingerprint
+
+    def _matches(self, path: str, recorded: Optional[Dict]) -> bool:
+        """Returns True if the file still has the recorded fingerprint (the content hash is computed lazily)."""
+        if recorded is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size != recorded.get("size"):
+            return False
+        if stat.st_mtime_ns == recorded.get("mtime_ns"):
+            return True
+        return self.use_hash and recorded.get("sha256") == _file_hash(path)
+
+    def _context_matches(self, stage: str, inputs: List[str], params: Dict) -> bool:
+        record = self._stages.get(stage)
+        if record is None or record.get("params") != params:
+            return False
+        recorded_inputs = record.get("inputs", {})
+        return set(recorded_inputs) == set(inputs) and all(
+            self._matches(path, recorded_inputs[path]) for path in inputs
+        )
+
+    def start_stage(self, stage: str, inputs: List[str], params: Dict) -> None:
+        """
+        Starts (or resumes) a stage. If its inputs or parameters changed since the last run, the outputs recorded
+        for the stage are forgotten.
+
+        Args:
+            stage (str): Name of the stage.
+            inputs (List[str]): Paths of the input files of the stage.
+            params (Dict): JSON-serializable parameters that affect the outputs of the stage.
+        """
+        if self._context_matches(stage, inputs, params):
+            return
+        self._stages[stage] = {
+            "inputs": {path: self.fingerprint(path) for path in inputs},
+            "params": params,
+            "outputs": {},
+        }
+        self.save()
+
+    def is_output_current(self, stage: str, output_path: str) -> bool:
+        """Returns True if the output file was recorded for the started stage and did not change since."""
+        record = self._stages.get(stage, {})
+        return self._matches(output_path, record.get("outputs", {}).get(output_path))
+
+    def is_stage_current(
+        self, stage: str, inputs: List[str], params: Dict, outputs: List[str]
+    ) -> bool:
+        """
+        Returns True if the stage was completed with the same inputs and parameters, and all its output files
+        are unchanged.
+        """
+        return self._context_matches(stage, inputs, params) and all(
+            self.is_output_current(stage, path) for path in outputs
+        )
+
+    def record_output(self, stage: str, output_path: str) -> None:
+        """Records the fingerprint of an output file of the started stage and saves the manifest."""
+        self._stages[stage]["outputs"][output_path] = self.fingerprint(output_path)
+        self.save()
+
+    def save(self) -> None:
+        """Writes the manifest to a temporary file, then replaces the previous manifest with it."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self._stages}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,168 @@
+"""
+Column schema of the data rows read from the CSV file, or directly from the input workbook.
+
+The type of every column (date, integer, decimal, code with leading zeros, text) is inferred once from a sample of
+rows, and each column gets a single converter function. The converters check the shape of the value with a
+precompiled pattern instead of attempting a conversion and catching the error, and leave any value that does not
+match its column type unchanged.
+
+The rows read from the workbook (direct and columnar splits) hold typed values: their types are inferred from the
+values as they are written to the CSV file, and only their string cells go through the converters, so every split
+writes the same values whatever its source.
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, List, Sequence
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+# Number of data rows used to infer the column types
+SCHEMA_SAMPLE_ROWS = 1000
+
+_DATE_RE = re.compile(
+    r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01]) (?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]"
+)
+# Integers are limited to 15 digits, the precision of the numbers in Excel
+_INTEGER_RE = re.compile(r"-?(?:0|[1-9][0-9]{0,14})")
+_DECIMAL_RE = re.compile(r"-?[0-9]+(?:[.,][0-9]+)?(?:[eE][-+]?[0-9]+)?")
+# Numeric codes are kept as text: leading zeros, or too many digits for an Excel number
+_CODE_RE = re.compile(r"0[0-9]+|[0-9]{16,}")
+
+
+class ColumnType(Enum):
+    """Types of the columns of the data rows"""
+
+    DATE = "date"
+    INTEGER = "integer"
+    DECIMAL = "decimal"
+    CODE = "code"
+    TEXT = "text"
+
+
+def comma_to_float(value):
+    """Convert a string with a comma decimal separator to a float."""
+    if isinstance(value, str):
+        value = value.replace(",", ".")
+    return float(value)
+
+
+def convert_date(value: str) -> str:
+    """Formats a date string 'YYYY-MM-DD HH:MM:SS' as 'DD/MM/YYYY', other values are returned unchanged."""
+    if _DATE_RE.fullmatch(value):
+        return f"{value[8:10]}/{value[5:7]}/{value[:4]}"
+    return value
+
+
+def convert_integer(value: str) -> int | str:
+    """Converts an integer string to an int, other values are returned unchanged."""
+    if _INTEGER_RE.fullmatch(value):
+        return int(value)
+    return value
+
+
+def convert_decimal(value: str) -> float | str:
+    """Converts a decimal string (comma or dot separator) to a float, other values are returned unchanged."""
+    if _DECIMAL_RE.fullmatch(value):
+        return comma_to_float(value)
+    return value
+
+
+# Converters of the typed columns, code and text columns are kept as they are
+_CONVERTERS: Dict[ColumnType, Callable[[str], object]] = {
+    ColumnType.DATE: convert_date,
+    ColumnType.INTEGER: convert_integer,
+    ColumnType.DECIMAL: convert_decimal,
+}
+
+
+def _infer_column_type(values: List[str]) -> ColumnType:
+    if not values:
+        return ColumnType.TEXT
+    # A single date is enough: the date converter leaves the other values unchanged
+    if any(_DATE_RE.fullmatch(value) for value in values):
+        return ColumnType.DATE
+    if any(_CODE_RE.fullmatch(value) for value in values):
+        return ColumnType.CODE
+    if all(_INTEGER_RE.fullmatch(value) for value in values):
+        return ColumnType.INTEGER
+    if all(_DECIMAL_RE.fullmatch(value) for value in values):
+        return ColumnType.DECIMAL
+    return ColumnType.TEXT
+
+
+def infer_column_types(sample_rows: Sequence[Sequence[str]]) -> List[ColumnType]:
+    """
+    Infers the type of every column from a sample of data rows. Numeric types are only used when every non-empty
+    sampled value of the column matches them, so that no text value is ever converted to a number.
+
+    Args:
+        sample_rows (Sequence[Sequence[str]]): Data rows as read from the CSV file.
+
+    Returns:
+        List[ColumnType]: The type of each column.
+    """
+    column_count = max((len(row) for row in sample_rows), default=0)
+    return [
+        _infer_column_type(
+            [row[col_index] for row in sample_rows if col_index < len(row) and row[col_index]]
+        )
+        for col_index in range(column_count)
+    ]
+
+
+def csv_text(value) -> str:
+    """Returns a value read from the workbook as it is written to the CSV file (empty for an empty cell)."""
+    return "" if value is None else str(value)
+
+
+def infer_native_column_types(sample_rows: Sequence[Sequence]) -> List[ColumnType]:
+    """
+    Infers the type of every column from a sample of data rows read from the workbook, like infer_column_types()
+    over the same rows written to the CSV file.
+    """
+    return infer_column_types([[csv_text(value) for value in row] for row in sample_rows])
+
+
+class RowConverter:
+    """
+    Converts the values of a CSV row with the converter of the type of each column. Only the date and numeric
+    columns are visited, with one call per cell. Instances can be sent to worker processes.
+    """
+
+    def __init__(self, column_types: List[ColumnType]):
+        self.column_types = column_types
+        self._converters = [
+            (col_index, _CONVERTERS[column_type])
+            for col_index, column_type in enumerate(column_types)
+            if column_type in _CONVERTERS
+        ]
+
+    def __call__(self, row: Sequence[str]) -> List:
+        row = list(row)
+        size = len(row)
+        for col_index, convert in self._converters:
+            if col_index < size:
+                row[col_index] = convert(row[col_index])
+        return row
+
+
+class NativeRowConverter(RowConverter):
+    """
+    Converts the values of a row read from the workbook like RowConverter converts the same row read from the CSV
+    file: dates become 'DD/MM/YYYY' strings, the string cells of the date and numeric columns go through the
+    converter of their column, the other values (numbers included) are kept as they are.
+    """
+
+    def __call__(self, row: Sequence) -> List:
+        row = [value.strftime("%d/%m/%Y") if isinstance(value, datetime) else value for value in row]
+        size = len(row)
+        for col_index, convert in self._converters:
+            if col_index < size and isinstance(row[col_index], str):
+                row[col_index] = convert(row[col_index])
+        return row
@@ -0,0 +1,409 @@
+"""
+Typed columnar intermediate of the rows of a sheet.
+
+The CSV intermediate turns every value into text, which is parsed back by the next steps. The columnar file keeps
+the values with their type instead: every column of the data rows is stored as a NumPy array of its kind, and the
+file is memory mapped when it is read, so the transforms and the splitter get typed values without parsing them.
+
+Column kinds:
+- number: float64 values, with a flag for the values that were integers (missing values are NaN).
+- datetime: datetime64[us] values (missing values are NaT).
+- string: int32 codes into a dictionary of the distinct strings of the column (missing values are -1).
+- empty: a column without values.
+
+A value that does not fit the kind of its column (e.g. the text of the footer in a column of numbers) is kept as
+an exception of the column, with its row. The header rows, which are not data, are kept as they are.
+
+File layout: a prefix (magic, length of the metadata), the metadata as JSON (rows, header rows, and for every
+column its kind, dictionary, exceptions and the position of its arrays), then the arrays, aligned on 64 bytes.
+"""
+
+import json
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+# Extension of the columnar files
+COLUMNAR_EXTENSION = ".cols"
+
+KIND_EMPTY = "empty"
+KIND_NUMBER = "number"
+KIND_DATETIME = "datetime"
+KIND_STRING = "string"
+
+_MAGIC = b"XLCOLS01"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGNMENT = 64
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = np.iinfo(np.int64).min
+_MAX_EXACT_INTEGER = 2**53  # Larger integers are not exact as float64
+
+# Rows converted to Python values at a time when the rows are read
+_READ_CHUNK_ROWS = 4096
+
+
+def _value_kind(value) -> Optional[str]:
+    """Returns the column kind that can store the value, None if it can only be an exception."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return KIND_NUMBER if -_MAX_EXACT_INTEGER <= value <= _MAX_EXACT_INTEGER else None
+    if isinstance(value, float):
+        return KIND_NUMBER
+    if isinstance(value, str):
+        return KIND_STRING
+    if isinstance(value, datetime):
+        return KIND_DATETIME if value.tzinfo is None else None
+    return None
+
+
+def _encode_value(value) -> Any:
+    """Encodes a value of a header row or an exception as JSON, tagging the types JSON does not have."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, time):
+        return {"time": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"timedelta": value.total_seconds()}
+    return str(value)
+
+
+def _decode_value(value) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if "datetime" in value:
+        return datetime.fromisoformat(value["datetime"])
+    if "date" in value:
+        return date.fromisoformat(value["date"])
+    if "time" in value:
+        return time.fromisoformat(value["time"])
+    return timedelta(seconds=value["timedelta"])
+
+
+@dataclass
+class Column:
+    """
+    A column of the data rows: its kind, its arrays (memory mapped when read from a file), the dictionary of a
+    string column and the values that do not fit the kind, by row.
+    """
+
+    kind: str
+    row_count: int
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+    dictionary: List[str] = field(default_factory=list)
+    exceptions: Dict[int, Any] = field(default_factory=dict)
+    _lookup: Optional[np.ndarray] = field(default=None, repr=False)
+    _exception_rows: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def values(self, start: int, end: int) -> List:
+        """Returns the values of the rows [start, end) as Python values (None for the missing values)."""
+        if self.kind == KIND_NUMBER:
+            numbers = self.arrays["values"][start:end]
+            values = numbers.tolist()
+            for index in np.flatnonzero(self.arrays["ints"][start:end]):
+                values[index] = int(values[index])
+            for index in np.flatnonzero(np.isnan(numbers)):
+                values[index] = None
+        elif self.kind == KIND_DATETIME:
+            values = self.arrays["values"][start:end].view("datetime64[us]").tolist()
+        elif self.kind == KIND_STRING:
+            # The code -1 of the missing values picks the None at the end of the lookup array
+            if self._lookup is None:
+                self._lookup = np.array(self.dictionary + [None], dtype=object)
+            values = self._lookup[self.arrays["codes"][start:end]].tolist()
+        else:
+            values = [None] * (end - start)
+
+        if self.exceptions:
+            if self._exception_rows is None:
+                self._exception_rows = np.array(sorted(self.exceptions), dtype=np.int64)
+            first, last = np.searchsorted(self._exception_rows, [start, end])
+            for row in self._exception_rows[first:last].tolist():
+                values[row - start] = self.exceptions[row]
+        return values
+
+    def group_codes(self) -> np.ndarray:
+        """
+        Returns an integer code per row, equal for equal values, and -1 for the missing and empty values (which
+        never continue a group, as in part_balancer.group_sizes()).
+        """
+        if self.kind == KIND_STRING and not self.exceptions:
+            codes = self.arrays["codes"].astype(np.int64)
+            if "" in self.dictionary:
+                codes[codes == self.dictionary.index("")] = -1
+            return codes
+        lookup: Dict[Any, int] = {}
+        return np.fromiter(
+            (
+                -1 if value is None or value == "" else lookup.setdefault(value, len(lookup))
+                for value in self.values(0, self.row_count)
+            ),
+            dtype=np.int64,
+            count=self.row_count,
+        )
+
+
+def group_starts(codes: np.ndarray) -> np.ndarray:
+    """Returns True for the rows starting a group: a missing key, or a key different from the previous row."""
+    previous = np.concatenate(([-1], codes[:-1]))
+    return (codes < 0) | (codes != previous)
+
+
+class _ColumnBuilder:
+    """Accumulates the values of a column in compact buffers of the kind of its first value."""
+
+    def __init__(self, row_count: int = 0):
+        self.kind = KIND_EMPTY
+        self.row_count = row_count  # Rows before the first value are missing
+        self.exceptions: Dict[int, Any] = {}
+        self._numbers = array("d")
+        self._ints = bytearray()
+        self._datetimes = array("q")
+        self._codes = array("i")
+        self._dictionary: Dict[str, int] = {}
+
+    def _start(self, kind: str) -> None:
+        self.kind = kind
+        for _ in range(self.row_count):
+            self._append_missing()
+
+    def _append_missing(self) -> None:
+        if self.kind == KIND_NUMBER:
+            self._numbers.append(np.nan)
+            self._ints.append(0)
+        elif self.kind == KIND_DATETIME:
+            self._datetimes.append(_NAT)
+        elif self.kind == KIND_STRING:
+            self._codes.append(-1)
+
+    def extend(self, values: Iterable) -> None:
+        for value in values:
+            kind = None if value is None else _value_kind(value)
+            if kind is not None and self.kind == KIND_EMPTY:
+                self._start(kind)
+            if kind is None or kind != self.kind:
+                if value is not None:
+                    self.exceptions[self.row_count] = value
+                self._append_missing()
+            elif kind == KIND_NUMBER:
+                self._numbers.append(value)
+                self._ints.append(not isinstance(value, float))
+            elif kind == KIND_DATETIME:
+                self._datetimes.append((value - _EPOCH) // _MICROSECOND)
+            else:
+                self._codes.append(self._dictionary.setdefault(value, len(self._dictionary)))
+            self.row_count += 1
+
+    def column(self) -> Column:
+        if self.kind == KIND_NUMBER:
+            arrays = {
+                "values": np.frombuffer(self._numbers, dtype=np.float64),
+                "ints": np.frombuffer(bytes(self._ints), dtype=np.bool_),
+            }
+        elif self.kind == KIND_DATETIME:
+            arrays = {"values": np.frombuffer(self._datetimes, dtype=np.int64)}
+        elif self.kind == KIND_STRING:
+            arrays = {"codes": np.frombuffer(self._codes, dtype=np.int32)}
+        else:
+            arrays = {}
+        return Column(self.kind, self.row_count, arrays, list(self._dictionary), self.exceptions)
+
+
+def _aligned(position: int) -> int:
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_columns(
+    path: str, header_rows: Sequence[Sequence], row_count: int, columns: Sequence[Column]
+) -> None:
+    """
+    Writes a columnar file. The file is written to a temporary file first, then replaces the previous file, so that
+    an interrupted write never leaves a truncated columnar file behind.
+
+    Args:
+        path (str): Path of the columnar file.
+        header_rows (Sequence[Sequence]): The header rows, kept as they are.
+        row_count (int): Number of data rows.
+        columns (Sequence[Column]): The columns of the data rows, each with row_count rows.
+    """
+    arrays: List[Tuple[int, np.ndarray]] = []  # Offset from the start of the data, values
+    position = 0
+    columns_metadata = []
+    for column in columns:
+        arrays_metadata = {}
+        for name, values in column.arrays.items():
+            arrays_metadata[name] = {
+                "offset": position,
+                "dtype": values.dtype.str,
+                "length": len(values),
+            }
+            arrays.append((position, values))
+            position = _aligned(position + values.nbytes)
+        columns_metadata.append(
+            {
+                "kind": column.kind,
+                "arrays": arrays_metadata,
+                "dictionary": column.dictionary,
+                "exceptions": [
+                    [row, _encode_value(value)] for row, value in column.exceptions.items()
+                ],
+            }
+        )
+    metadata = json.dumps(
+        {
+            "rows": row_count,
+            "header_rows": [[_encode_value(value) for value in row] for row in header_rows],
+            "columns": columns_metadata,
+        }
+    ).encode("utf-8")
+
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, len(metadata)))
+            f.write(metadata)
+            data_start = _aligned(f.tell())
+            for offset, values in arrays:
+                f.write(b"\0" * (data_start + offset - f.tell()))
+                f.write(memoryview(np.ascontiguousarray(values)).cast("B"))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ColumnStore:
+    """A columnar file, memory mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, metadata_length = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not a columnar file: {path}")
+            metadata = json.loads(f.read(metadata_length).decode("utf-8"))
+        data_start = _aligned(_PREFIX.size + metadata_length)
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+        self.row_count: int = metadata["rows"]
+        self.header_rows: List[List] = [
+            [_decode_value(value) for value in row] for row in metadata["header_rows"]
+        ]
+        self.columns: List[Column] = []
+        for column_metadata in metadata["columns"]:
+            arrays = {}
+            for name, array_metadata in column_metadata["arrays"].items():
+                dtype = np.dtype(array_metadata["dtype"])
+                offset = data_start + array_metadata["offset"]
+                arrays[name] = buffer[offset : offset + dtype.itemsize * array_metadata["length"]].view(dtype)
+            self.columns.append(
+                Column(
+                    column_metadata["kind"],
+                    self.row_count,
+                    arrays,
+                    column_metadata["dictionary"],
+                    {row: _decode_value(value) for row, value in column_metadata["exceptions"]},
+                )
+            )
+
+    def rows(self, start: int = 0, end: Optional[int] = None) -> Iterator[List]:
+        """Yields the data rows [start, end) as lists of Python values, converted by chunks of rows."""
+        end = self.row_count if end is None else min(end, self.row_count)
+        for chunk_start in range(start, end, _READ_CHUNK_ROWS):
+            chunk_end = min(chunk_start + _READ_CHUNK_ROWS, end)
+            if not self.columns:
+                yield from ([] for _ in range(chunk_start, chunk_end))
+                continue
+            columns = [column.values(chunk_start, chunk_end) for column in self.columns]
+            yield from map(list, zip(*columns))
+
+    def group_sizes(self, column: int, first_row: int = 0) -> array:
+        """
+        Returns the size of every run of rows with the same value in the column, from first_row to the end, like
+        part_balancer.group_sizes() over the values of those rows.
+        """
+        if first_row >= self.row_count:
+            return array("I")
+        if column >= len(self.columns):
+            return array("I", [1] * (self.row_count - first_row))
+        starts = group_starts(self.columns[column].group_codes()[first_row:])
+        bounds = np.append(np.flatnonzero(starts), len(starts))
+        return array("I", np.diff(bounds).tolist())
+
+
+class ColumnSlice:
+    """
+    The data rows [start, end) of a columnar file, read when iterated. A slice only holds the path and the range,
+    so it can be sent to a worker process which then maps the file and reads the rows itself.
+    """
+
+    def __init__(self, path: str, start: int, end: int):
+        self.path = path
+        self.start = start
+        self.end = end
+
+    def __iter__(self) -> Iterator[List]:
+        return ColumnStore(self.path).rows(self.start, self.end)
+
+
+class ColumnStoreWriter:
+    """
+    Writes the rows of a sheet to a columnar file: the first header_rows rows are kept as header rows, the next
+    ones are stored by column. The file is written when the writer is closed.
+    """
+
+    def __init__(self, path: str, header_rows: int):
+        self.path = path
+        self.row_count = 0
+        self._header_row_count = header_rows
+        self._header_rows: List[List] = []
+        self._builders: List[_ColumnBuilder] = []
+
+    def write_rows(self, rows: Sequence[Sequence]) -> None:
+        """Writes rows of values."""
+        rows = iter(rows)
+        missing_header_rows = self._header_row_count - len(self._header_rows)
+        if missing_header_rows > 0:
+            self._header_rows.extend(list(row) for row in islice(rows, missing_header_rows))
+        rows = list(rows)
+        if not rows:
+            return
+
+        width = max(len(row) for row in rows)
+        while len(self._builders) < width:
+            self._builders.append(_ColumnBuilder(self.row_count))
+        for col_index, builder in enumerate(self._builders):
+            builder.extend(row[col_index] if col_index < len(row) else None for row in rows)
+        self.row_count += len(rows)
+
+    def close(self) -> None:
+        write_columns(
+            self.path,
+            self._header_rows,
+            self.row_count,
+            [builder.column() for builder in self._builders],
+        )
+
+    def __enter__(self) -> "ColumnStoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,198 @@
+"""
+Partitioning of the data rows of a CSV file by the value of a column.
+
+Each partition selects the rows whose value in a given column is in a set of values or matches a regular
+expression (e.g. the rows having 'CA2023' in column 'N. doc.'). The source CSV is read once and every row is
+routed to the CSV writer of the first partition it matches, or of the default partition; each partition CSV gets
+the header lines of the source, so that it can be split into its own output files with the same model template.
+"""
+
+import csv
+import os
+import re
+import sys
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import SingletonLogger
+from common.xlsx.csv_row_index import IndexedCsvWriter
+from common.xlsx.large_xlsx_splitter_utils import N_DOC_COLUMN
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+# Name of the partition of the rows not selected by any configured partition
+DEFAULT_PARTITION = "main"
+
+# Rows of a partition buffered before they are written to its CSV file
+_WRITE_BUFFER_ROWS = 10000
+
+
+@dataclass
+class Partition:
+    """
+    Rows of the source CSV selected by the value of one column.
+
+    Attributes:
+        name (str): Name of the partition, appended to the names of its CSV and output files.
+        column (int): 0-based index of the CSV column tested.
+        values (FrozenSet[str]): Values of the column that select the row.
+        pattern (Optional[str]): Regular expression that selects the row when it matches the whole value.
+        num_target_file (int): Number of output Excel files of the partition.
+    """
+
+    name: str
+    column: int
+    values: FrozenSet[str] = field(default_factory=frozenset)
+    pattern: Optional[str] = None
+    num_target_file: int = 1
+
+    def __post_init__(self):
+        self.values = frozenset(self.values)
+        self._regex = re.compile(self.pattern) if self.pattern is not None else None
+
+    def matches(self, row: Sequence[str]) -> bool:
+        """Returns True if the row belongs to the partition."""
+        if self.column >= len(row):
+            return False
+        value = row[self.column]
+        return value in self.values or (
+            self._regex is not None and self._regex.fullmatch(value) is not None
+        )
+
+    def to_dict(self) -> Dict:
+        """Returns the partition as a JSON-serializable dictionary, in the format of the configuration file."""
+        return {
+            "name": self.name,
+            "column": self.column,
+            "values": sorted(self.values),
+            "pattern": self.pattern,
+            "num_target_file": self.num_target_file,
+        }
+
+
+def load_partitions(partition_configs: Optional[List[Dict]]) -> List[Partition]:
+    """
+    Builds the partitions from the "partitions" list of the configuration file, e.g.
+    [{"name": "CA2023", "column": 11, "values": ["CA2023"], "num_target_file": 1}].
+
+    Args:
+        partition_configs (Optional[List[Dict]]): The partition entries of the configuration.
+
+    Returns:
+        List[Partition]: The partitions, in the order in which they are tested.
+
+    Raises:
+        ValueError: If an entry has no name or column, selects no value, or reuses a partition name.
+    """
+    partitions: List[Partition] = []
+    names = {DEFAULT_PARTITION}
+    for partition_config in partition_configs or []:
+        name = partition_config.get("name")
+        column = partition_config.get("column")
+        values = partition_config.get("values", [])
+        pattern = partition_config.get("pattern")
+        if not name or column is None:
+            raise ValueError(f"Partition without name or column: {partition_config}")
+        if not values and pattern is None:
+            raise ValueError(f"Partition {name} has no values nor pattern")
+        if name in names:
+            raise ValueError(f"Duplicate partition name: {name}")
+        names.add(name)
+        partitions.append(
+            Partition(
+                name=str(name),
+                column=int(column),
+                values=frozenset(str(value) for value in values),
+                pattern=pattern,
+                num_target_file=int(partition_config.get("num_target_file", 1)),
+            )
+        )
+    return partitions
+
+
+def partition_csv_path(source_csv: str, partition_name: str) -> str:
+    """Returns the path of the CSV file of a partition, next to the source CSV file."""
+    root, extension = os.path.splitext(source_csv)
+    return f"{root}_{partition_name}{extension}"
+
+
+def partition_csv(
+    source_csv: str,
+    partitions: List[Partition],
+    header_lines: int = 12,
+    delimiter: str = ";",
+) -> Dict[str, str]:
+    """
+    Routes the data rows of a CSV file to one CSV file per partition, in a single pass over the source.
+
+    The header lines are written to every partition CSV. A data row goes to the first partition it matches, the
+    rows matching no partition go to the default partition, together with the last line of the source (the
+    footer of the table). Every partition CSV is written with its row index (see csv_row_index).
+
+    Args:
+        source_csv (str): Path to the CSV file to partition.
+        partitions (List[Partition]): The partitions, tested in order.
+        header_lines (int): Number of header lines copied to every partition CSV.
+        delimiter (str): CSV delimiter.
+
+    Returns:
+        Dict[str, str]: Path of the CSV file of each partition by name, the default partition included.
+    """
+    names = [DEFAULT_PARTITION] + [partition.name for partition in partitions]
+    paths = {name: partition_csv_path(source_csv, name) for name in names}
+
+    buffers: Dict[str, List[List[str]]] = {name: [] for name in names}
+    with ExitStack() as stack:
+        writers = {
+            name: stack.enter_context(
+                IndexedCsvWriter(
+                    paths[name], N_DOC_COLUMN, delimiter=delimiter, header_rows=header_lines
+                )
+            )
+            for name in names
+        }
+
+        def write_row(name: str, row: List[str]) -> None:
+            buffer = buffers[name]
+            buffer.append(row)
+            if len(buffer) >= _WRITE_BUFFER_ROWS:
+                writers[name].write_rows(buffer)
+                buffer.clear()
+
+        with open(source_csv, mode="r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            for _ in range(header_lines):
+                header_row = next(reader, None)
+                if header_row is None:
+                    break
+                for name in names:
+                    write_row(name, header_row)
+
+            # Rows are routed one behind, so that the last line is kept for the default partition
+            previous_row = next(reader, None)
+            for row in reader:
+                name = next(
+                    (
+                        partition.name
+                        for partition in partitions
+                        if partition.matches(previous_row)
+                    ),
+                    DEFAULT_PARTITION,
+                )
+                write_row(name, previous_row)
+                previous_row = row
+            if previous_row is not None:
+                write_row(DEFAULT_PARTITION, previous_row)
+
+        for name in names:
+            writers[name].write_rows(buffers[name])
+        row_counts = {name: writers[name].row_count for name in names}
+
+    for name in names:
+        logger.info("Partition %s: %d rows written to %s", name, row_counts[name] - header_lines, paths[name])
+    return paths
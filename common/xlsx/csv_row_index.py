@@ -0,0 +1,300 @@
+"""
+Row index of the intermediate CSV files.
+
+The CSV files are written together with a compact binary sidecar file (<csv>.rows.idx) holding the byte offset of
+every row, the number of header rows, and the rows where a new group of the group column ('N. doc.') starts. The
+offsets are recorded while the rows are written, so the index costs no extra pass over the file.
+
+The index is read through a memory map: the number of rows, the footer (last row) of the table, the group sizes
+of the split and the byte range of any slice of rows are available without parsing the CSV, and a worker process
+can read the rows of its part by seeking straight to them.
+
+The index is bound to the size and modification time of its CSV file: when the CSV changes, the index is ignored.
+
+File layout (little endian): a header (magic, CSV size, CSV mtime_ns, rows, groups, header rows, group column),
+the offsets of the rows plus the end of the file as int64, then the 0-based rows starting a group as int64.
+"""
+
+import csv
+import io
+import os
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+_MAGIC = b"CSVIDX01"
+_HEADER = struct.Struct("<8s6q")
+_OFFSET_DTYPE = np.dtype("<i8")
+_NEWLINE = ord("\n")
+_UNKNOWN_HEADER_ROWS = -1
+
+
+def row_index_path(csv_path: str) -> str:
+    """Returns the path of the row index sidecar file of a CSV file."""
+    return f"{csv_path}.rows.idx"
+
+
+class ByteRangeReader(io.RawIOBase):
+    """Read-only stream over the byte range [start, end) of a binary file."""
+
+    def __init__(self, raw: BinaryIO, start: int, end: int):
+        self._raw = raw
+        self._raw.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._raw.read(size)
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class CsvSlice:
+    """
+    The rows of the byte range [start, end) of a CSV file, parsed when iterated. A slice only holds the path and
+    the range, so it can be sent to a worker process which then reads the rows itself.
+    """
+
+    def __init__(self, csv_path: str, start: int, end: int, delimiter: str = ";"):
+        self.csv_path = csv_path
+        self.start = start
+        self.end = end
+        self.delimiter = delimiter
+
+    def __iter__(self) -> Iterator[List[str]]:
+        with open(self.csv_path, "rb") as f:
+            raw = io.BufferedReader(ByteRangeReader(f, self.start, self.end), 1 << 20)
+            text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            yield from csv.reader(text, delimiter=self.delimiter)
+
+
+class CsvRowIndex:
+    """Row index of a CSV file, backed by a memory map of its sidecar file."""
+
+    def __init__(
+        self,
+        csv_path: str,
+        row_offsets: np.ndarray,
+        group_starts: np.ndarray,
+        header_rows: Optional[int],
+        group_column: int,
+    ):
+        self.csv_path = csv_path
+        self.row_offsets = row_offsets  # Offset of every row, plus the end of the file
+        self.group_starts = group_starts  # Rows starting a group, in order
+        self.header_rows = header_rows  # None if unknown to the writer of the CSV
+        self.group_column = group_column
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows of the CSV file (header and footer included)."""
+        return len(self.row_offsets) - 1
+
+    @property
+    def footer_offset(self) -> int:
+        """Byte offset of the last row of the CSV file (the footer of the table)."""
+        return int(self.row_offsets[max(self.row_count - 1, 0)])
+
+    def byte_range(self, start_row: int, end_row: int) -> Tuple[int, int]:
+        """Returns the byte range of the rows [start_row, end_row) of the CSV file."""
+        start_row = min(max(start_row, 0), self.row_count)
+        end_row = min(max(end_row, start_row), self.row_count)
+        return int(self.row_offsets[start_row]), int(self.row_offsets[end_row])
+
+    def rows(self, start_row: int, end_row: int, delimiter: str = ";") -> CsvSlice:
+        """Returns the rows [start_row, end_row) of the CSV file, read only when iterated."""
+        return CsvSlice(self.csv_path, *self.byte_range(start_row, end_row), delimiter=delimiter)
+
+    def group_sizes(self, first_row: int) -> array:
+        """
+        Returns the size of every group of the rows from first_row to the end of the file, like
+        part_balancer.group_sizes() over the keys of those rows. first_row always starts a group.
+        """
+        if first_row >= self.row_count:
+            return array("I")
+        later_starts = self.group_starts[np.searchsorted(self.group_starts, first_row, side="right"):]
+        bounds = np.concatenate(([first_row], later_starts, [self.row_count]))
+        return array("I", np.diff(bounds).tolist())
+
+
+def load_row_index(csv_path: str) -> Optional[CsvRowIndex]:
+    """
+    Returns the row index of a CSV file, or None if it has no index or the index is not up to date.
+
+    Args:
+        csv_path (str): Path to the CSV file.
+
+    Returns:
+        Optional[CsvRowIndex]: The index, memory mapped from its sidecar file.
+    """
+    index_path = row_index_path(csv_path)
+    try:
+        stat = os.stat(csv_path)
+        index_size = os.path.getsize(index_path)
+        with open(index_path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+
+    magic, size, mtime_ns, rows, groups, header_rows, group_column = _HEADER.unpack(header)
+    if (
+        magic != _MAGIC
+        or size != stat.st_size
+        or mtime_ns != stat.st_mtime_ns
+        or index_size != _HEADER.size + _OFFSET_DTYPE.itemsize * (rows + 1 + groups)
+    ):
+        return None
+
+    row_offsets = np.memmap(
+        index_path, dtype=_OFFSET_DTYPE, mode="r", offset=_HEADER.size, shape=(rows + 1,)
+    )
+    if groups:
+        group_starts = np.memmap(
+            index_path,
+            dtype=_OFFSET_DTYPE,
+            mode="r",
+            offset=_HEADER.size + _OFFSET_DTYPE.itemsize * (rows + 1),
+            shape=(groups,),
+        )
+    else:
+        group_starts = np.empty(0, dtype=_OFFSET_DTYPE)
+    return CsvRowIndex(
+        csv_path,
+        row_offsets,
+        group_starts,
+        None if header_rows == _UNKNOWN_HEADER_ROWS else header_rows,
+        group_column,
+    )
+
+
+def _row_ends(data: bytes, delimiter: str) -> np.ndarray:
+    """Returns the offset just past every row of a block of complete CSV rows."""
+    line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == _NEWLINE) + 1
+    if data and data[-1] != _NEWLINE:
+        line_ends = np.append(line_ends, len(data))  # Last row without line terminator
+    if b'"' not in data:
+        return line_ends
+
+    # Quoted values may span several lines: every row ends at the end of the last line it was read from
+    reader = csv.reader(
+        (line.decode("utf-8") for line in io.BytesIO(data)), delimiter=delimiter
+    )
+    row_last_lines = [reader.line_num for _ in reader]
+    return line_ends[np.asarray(row_last_lines, dtype=np.int64) - 1]
+
+
+def _row_key(row: Sequence, column: int) -> str:
+    """Returns the group key of a row as written in the CSV file ('' for a missing value)."""
+    value = row[column] if column < len(row) else None
+    return "" if value is None else str(value)
+
+
+class IndexedCsvWriter:
+    """
+    Writes a CSV file by blocks of complete rows, recording the offset and the group key of every row. The row
+    index is written when the writer is closed; if the writing fails, no index is written.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        group_column: int,
+        delimiter: str = ";",
+        header_rows: Optional[int] = None,
+    ):
+        self.csv_path = csv_path
+        self.row_count = 0
+        self._group_column = group_column
+        self._delimiter = delimiter
+        self._header_rows = header_rows
+        self._file = open(csv_path, "wb", buffering=1 << 20)
+        self._position = 0
+        self._row_ends: List[np.ndarray] = []
+        self._group_starts: List[np.ndarray] = []
+        self._previous_key: Optional[str] = None
+
+    def write_rows(self, rows: Sequence[Sequence]) -> None:
+        """Writes rows of values (str(value), empty for None, quoted when needed)."""
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=self._delimiter, lineterminator="\n").writerows(rows)
+        self._write(buffer.getvalue(), [_row_key(row, self._group_column) for row in rows])
+
+    def write_text(self, text: str, group_keys: Optional[Sequence[str]] = None) -> None:
+        """
+        Writes rows already rendered as CSV text. group_keys are the keys of the rows in the group column
+        ('' for a missing value); if not given, they are parsed from the text.
+        """
+        if group_keys is None:
+            reader = csv.reader(io.StringIO(text, newline=""), delimiter=self._delimiter)
+            group_keys = [_row_key(row, self._group_column) for row in reader]
+        self._write(text, group_keys)
+
+    def _write(self, text: str, group_keys: Sequence[str]) -> None:
+        data = text.encode("utf-8")
+        row_ends = _row_ends(data, self._delimiter)
+        if len(row_ends) != len(group_keys):
+            raise ValueError(
+                f"{len(row_ends)} rows written to {self.csv_path} with {len(group_keys)} group keys"
+            )
+        self._file.write(data)
+
+        # Same runs as part_balancer.group_sizes(): an empty key never continues a group
+        starts = []
+        previous_key = self._previous_key
+        for row_number, key in enumerate(group_keys, self.row_count):
+            if not key or key != previous_key:
+                starts.append(row_number)
+            previous_key = key
+        self._previous_key = previous_key
+
+        self._row_ends.append(row_ends + self._position)
+        self._group_starts.append(np.asarray(starts, dtype=_OFFSET_DTYPE))
+        self._position += len(data)
+        self.row_count += len(row_ends)
+
+    def close(self) -> None:
+        """Closes the CSV file and writes its row index."""
+        self._file.close()
+        stat = os.stat(self.csv_path)
+        row_offsets = np.concatenate([np.zeros(1, dtype=_OFFSET_DTYPE)] + self._row_ends)
+        group_starts = np.concatenate(
+            [np.empty(0, dtype=_OFFSET_DTYPE)] + self._group_starts
+        )
+        with open(row_index_path(self.csv_path), "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    self.row_count,
+                    len(group_starts),
+                    _UNKNOWN_HEADER_ROWS if self._header_rows is None else self._header_rows,
+                    self._group_column,
+                )
+            )
+            row_offsets.astype(_OFFSET_DTYPE, copy=False).tofile(f)
+            group_starts.astype(_OFFSET_DTYPE, copy=False).tofile(f)
+
+    def __enter__(self) -> "IndexedCsvWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
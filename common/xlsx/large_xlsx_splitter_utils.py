@@ -8,16 +8,42 @@ This script includes functionality for:
 """
 
 import csv
+import io
 import os
+import re
 import sys
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import ExitStack, closing
 from copy import copy
 from datetime import datetime
-from typing import Any
-
-import pandas as pd
+from itertools import chain, islice
+from functools import partial
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 from openpyxl import Workbook, load_workbook
-from openpyxl.cell.cell import Cell
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import Cell, MergedCell
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.worksheet import Worksheet
 from tqdm import tqdm
 
@@ -26,45 +52,182 @@ CWD = os.getcwd()
 sys.path.append(CWD)
 
 from common.utilities.logger import SingletonLogger
+from common.utilities.metrics import (
+    STAGE_FILL,
+    STAGE_SAVE,
+    STAGE_SPLIT,
+    STAGE_STYLE,
+    STAGE_TEMPLATE_LOAD,
+    configure_worker as configure_metrics_worker,
+    current_settings as current_metrics_settings,
+    measure_stage,
+)
+from common.utilities.run_manifest import RunManifest
+from common.xlsx.column_schema import (
+    SCHEMA_SAMPLE_ROWS,
+    ColumnType,
+    NativeRowConverter,
+    RowConverter,
+    comma_to_float,  # Kept importable from this module
+    convert_date,
+    infer_column_types,
+    infer_native_column_types,
+)
+from common.xlsx.columnar_store import (
+    Column,
+    ColumnSlice,
+    ColumnStore,
+    ColumnStoreWriter,
+    KIND_STRING,
+    group_starts,
+    write_columns,
+)
+from common.xlsx.csv_row_index import (
+    ByteRangeReader,
+    IndexedCsvWriter,
+    load_row_index,
+)
+from common.xlsx.model_template import (
+    ModelTemplate,
+    RowLayout,
+    SheetLayout,
+    compile_sheet_layout,
+    load_model_template,
+    style_cache,
+)
+from common.xlsx.part_balancer import (
+    RowStream,
+    balance_groups,
+    even_part_sizes,
+    group_sizes,
+    max_imbalance,
+    take_part,
+)
+from common.xlsx.row_pipeline import convert_parts, prefetch_rows
+from common.xlsx.sheet_xml_reader import count_sheet_rows, iter_sheet_rows
+from common.xlsx.workbook_saver import BundleArchive, run_timestamp, save_workbook
 
 # Configure logging
 logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
 
+# Extraction engines of excel_to_csv
+EXTRACT_ENGINE_OPENPYXL = "openpyxl"
+EXTRACT_ENGINE_XML = "xml"
 
-def comma_to_float(value):
-    """Convert a string with a comma decimal separator to a float."""
-    if isinstance(value, str):
-        value = value.replace(",", ".")
-    return float(value)
+# Output engines of split_csv_to_excel
+OUTPUT_ENGINE_WORKBOOK = "workbook"
+OUTPUT_ENGINE_WRITE_ONLY = "write_only"
+OUTPUT_ENGINES = (OUTPUT_ENGINE_WORKBOOK, OUTPUT_ENGINE_WRITE_ONLY)
+
+# Intermediate files between extraction and split: CSV text, or typed columns (columnar_store)
+INTERMEDIATE_FORMAT_CSV = "csv"
+INTERMEDIATE_FORMAT_COLUMNAR = "columnar"
+INTERMEDIATE_FORMATS = (INTERMEDIATE_FORMAT_CSV, INTERMEDIATE_FORMAT_COLUMNAR)
+
+# Split strategies: parts of the same number of rows, or whole 'N. doc.' series balanced between the parts
+SPLIT_STRATEGY_ROWS = "rows"
+SPLIT_STRATEGY_GROUPS = "groups"
+SPLIT_STRATEGIES = (SPLIT_STRATEGY_ROWS, SPLIT_STRATEGY_GROUPS)
+
+# Largest relative difference from the average part size accepted without a warning by the groups strategy
+SPLIT_TOLERANCE = 0.1
+
+# 0-based index of the 'N. doc.' column of the data rows
+N_DOC_COLUMN = 11
+
+# Name of the split stage in the run manifest
+SPLIT_STAGE = "split"
+
+# Rows rendered at a time by process_csv when writing the processed table
+_CSV_BLOCK_ROWS = 100000
+
+
+def count_csv_rows(csv_path: str, delimiter: str = ";") -> int:
+    """
+    Returns the number of rows of a CSV file, reading it from the row index of the CSV if it is up to date,
+    otherwise counting the rows in a single pass that does not keep them in memory.
+
+    Args:
+        csv_path (str): Path to the CSV file.
+        delimiter (str): CSV delimiter.
+
+    Returns:
+        int: Number of rows of the CSV file (header and footer included).
+    """
+    row_index = load_row_index(csv_path)
+    if row_index is not None:
+        return row_index.row_count
+
+    with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+        return sum(1 for _ in csv.reader(f, delimiter=delimiter))
+
+
+def _open_sheet_rows(input_file_excel: str, engine: str) -> Tuple[Iterator[Tuple], Optional[Workbook]]:
+    """Returns the rows of the active sheet read by the extraction engine, and the workbook to close if any."""
+    if engine == EXTRACT_ENGINE_XML:
+        return iter_sheet_rows(input_file_excel), None
+    if engine == EXTRACT_ENGINE_OPENPYXL:
+        wb = load_workbook(input_file_excel, read_only=True)
+        return wb.active.iter_rows(values_only=True), wb
+    raise ValueError(f"Unknown extraction engine: {engine}")
 
 
 def excel_to_csv(
-    input_file_excel: str, output_file_csv: str, delimiter: str = ";"
+    input_file_excel: str,
+    output_file_csv: str,
+    delimiter: str = ";",
+    engine: str = EXTRACT_ENGINE_OPENPYXL,
 ) -> None:
     """
     Converts the original Excel file into a CSV file for more efficient data handling.
 
+    Values are written as str(value) (empty for empty cells) and quoted when they contain the delimiter,
+    quotes or line breaks. The row index of the CSV is written along with it (see csv_row_index).
+
     Args:
         input_file_excel (str): Path to the input Excel file.
         output_file_csv (str): Path to the output CSV file.
+        delimiter (str): CSV delimiter.
+        engine (str): Extraction engine, "openpyxl" (openpyxl read-only mode) or "xml" (stream-parses the sheet
+                      XML directly, several times faster).
     """
-    wb = load_workbook(input_file_excel, read_only=True)
-    sheet = wb.active
-
-    with open(output_file_csv, mode="w", newline="", encoding="utf-8") as f:
-        for row in sheet.iter_rows(values_only=True):
-            # Write each row from the Excel file as a row in the CSV
-            f.write(
-                delimiter.join(
-                    [str(value) if value is not None else "" for value in row]
-                )
-            )
-            f.write("\n")
+    rows, wb = _open_sheet_rows(input_file_excel, engine)
+    with IndexedCsvWriter(output_file_csv, N_DOC_COLUMN, delimiter=delimiter) as writer:
+        # Write the rows from the Excel file in chunks of rows in the CSV
+        while True:
+            chunk = list(islice(rows, 10000))
+            if not chunk:
+                break
+            writer.write_rows(chunk)
+
+    if wb is not None:
+        wb.close()
 
     logger.info(f"CSV file created: {output_file_csv}")
 
 
-def process_csv(input_csv: str, output_csv: str) -> None:
+def _find_last_line_start(f: BinaryIO, lower_bound: int, block_size: int = 64 * 1024) -> int:
+    """Returns the offset of the last line of a binary file, scanning backwards from its end."""
+    end = f.seek(0, os.SEEK_END)
+    # Ignore the line terminator of the last line
+    position = end - 1
+    while position > lower_bound:
+        block_start = max(lower_bound, position - block_size)
+        f.seek(block_start)
+        block = f.read(position - block_start)
+        newline = block.rfind(b"\n")
+        if newline != -1:
+            return block_start + newline + 1
+        position = block_start
+    return lower_bound
+
+
+def process_csv(
+    input_csv: str,
+    output_csv: str,
+    header_lines: int = 12,
+    chunksize: Optional[int] = None,
+) -> None:
     """
     Process a CSV file by modifying the 'N. riga' column based on consecutive rows sharing the same 'N. doc.' value,
     and appending the last line from the original CSV as plain text at the end of the output CSV.
@@ -73,128 +236,246 @@ def process_csv(input_csv: str, output_csv: str) -> None:
     and writes the results to a new output CSV file. The first 12 lines of the input file are treated as header
     lines and written directly to the output. The last line of the input CSV is also appended as plain text.
 
+    The file is read once: the header lines and the last line are read as bytes, the table in between is parsed
+    by the pandas C parser. The first row of each 'N. doc.' series gets the next 'N. riga' number (starting from the
+    'N. riga' of the first row + 1), the other rows get an empty 'N. riga'; the series are found with vectorized
+    shift/compare and cumsum operations.
+
+    With chunksize, the table is processed in chunks of that many rows, so files larger than memory can be
+    processed. In this mode the values are kept as text (per-chunk type inference would format the same column
+    differently from one chunk to another) and an empty 'N. doc.' is treated as a missing value.
+
+    The last line is found from the row index of the input CSV when it has one, and the row index of the output
+    CSV is written along with it.
+
     Parameters:
     - input_csv (str): Path to the input CSV file.
     - output_csv (str): Path where the processed CSV file will be saved.
+    - header_lines (int): Number of header lines written unchanged to the output.
+    - chunksize (Optional[int]): Number of rows processed at a time (default: the whole table at once).
     """
+    import pandas as pd  # Only this stage uses pandas: the splits and their workers start without it
+
+    n_riga_col, n_doc_col = 1, N_DOC_COLUMN
+    input_index = load_row_index(input_csv)
+
+    with open(input_csv, "rb") as f_in, IndexedCsvWriter(
+        output_csv, n_doc_col, header_rows=header_lines
+    ) as out_csv:
+        # Write the header lines to the output CSV as plain text
+        header = [f_in.readline() for _ in range(header_lines)]
+        table_start = f_in.tell()
+        out_csv.write_text(b"".join(header).decode("utf-8").replace("\r\n", "\n"))
+
+        # The last line to be added separately at the end of the output
+        if input_index is not None and input_index.row_count > header_lines:
+            table_end = input_index.footer_offset
+        else:
+            table_end = _find_last_line_start(f_in, table_start)
+        f_in.seek(table_end)
+        last_line = f_in.read().decode("utf-8").replace("\r\n", "\n")
+
+        if table_end > table_start:
+            # Load the table data (header and last line excluded) into DataFrames
+            table = io.BufferedReader(ByteRangeReader(f_in, table_start, table_end))
+            read_options = (
+                {"dtype": str, "na_filter": False, "chunksize": chunksize}
+                if chunksize
+                else {
+                    # Specify 'N. riga' and 'N. doc.' as strings
+                    "dtype": {n_riga_col: str, n_doc_col: str},
+                    "float_precision": "round_trip",
+                }
+            )
+            chunks = pd.read_csv(
+                table, delimiter=";", header=None, encoding="utf-8", **read_options
+            )
+            if not chunksize:
+                chunks = [chunks]
+
+            next_n_riga: Optional[int] = None
+            previous_n_doc: Any = None
+            for df in chunks:
+                n_doc: pd.Series = df[n_doc_col]
+                previous = n_doc.shift(1)
+                if previous_n_doc is not None:
+                    previous.iloc[0] = previous_n_doc
+                missing = n_doc.eq("") if chunksize else n_doc.isna()
+
+                # A new series starts where 'N. doc.' differs from the previous row (missing values never match)
+                new_series = n_doc.ne(previous) | missing | previous.isna()
+                if chunksize:
+                    new_series |= previous.eq("")
+                if next_n_riga is None:
+                    next_n_riga = int(df.iloc[0, n_riga_col]) + 1
+
+                n_riga = (next_n_riga - 1 + new_series.cumsum()).astype(str).str.zfill(8)
+                df[n_riga_col] = n_riga.where(new_series, "")
+
+                next_n_riga += int(new_series.sum())
+                previous_n_doc = n_doc.iloc[-1]
+
+                # Write the processed rows to the output CSV, excluding the header
+                group_keys = n_doc.fillna("")
+                for start in range(0, len(df), _CSV_BLOCK_ROWS):
+                    block = df.iloc[start : start + _CSV_BLOCK_ROWS]
+                    out_csv.write_text(
+                        block.to_csv(sep=";", index=False, header=False, lineterminator="\n"),
+                        group_keys.iloc[start : start + _CSV_BLOCK_ROWS].tolist(),
+                    )
 
-    # Read the original CSV file, excluding the last row
-    with open(input_csv, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    # The last line to be added separately at the end of the output
-    last_line = lines[-1]
-
-    # Write the header lines (first 12 lines) to the output CSV as plain text
-    with open(output_csv, "w", encoding="utf-8") as out_csv:
-        out_csv.writelines(lines[:12])  # First 12 lines are considered the header
-
-    # Exclude the header and the last line, load the table data into a DataFrame
-    df: pd.DataFrame = pd.read_csv(
-        input_csv,
-        delimiter=";",
-        header=None,
-        skiprows=12,
-        skipfooter=1,
-        engine="python",
-        dtype={
-            1: str,
-            11: str,
-        },  # Specify 'N. riga' and 'N. doc.' as strings
-    )
+        # Append the last line as plain text to the output CSV
+        out_csv.write_text(last_line)
 
-    # Initialize variables to track 'N. riga' column
-    last_n_riga: Any = None
-    current_n_riga: Any = None
-
-    # Process the DataFrame starting from row 13 (index 0 after skiprows)
-    for i in range(len(df)):
-        n_doc = df.iloc[i, 11]  # 'N. doc.' column
-        if i == 0 or n_doc != df.iloc[i - 1, 11]:  # New series detected
-            # If not the first series, increment and set new 'N. riga' value
-            if i == 0 or last_n_riga is not None:
-                current_n_riga = str(
-                    int(last_n_riga if last_n_riga else df.iloc[i, 1]) + 1
-                ).zfill(
-                    8
-                )  # Increment 'N. riga'
-            else:
-                current_n_riga = df.iloc[i, 1]  # The first entry remains unchanged
+    logger.info(f"CSV file successfully generated: {output_csv}")
 
-            last_n_riga = current_n_riga  # Update last 'N. riga'
-            df.iloc[i, 1] = current_n_riga  # Set the new value for 'N. riga'
-        else:
-            # Same series, set 'N. riga' as empty
-            df.iloc[i, 1] = ""
 
-    # Write the processed DataFrame to the output CSV, excluding the header
-    df.to_csv(
-        output_csv, sep=";", index=False, header=False, mode="a", encoding="utf-8"
-    )
+def excel_to_columns(
+    input_file_excel: str,
+    output_file_columns: str,
+    header_rows: int = 12,
+    engine: str = EXTRACT_ENGINE_OPENPYXL,
+) -> None:
+    """
+    Converts the original Excel file into a typed columnar file (see columnar_store), the binary alternative to
+    excel_to_csv(): the values keep their type (numbers, dates, strings) instead of being written as text.
+
+    Args:
+        input_file_excel (str): Path to the input Excel file.
+        output_file_columns (str): Path to the output columnar file.
+        header_rows (int): Number of rows at the top of the sheet kept as header rows.
+        engine (str): Extraction engine, "openpyxl" or "xml" (see excel_to_csv()).
+    """
+    rows, wb = _open_sheet_rows(input_file_excel, engine)
+    with ColumnStoreWriter(output_file_columns, header_rows) as writer:
+        while True:
+            chunk = list(islice(rows, 10000))
+            if not chunk:
+                break
+            writer.write_rows(chunk)
 
-    # Append the last line as plain text to the output CSV
-    with open(output_csv, "a", encoding="utf-8") as out_csv:
-        out_csv.write(last_line)
+    if wb is not None:
+        wb.close()
 
-    logger.info(f"CSV file successfully generated: {output_csv}")
+    logger.info("Columnar file created: %s", output_file_columns)
 
 
-def copy_header_and_style(
-    model_xlsx_path: str, target_sheet: Worksheet, header_rows: int
+def process_columns(
+    input_columns: str,
+    output_columns: str,
+    header_lines: int = 12,
 ) -> None:
     """
-    Copies the header and formatting from the original Excel file to the new output file.
+    Processes a columnar file like process_csv() processes a CSV file: the first row of each 'N. doc.' series
+    gets the next 'N. riga' number (starting from the 'N. riga' of the first row + 1), the other rows get an
+    empty 'N. riga', and the last row (the footer of the table) is left unchanged.
+
+    The series are found on the dictionary codes of the 'N. doc.' column and the new 'N. riga' column is built
+    as codes into the list of the new numbers, without converting the values of the rows. The other columns are
+    copied from the memory mapped input file as they are.
+
+    Parameters:
+    - input_columns (str): Path to the input columnar file.
+    - output_columns (str): Path where the processed columnar file will be saved.
+    - header_lines (int): Number of header rows of the input file.
+    """
+    n_riga_col, n_doc_col = 1, N_DOC_COLUMN
+    store = ColumnStore(input_columns)
+    if len(store.header_rows) != header_lines:
+        raise ValueError(
+            f"{input_columns} has {len(store.header_rows)} header rows, {header_lines} expected"
+        )
+
+    columns = list(store.columns)
+    table_rows = store.row_count - 1  # The last row is the footer
+    if table_rows > 0 and n_riga_col < len(columns):
+        new_series = group_starts(store.columns[n_doc_col].group_codes()[:table_rows])
+        first_n_riga = int(store.columns[n_riga_col].values(0, 1)[0]) + 1
+        series_count = int(new_series.sum())
+
+        codes = np.full(store.row_count, -1, dtype=np.int32)
+        codes[:table_rows][new_series] = np.arange(series_count, dtype=np.int32)
+        footer_n_riga = store.columns[n_riga_col].values(table_rows, store.row_count)[0]
+        columns[n_riga_col] = Column(
+            KIND_STRING,
+            store.row_count,
+            {"codes": codes},
+            [f"{first_n_riga + index:08d}" for index in range(series_count)],
+            {} if footer_n_riga is None else {table_rows: footer_n_riga},
+        )
+
+    write_columns(output_columns, store.header_rows, store.row_count, columns)
+    logger.info("Columnar file successfully generated: %s", output_columns)
+
+
+def export_columns_csv(
+    input_columns: str, output_file_csv: str, delimiter: str = ";"
+) -> None:
+    """
+    Exports a columnar file as a CSV file, with its row index. The values are written like excel_to_csv()
+    writes them, so the export of an extracted columnar file is the CSV excel_to_csv() writes.
 
     Args:
-        model_xlsx_path (str): Path to the Excel file used as a model for formatting.
+        input_columns (str): Path to the columnar file.
+        output_file_csv (str): Path to the output CSV file.
+        delimiter (str): CSV delimiter.
+    """
+    store = ColumnStore(input_columns)
+    with IndexedCsvWriter(
+        output_file_csv, N_DOC_COLUMN, delimiter=delimiter, header_rows=len(store.header_rows)
+    ) as writer:
+        writer.write_rows(store.header_rows)
+        rows = store.rows()
+        while True:
+            chunk = list(islice(rows, 10000))
+            if not chunk:
+                break
+            writer.write_rows(chunk)
+
+    logger.info("CSV file exported: %s", output_file_csv)
+
+
+def copy_header_and_style(model_template: ModelTemplate, target_sheet: Worksheet) -> None:
+    """
+    Copies the header and formatting from the model template to the new output file.
+
+    Args:
+        model_template (ModelTemplate): The compiled model Excel file used for formatting.
         target_sheet (Worksheet): The target sheet where the header and styles will be copied.
-        header_rows (int): Number of header rows to copy.
     """
-    wb = load_workbook(model_xlsx_path)
-    sheet = wb.active
+    styles_cache = style_cache(target_sheet)
 
-    # Copy the header rows (based on header_rows)
-    for row_index in range(1, header_rows + 1):
-        for col_index in range(1, sheet.max_column + 1):
-            cell = sheet.cell(row=row_index, column=col_index)
-            new_cell = target_sheet.cell(
-                row=row_index, column=col_index, value=cell.value
-            )
+    # Copy the header rows with their formatting
+    for row_index, (values, styles) in enumerate(
+        zip(model_template.header_values, model_template.header_styles), 1
+    ):
+        for col_index, (value, style) in enumerate(zip(values, styles), 1):
+            new_cell = target_sheet.cell(row=row_index, column=col_index, value=value)
+            styles_cache.apply(new_cell, style)
 
-            # Copy cell formatting
-            if cell.has_style:
-                new_cell.font = copy(cell.font)
-                new_cell.fill = copy(cell.fill)
-                new_cell.border = copy(cell.border)
-                new_cell.alignment = copy(cell.alignment)
-
-            # Copy column widths
-            if col_index <= sheet.max_column:
-                col_letter = get_column_letter(col_index)
-                target_sheet.column_dimensions[col_letter].width = (
-                    sheet.column_dimensions[col_letter].width
-                )
+    # Copy column widths
+    for col_letter, width in model_template.column_widths.items():
+        target_sheet.column_dimensions[col_letter].width = width
 
 
 def format_value(value) -> str | int | float:
     """
     Applies the desired format to date strings in the format 'YYYY-MM-DD HH:MM:SS'.
-    Also converts valid numeric strings to floats or integers.
 
     Args:
         value (str or any): The value to format.
 
     Returns:
-        str or int or float: The formatted date as 'DD/MM/YYYY' if valid,
-                             a number if valid, otherwise returns the original value.
+        str or int or float: The formatted date as 'DD/MM/YYYY' if valid, otherwise the original value.
     """
     if isinstance(value, str):
-        # Attempt to convert the string to a datetime object
-        try:
-            parsed_date = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-            return parsed_date.strftime("%d/%m/%Y")  # Format date as 'DD/MM/YYYY'
-        except ValueError:
-            return value  # Return the original value if not a string
+        return convert_date(value)
+    return value  # Return non-string values unchanged
+
+
+def format_row(row: List) -> List:
+    """Applies format_value to every value of a row read from the CSV."""
+    return [format_value(value) for value in row]
 
 
 def copy_style(
@@ -211,109 +492,970 @@ def copy_style(
     """
     source_cell = source_sheet.cell(row=source_row, column=source_col)
 
-    # Copy the style if it exists
-    if source_cell.has_style:
-        target_cell.font = copy(source_cell.font)
-        target_cell.fill = copy(source_cell.fill)
-        target_cell.border = copy(source_cell.border)
-        target_cell.alignment = copy(source_cell.alignment)
-        target_cell.number_format = source_cell.number_format
+    # Copy the style if it exists, each distinct source style is registered in the target workbook once
+    style_cache(target_cell.parent).copy_cell_style(source_cell, target_cell)
 
 
 def apply_alternating_styles_and_dimensions(
-    model_xlsx_path: str,
+    model_template: ModelTemplate,
     new_sheet: Worksheet,
     table_start_row: int,
-    row_ref_odd: int,
-    row_ref_even: int,
 ) -> None:
     """
-    Applies the style and dimensions from specific rows of the original Excel file to odd and even rows.
+    Applies the style and dimensions of the odd and even reference rows of the model to the data rows.
 
     Args:
-        model_xlsx_path (str): Path to the Excel file used as a model for formatting.
+        model_template (ModelTemplate): The compiled model Excel file used for formatting.
         new_sheet (Worksheet): The target sheet where the styles and dimensions will be applied.
         table_start_row (int): The first row of the data table.
-        row_ref_odd (int): The row number to use as a style reference for odd rows.
-        row_ref_even (int): The row number to use as a style reference for even rows.
     """
-    wb = load_workbook(model_xlsx_path)
-    sheet = wb.active
-
-    max_col = sheet.max_column
-
-    for row_index in range(table_start_row, new_sheet.max_row + 1):
-        if row_index % 2 == 1:
-            source_row = row_ref_odd
-        else:
-            source_row = row_ref_even
+    max_row = new_sheet.max_row
+    styles_cache = style_cache(new_sheet)
 
+    for row_index in range(table_start_row, max_row + 1):
         # Copy cell styles
-        for col_index in range(1, max_col + 1):
+        for col_index, style in enumerate(model_template.row_styles(row_index), 1):
             target_cell = new_sheet.cell(row=row_index, column=col_index)
-            copy_style(sheet, target_cell, source_row, col_index)
+            styles_cache.apply(target_cell, style)
 
         # Copy row height
-        new_sheet.row_dimensions[row_index].height = sheet.row_dimensions[
-            source_row
-        ].height
+        new_sheet.row_dimensions[row_index].height = model_template.row_height(
+            row_index
+        )
 
     # Copy column widths (based on rows used for style)
-    for col_index in range(1, max_col + 1):
-        col_letter = get_column_letter(col_index)
-        new_sheet.column_dimensions[col_letter].width = sheet.column_dimensions[
-            col_letter
-        ].width
+    for col_letter, width in model_template.column_widths.items():
+        new_sheet.column_dimensions[col_letter].width = width
 
     # Copy merged cell structure
-    for merged_range in sheet.merged_cells.ranges:
-        new_sheet.merge_cells(str(merged_range))
-
-    # Get all merged cells in row_ref_odd as a reference for merging
-    for merged_range in sheet.merged_cells.ranges:
-        if merged_range.min_row == row_ref_odd:
-            start_col, end_col = merged_range.min_col, merged_range.max_col
-            for row_index in range(table_start_row, new_sheet.max_row + 1):
-                new_sheet.merge_cells(
+    for merged_range in model_template.merged_ranges:
+        new_sheet.merge_cells(merged_range)
+
+    # Repeat the merged cells of the odd reference row on every data row
+    merge_row_spans(new_sheet, model_template.row_merge_spans, table_start_row, max_row)
+
+
+def _row_cell_range(span_range: CellRange, row_index: int) -> CellRange:
+    """
+    Returns a copy of a single-row range moved to the given row. The bounds of a CellRange are validated by
+    descriptors on every assignment, which costs more than the merge itself: the copy bypasses them.
+    """
+    cell_range = CellRange.__new__(CellRange)
+    cell_range.__dict__.update(span_range.__dict__, min_row=row_index, max_row=row_index)
+    return cell_range
+
+
+def _merge_style_key(cell: Optional[Cell]) -> Optional[Tuple]:
+    if cell is None:
+        return None
+    return tuple(cell._style) if cell._style is not None else ()
+
+
+def merge_row_spans(
+    sheet: Worksheet,
+    row_merge_spans: List[Tuple[int, int]],
+    first_row: int,
+    last_row: int,
+) -> None:
+    """
+    Merges the given column spans on every row from first_row to last_row, with the same result as calling
+    sheet.merge_cells() for each row.
+
+    merge_cells() checks every new range against all the merged ranges of the sheet, so merging row by row costs
+    more and more as the table grows. Here the ranges are added to the sheet as a batch, and the styles that a
+    merge gives to its cells (the borders of the edges) are computed once for each distinct pair of start and end
+    cell styles, then copied to the cells of the other rows.
+
+    Args:
+        sheet (Worksheet): The sheet where the cells are merged.
+        row_merge_spans (List[Tuple[int, int]]): (start_col, end_col) of the merges repeated on every row.
+        first_row (int): First row to merge.
+        last_row (int): Last row to merge.
+    """
+    ranges = sheet.merged_cells.ranges
+    cells = sheet._cells
+
+    for start_col, end_col in row_merge_spans:
+        span_range = CellRange(min_col=start_col, min_row=1, max_col=end_col, max_row=1)
+        merged_styles: Dict[Tuple, List] = {}
+        for row_index in range(first_row, last_row + 1):
+            key = (
+                _merge_style_key(cells.get((row_index, start_col))),
+                _merge_style_key(cells.get((row_index, end_col))),
+            )
+            styles = merged_styles.get(key)
+            if styles is None:
+                # First row with these styles: merge it the regular way and keep the resulting styles
+                sheet.merge_cells(
                     start_row=row_index,
                     start_column=start_col,
                     end_row=row_index,
                     end_column=end_col,
                 )
-
-
-def apply_last_row_format(
-    model_xlsx_path: str, new_sheet: Worksheet, model_last_row: int = 45
-) -> None:
+                merged_styles[key] = [
+                    copy(cells[row_index, col_index]._style)
+                    for col_index in range(start_col, end_col + 1)
+                ]
+                continue
+
+            start_cell = cells.get((row_index, start_col))
+            if start_cell is None:
+                start_cell = sheet.cell(row=row_index, column=start_col)
+            start_cell._style = copy(styles[0])
+            for col_index in range(start_col + 1, end_col + 1):
+                merged_cell = MergedCell(sheet, row=row_index, column=col_index)
+                merged_cell._style = copy(styles[col_index - start_col])
+                cells[row_index, col_index] = merged_cell
+            ranges.add(_row_cell_range(span_range, row_index))
+
+
+def apply_last_row_format(model_template: ModelTemplate, new_sheet: Worksheet) -> None:
     """
-    Applies the formatting from a specific row (default is row 45) in the model Excel file
-    to the last row of the provided worksheet.
+    Applies the formatting of the last row of the model template to the last row of the provided worksheet.
 
     This function is designed to format only the last row of the new_sheet by copying cell
-    styles (e.g., font, border, fill, number format, alignment) from the specified row in the
-    model Excel file.
+    styles (e.g., font, border, fill, number format, alignment) from the model last row.
 
-    :param model_xlsx_path: Path to the model Excel file from which to copy the row formatting.
+    :param model_template: The compiled model Excel file used for formatting.
     :param new_sheet: The worksheet to which the formatting will be applied.
-    :param model_last_row: The row number in the model Excel file to copy styles from. Defaults to 45.
 
     :return: None
     """
-    # Load the model Excel file and the last generated Excel file
-    model_wb = load_workbook(model_xlsx_path)
-    model_ws = model_wb.active
-
     # Get the last row of the output file
     last_row_output = new_sheet.max_row
 
-    max_col = model_ws.max_column
-
     # Copy cell styles
-    for col_index in range(1, max_col + 1):
+    styles_cache = style_cache(new_sheet)
+    for col_index, style in enumerate(model_template.last_styles, 1):
         target_cell = new_sheet.cell(row=last_row_output, column=col_index)
-        copy_style(model_ws, target_cell, model_last_row, col_index)
+        styles_cache.apply(target_cell, style)
+
+
+def _is_last_part(is_last_part: Union[bool, Callable[[], bool]]) -> bool:
+    """
+    Resolves the is_last_part argument of the part writers, which is a callable when the split rolls over to new
+    files: whether a part is the last one is only known once its rows have been read.
+    """
+    return is_last_part() if callable(is_last_part) else is_last_part
+
+
+def write_part(
+    model_template: ModelTemplate,
+    rows: Iterable[List],
+    output_file_path: str,
+    table_start_row: int,
+    is_last_part: Union[bool, Callable[[], bool]],
+    timestamp: datetime,
+    convert_row: Callable[[List], List] = format_row,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> str:
+    """
+    Builds and saves a single output Excel file with the header, the given data rows and the model formatting.
+    This function runs either in the main process or in a worker process of the pool.
+
+    Args:
+        model_template (ModelTemplate): The compiled model Excel file used for formatting.
+        rows (Iterable[List]): The data rows of this part, as read from the source.
+        output_file_path (str): Path of the Excel file to create.
+        table_start_row (int): Row index where the table data starts.
+        is_last_part (Union[bool, Callable[[], bool]]): If True, the last row is formatted as the model last row.
+        timestamp (datetime): Timestamp of the run, used to make the output reproducible.
+        convert_row (Callable[[List], List]): Converts a source row into the values to write.
+        compression_level (Optional[int]): Zip compression level of the file (see workbook_saver).
+        bundle (Optional[BundleArchive]): If given, the file is streamed into this archive instead of written.
+
+    Returns:
+        str: The path of the created Excel file.
+    """
+    new_wb = Workbook()
+    new_sheet = new_wb.active
+
+    with measure_stage(STAGE_FILL, part=output_file_path) as fill_record:
+        # Copy the header from the original Excel file
+        copy_header_and_style(model_template, new_sheet)
+
+        row_count = 0
+        for row_offset, row in enumerate(rows):
+            for col_index, cell_value in enumerate(convert_row(row), 1):
+                new_sheet.cell(
+                    row=table_start_row + row_offset,
+                    column=col_index,
+                    value=cell_value,
+                )
+            row_count += 1
+        fill_record["rows"] = row_count
+
+    with measure_stage(STAGE_STYLE, part=output_file_path, rows=row_count):
+        # Apply alternating styles and dimensions
+        apply_alternating_styles_and_dimensions(model_template, new_sheet, table_start_row)
+
+        if row_count and _is_last_part(is_last_part):
+            apply_last_row_format(
+                model_template=model_template,
+                new_sheet=new_sheet,
+            )
+
+    with measure_stage(STAGE_SAVE, part=output_file_path, rows=row_count) as save_record:
+        save_workbook(new_wb, output_file_path, timestamp, compression_level, bundle)
+        save_record["outputs"] = [output_file_path]
+    return output_file_path
+
+
+def _layout_row(
+    sheet: WriteOnlyWorksheet, layout: RowLayout, values: List
+) -> List[Optional[WriteOnlyCell]]:
+    """Builds the cells of a streamed row from its values and its precomputed layout."""
+    styles_cache = style_cache(sheet)
+    cells: List[Optional[WriteOnlyCell]] = []
+    for col_index in range(max(len(values), len(layout.styles))):
+        style = layout.styles[col_index] if col_index < len(layout.styles) else None
+        merged = col_index < len(layout.merged) and layout.merged[col_index]
+        value = None if merged or col_index >= len(values) else values[col_index]
+        if value is None and style is None:
+            cells.append(None)
+            continue
+        cell = WriteOnlyCell(sheet, value=value)
+        styles_cache.apply(cell, style)
+        cells.append(cell)
+    return cells
+
+
+def write_part_streaming(
+    model_template: ModelTemplate,
+    rows: Iterable[List],
+    output_file_path: str,
+    table_start_row: int,
+    is_last_part: Union[bool, Callable[[], bool]],
+    timestamp: datetime,
+    convert_row: Callable[[List], List] = format_row,
+    sheet_layout: Optional[SheetLayout] = None,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> str:
+    """
+    Builds and saves a single output Excel file like write_part(), using an openpyxl write-only workbook.
+    Column widths and merged ranges are set up front and every row is appended once, with its value and its
+    precomputed style, so the memory used does not depend on the number of rows of the part.
+
+    Args:
+        model_template (ModelTemplate): The compiled model Excel file used for formatting.
+        rows (Iterable[List]): The data rows of this part, as read from the source.
+        output_file_path (str): Path of the Excel file to create.
+        table_start_row (int): Row index where the table data starts.
+        is_last_part (Union[bool, Callable[[], bool]]): If True, the last row is formatted as the model last row.
+        timestamp (datetime): Timestamp of the run, used to make the output reproducible.
+        convert_row (Callable[[List], List]): Converts a source row into the values to write.
+        sheet_layout (Optional[SheetLayout]): Precomputed row layout (computed from the template if missing).
+        compression_level (Optional[int]): Zip compression level of the file (see workbook_saver).
+        bundle (Optional[BundleArchive]): If given, the file is streamed into this archive instead of written.
+
+    Returns:
+        str: The path of the created Excel file.
+    """
+    if sheet_layout is None:
+        sheet_layout = compile_sheet_layout(model_template, table_start_row)
+
+    new_wb = Workbook(write_only=True)
+    new_sheet = new_wb.create_sheet()
+
+    # Column widths and the model merged ranges must be set before writing the rows
+    for col_letter, width in model_template.column_widths.items():
+        new_sheet.column_dimensions[col_letter].width = width
+    for merged_range in model_template.merged_ranges:
+        new_sheet.merged_cells.add(merged_range)
+    span_ranges = [
+        CellRange(min_col=start_col, min_row=1, max_col=end_col, max_row=1)
+        for start_col, end_col in model_template.row_merge_spans
+    ]
+
+    # Rows are written with their styles, so the fill stage includes the styling
+    with measure_stage(STAGE_FILL, part=output_file_path) as fill_record:
+        # Header rows
+        for row_index in range(1, table_start_row):
+            values = (
+                model_template.header_values[row_index - 1]
+                if row_index <= model_template.header_rows
+                else []
+            )
+            new_sheet.append(
+                _layout_row(new_sheet, sheet_layout.row_layout(row_index), values)
+            )
+
+        # Data rows, the last row of the last part gets the model last row format
+        row_index = table_start_row - 1
+        rows_iterator = iter(rows)
+        row = next(rows_iterator, None)
+        while row is not None:
+            next_row = next(rows_iterator, None)
+            row_index += 1
+            layout = sheet_layout.row_layout(
+                row_index, is_last_row=next_row is None and _is_last_part(is_last_part)
+            )
+
+            if layout.height is not None:
+                new_sheet.row_dimensions[row_index].height = layout.height
+            new_sheet.append(
+                _layout_row(new_sheet, layout, convert_row(row))
+            )
+            if layout.height is not None:
+                del new_sheet.row_dimensions[row_index]  # Already written
+
+            for span_range in span_ranges:
+                new_sheet.merged_cells.ranges.add(_row_cell_range(span_range, row_index))
+            row = next_row
+        fill_record["rows"] = row_index - table_start_row + 1
+
+    with measure_stage(STAGE_SAVE, part=output_file_path, rows=fill_record["rows"]) as save_record:
+        save_workbook(new_wb, output_file_path, timestamp, compression_level, bundle)
+        save_record["outputs"] = [output_file_path]
+    return output_file_path
+
+
+def _make_part_writer(
+    model_template: ModelTemplate,
+    table_start_row: int,
+    engine: str,
+    convert_row: Callable[[List], List],
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> Callable[..., str]:
+    """
+    Returns the part writer of the given output engine, bound to the arguments shared by all the parts.
+    The returned callable can be sent to the worker processes, unless it writes to a bundle archive.
+    """
+    if engine not in OUTPUT_ENGINES:
+        raise ValueError(f"Unknown output engine: {engine}")
+
+    part_writer = partial(
+        write_part_streaming if engine == OUTPUT_ENGINE_WRITE_ONLY else write_part,
+        model_template,
+        table_start_row=table_start_row,
+        timestamp=run_timestamp(),
+        convert_row=convert_row,
+        compression_level=compression_level,
+    )
+    if bundle is not None:
+        part_writer.keywords["bundle"] = bundle
+    if engine == OUTPUT_ENGINE_WRITE_ONLY:
+        part_writer.keywords["sheet_layout"] = compile_sheet_layout(
+            model_template, table_start_row
+        )
+    return part_writer
+
+
+def _output_file_path(output_folder: str, product_name: str, file_number: int) -> str:
+    return os.path.join(output_folder, f"{product_name}_{file_number}.xlsx")
+
+
+def _output_file_paths(output_folder: str, product_name: str, N: int) -> List[str]:
+    return [
+        _output_file_path(output_folder, product_name, file_index + 1)
+        for file_index in range(N)
+    ]
+
+
+def _remove_stale_parts(output_folder: str, product_name: str, part_count: int) -> None:
+    """
+    Removes the output files of a previous run numbered above the last part of the split (e.g. a rolling split
+    that now needs fewer files), so that the output folder only holds the files of the current split.
+    """
+    part_name = re.compile(re.escape(product_name) + r"_([0-9]+)\.xlsx")
+    for file_name in os.listdir(output_folder):
+        match = part_name.fullmatch(file_name)
+        if match is not None and int(match.group(1)) > part_count:
+            os.remove(os.path.join(output_folder, file_name))
+            logger.info("Stale output file removed: %s", os.path.join(output_folder, file_name))
+
+
+def _split_params(
+    N: int,
+    table_start_row: int,
+    header_rows: int,
+    row_ref_odd: int,
+    row_ref_even: int,
+    engine: str,
+    split_strategy: str,
+    group_column: int,
+    max_rows_per_part: Optional[int],
+    max_bytes_per_part: Optional[int],
+    compression_level: Optional[int],
+    footer_row: bool,
+) -> Dict[str, Any]:
+    """Returns the parameters of the split that affect the content of the output files."""
+    return {
+        "N": N,
+        "table_start_row": table_start_row,
+        "header_rows": header_rows,
+        "row_ref_odd": row_ref_odd,
+        "row_ref_even": row_ref_even,
+        "engine": engine,
+        "split_strategy": split_strategy,
+        "group_column": group_column,
+        "max_rows_per_part": max_rows_per_part,
+        "max_bytes_per_part": max_bytes_per_part,
+        "compression_level": compression_level,
+        "footer_row": footer_row,
+    }
+
+
+def _plan_part_sizes(
+    total_rows: int,
+    N: int,
+    split_strategy: str,
+    load_group_sizes: Callable[[], Sequence[int]],
+    tolerance: float,
+    footer_row: bool = True,
+) -> List[int]:
+    """
+    Returns the number of data rows of each output file for the given split strategy. With the groups strategy,
+    load_group_sizes is called to get the group index: the size of every group of data rows, in order.
+
+    The footer row of the table (the last row, when footer_row is set) is not a group of its own: the groups are
+    balanced without it and it is added to the last part. The trailing empty parts are dropped, so fewer than N
+    files are created when there are fewer groups (or rows) than parts; at least one file is always created.
+    """
+    if split_strategy == SPLIT_STRATEGY_ROWS:
+        return _drop_empty_parts(even_part_sizes(total_rows, N))
+    if split_strategy != SPLIT_STRATEGY_GROUPS:
+        raise ValueError(f"Unknown split strategy: {split_strategy}")
+
+    sizes = load_group_sizes()
+    # A footer row with a key of its own is a group of one row
+    footer_group = footer_row and len(sizes) > 0 and sizes[-1] == 1
+    part_sizes = _drop_empty_parts(balance_groups(sizes[:-1] if footer_group else sizes, N))
+    imbalance = max_imbalance(part_sizes)
+    if footer_group:
+        part_sizes[-1] += 1
+    logger.info("%d groups balanced in parts of %s rows", len(sizes), part_sizes)
+    if imbalance > tolerance:
+        logger.warning(
+            "Part sizes differ by up to %.0f%% from the average, more than the tolerance of %.0f%%: "
+            "some groups are too large to be balanced",
+            imbalance * 100,
+            tolerance * 100,
+        )
+    return part_sizes
+
+
+def _drop_empty_parts(part_sizes: List[int]) -> List[int]:
+    """Drops the trailing empty parts of a split, keeping at least one part."""
+    part_count = len(part_sizes)
+    while part_count > 1 and not part_sizes[part_count - 1]:
+        part_count -= 1
+    if part_count < len(part_sizes):
+        logger.warning(
+            "Only %d of the %d parts have rows, the empty parts are not created", part_count, len(part_sizes)
+        )
+    return part_sizes[:part_count]
+
+
+def _part_count(part_sizes: List[int]) -> int:
+    """Returns the number of parts up to the last non-empty one."""
+    part_count = len(part_sizes)
+    while part_count and not part_sizes[part_count - 1]:
+        part_count -= 1
+    return part_count
+
+
+def _rollover_group_column(split_strategy: str, group_column: int) -> Optional[int]:
+    """Returns the group column that the files of a rolling split must not divide, if any."""
+    if split_strategy not in SPLIT_STRATEGIES:
+        raise ValueError(f"Unknown split strategy: {split_strategy}")
+    return group_column if split_strategy == SPLIT_STRATEGY_GROUPS else None
+
+
+def _csv_group_keys(source_csv_file: str, header_rows: int, column: int) -> Iterator:
+    """Streams the group key of every data row of a CSV file."""
+    with open(source_csv_file, mode="r", newline="", encoding="utf-8") as f:
+        for row in islice(csv.reader(f, delimiter=";"), header_rows, None):
+            yield row[column] if column < len(row) else None
 
-    model_wb.close()
+
+def _csv_group_sizes(source_csv_file: str, header_rows: int, column: int) -> Sequence[int]:
+    """
+    Returns the size of every group of data rows of a CSV file, from the row index of the CSV if it indexes the
+    same column, otherwise by streaming the group key of every data row.
+    """
+    row_index = load_row_index(source_csv_file)
+    if row_index is not None and row_index.group_column == column:
+        return row_index.group_sizes(header_rows)
+    return group_sizes(_csv_group_keys(source_csv_file, header_rows, column))
+
+
+def _start_split_stage(
+    manifest: Optional[RunManifest],
+    inputs: List[str],
+    params: Dict[str, Any],
+    output_paths: List[str],
+    stage: str = SPLIT_STAGE,
+) -> bool:
+    """
+    Starts the split stage in the manifest, and returns True if all its output files are already up to date.
+    When the output files are not known in advance (output_paths is empty), they are checked one by one.
+    """
+    if manifest is None:
+        return False
+    manifest.start_stage(stage, inputs, params)
+    if output_paths and all(manifest.is_output_current(stage, path) for path in output_paths):
+        logger.info("All the output files are up to date, nothing to split.")
+        return True
+    return False
+
+
+# Output file path, its rows, and whether it is the last part (possibly known only once its rows have been read).
+# The rows are an iterator over the shared source stream, or an iterable reading its own slice of the source.
+SplitPart = Tuple[str, Iterable[List], Union[bool, Callable[[], bool]]]
+
+
+def _fixed_parts(
+    rows: Iterator[List], part_sizes: List[int], output_paths: List[str]
+) -> Iterator[SplitPart]:
+    """Yields the parts of a split into a fixed number of files, with the given number of rows in each file."""
+    N = len(output_paths)
+    for file_index, (path, part_size) in enumerate(zip(output_paths, part_sizes)):
+        yield path, islice(rows, part_size), file_index == N - 1
+
+
+def _slice_parts(
+    slice_rows: Callable[[int, int], Iterable[List]],
+    part_sizes: List[int],
+    output_paths: List[str],
+) -> Iterator[SplitPart]:
+    """
+    Yields the parts of a split into a fixed number of files as slices of a source with random access (an indexed
+    CSV file or a columnar file): slice_rows(start, end) returns the data rows [start, end), read by the process
+    writing the part.
+    """
+    N = len(output_paths)
+    start_row = 0
+    for file_index, (path, part_size) in enumerate(zip(output_paths, part_sizes)):
+        yield path, slice_rows(start_row, start_row + part_size), file_index == N - 1
+        start_row += part_size
+
+
+def _rollover_parts(
+    rows: Iterator[List],
+    output_folder: str,
+    product_name: str,
+    max_rows: Optional[int],
+    max_bytes: Optional[int],
+    group_column: Optional[int],
+    footer_row: bool = True,
+) -> Iterator[SplitPart]:
+    """
+    Yields the parts of a split that rolls over to a new file when a file reaches max_rows rows or an estimated
+    size of max_bytes. At least one file is created, and the footer row never rolls over to a file of its own.
+    The rows of a part must be read before the next part.
+    """
+    stream = RowStream(rows)
+    file_number = 0
+    while file_number == 0 or not stream.exhausted:
+        file_number += 1
+        yield (
+            _output_file_path(output_folder, product_name, file_number),
+            take_part(stream, max_rows, max_bytes, group_column, footer_row),
+            lambda: stream.exhausted,
+        )
+
+
+def _without_footer(parts: Iterable[SplitPart]) -> Iterator[SplitPart]:
+    """Yields the parts of a source without a footer row: the last row of the last part is a data row."""
+    for path, part_rows, _ in parts:
+        yield path, part_rows, False
+
+
+def _converted_row(row: List) -> List:
+    """Row conversion of the part writer when the rows are already converted by the pipeline."""
+    return row
+
+
+def _log_bundle_split(workers: int) -> None:
+    """
+    Logs the settings of a split into a bundle archive. The parts are written one after the other into the archive
+    by the calling process, and the archive is rebuilt as a whole: its entries cannot be checked or skipped like
+    separate files.
+    """
+    if workers > 1:
+        logger.warning("The output files of a bundle archive are built serially, ignoring workers=%d.", workers)
+    logger.info("The bundle archive is always rebuilt in full, the run manifest does not apply to its files.")
+
+
+def _log_column_types(column_types: List[ColumnType]) -> None:
+    logger.info("Column types: %s", ", ".join(column_type.value for column_type in column_types))
+
+
+def _pipeline_parts(
+    pipeline: ExitStack,
+    parts: Iterable[SplitPart],
+    convert_row: Callable[[List], List],
+    pipeline_depth: int,
+    workers: int,
+) -> Tuple[Iterable[SplitPart], Callable[[List], List]]:
+    """
+    Returns the parts and the row conversion of the part writer. In pipelined mode with serial writing, the parts
+    are cut and their rows converted by a converter thread (stopped when the pipeline stack is closed), and the part
+    writer gets rows already converted. The worker processes convert the rows of their parts themselves.
+    """
+    if not pipeline_depth or workers > 1:
+        return parts, convert_row
+    parts = pipeline.enter_context(closing(convert_parts(parts, convert_row, pipeline_depth)))
+    return parts, _converted_row
+
+
+def _split_rows(
+    parts: Iterable[SplitPart],
+    N: Optional[int],
+    part_writer: Callable[..., str],
+    workers: int,
+    manifest: Optional[RunManifest] = None,
+    stage: str = SPLIT_STAGE,
+) -> int:
+    """
+    Writes the parts of a split with part_writer, and returns the number of parts of the split (written or
+    skipped). N is the number of parts, if known in advance.
+
+    Serially, the rows are fed straight from the stream into the part being written. With workers > 1 the rows
+    of a part are sent to a pool of worker processes as a list: at most one part per worker is kept in memory.
+    Parts that are slices of an indexed CSV file are sent as such, and every worker reads its own rows.
+    With a manifest, the parts that are already up to date are skipped (their rows are read and discarded) and
+    every part is recorded as soon as it is written.
+    """
+    with measure_stage(STAGE_SPLIT, name=stage) as split_record, tqdm(
+        total=N, desc="Splitting files", unit="file"
+    ) as pbar:
+        split_record["outputs"] = []
+        part_count = 0
+
+        def part_done(path: str) -> None:
+            split_record["outputs"].append(path)
+            if manifest is not None:
+                manifest.record_output(stage, path)
+            logger.info("Excel file created: %s", path)
+            pbar.update(1)  # Update progress bar
+
+        def skip_part(path: str, part_rows: Iterable[List]) -> bool:
+            if manifest is None or not manifest.is_output_current(stage, path):
+                return False
+            if isinstance(part_rows, Iterator):
+                deque(part_rows, maxlen=0)  # Move the shared stream to the next part
+            logger.info("Excel file up to date, skipped: %s", path)
+            pbar.update(1)
+            return True
+
+        if workers <= 1:
+            for path, part_rows, is_last_part in parts:
+                part_count += 1
+                if skip_part(path, part_rows):
+                    continue
+                part_done(
+                    part_writer(
+                        rows=part_rows,
+                        output_file_path=path,
+                        is_last_part=is_last_part,
+                    )
+                )
+            return part_count
+
+        max_workers = min(workers, N) if N else workers
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=configure_metrics_worker,
+            initargs=(current_metrics_settings(), SingletonLogger.worker_queue()),
+        ) as executor:
+            pending = set()
+            for path, part_rows, is_last_part in parts:
+                part_count += 1
+                if skip_part(path, part_rows):
+                    continue
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        part_done(future.result())
+                if isinstance(part_rows, Iterator):
+                    part_rows = list(part_rows)
+                pending.add(
+                    executor.submit(
+                        part_writer,
+                        rows=part_rows,
+                        output_file_path=path,
+                        is_last_part=_is_last_part(is_last_part),
+                    )
+                )
+            for future in as_completed(pending):
+                part_done(future.result())
+    return part_count
+
+
+class _RowSource:
+    """
+    Source of the data rows of a split: a CSV file, an input workbook or a columnar file. Every split function only
+    builds its source, the orchestration of the split is shared (see _split_source_to_excel()). The source opens its
+    file when it is first used, after the manifest check, so an up-to-date split does not read it.
+
+    Attributes:
+        path (str): Path of the source file, an input of the split in the manifest.
+        header_rows (int): Number of header rows before the data rows.
+    """
+
+    def __init__(self, path: str, header_rows: int):
+        self.path = path
+        self.header_rows = header_rows
+
+    def count_rows(self) -> int:
+        """Returns the number of data rows."""
+        raise NotImplementedError
+
+    def group_sizes(self, column: int) -> Sequence[int]:
+        """Returns the size of every group of data rows with the same value in the column (the group index)."""
+        raise NotImplementedError
+
+    def slice_factory(self) -> Optional[Callable[[int, int], Iterable[List]]]:
+        """
+        Returns a factory of the slices [start, end) of the data rows, each read by the worker process writing its
+        part, or None if the rows can only be streamed.
+        """
+        return None
+
+    def open_rows(self, stack: ExitStack) -> Tuple[Iterator[List], Callable[[List], List]]:
+        """
+        Opens the stream of the data rows (closed with the stack), and returns it with the row conversion of the
+        column schema inferred from its first rows.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Closes the files kept open by the source."""
+
+
+class _CsvSource(_RowSource):
+    """Data rows of a CSV file, sliced through its row index."""
+
+    def count_rows(self) -> int:
+        return count_csv_rows(self.path) - self.header_rows
+
+    def group_sizes(self, column: int) -> Sequence[int]:
+        return _csv_group_sizes(self.path, self.header_rows, column)
+
+    def slice_factory(self) -> Optional[Callable[[int, int], Iterable[List]]]:
+        row_index = load_row_index(self.path)
+        if row_index is None:
+            return None
+        return lambda start, end: row_index.rows(self.header_rows + start, self.header_rows + end)
+
+    def open_rows(self, stack: ExitStack) -> Tuple[Iterator[List], Callable[[List], List]]:
+        f = stack.enter_context(open(self.path, mode="r", newline="", encoding="utf-8"))
+        reader = csv.reader(f, delimiter=";")
+        next(islice(reader, self.header_rows, self.header_rows), None)  # Skip the header rows
+
+        # Infer the column types from the first data rows, then put them back in the stream
+        sample_rows = list(islice(reader, SCHEMA_SAMPLE_ROWS))
+        column_types = infer_column_types(sample_rows)
+        _log_column_types(column_types)
+        return chain(sample_rows, reader), RowConverter(column_types)
+
+
+class _WorkbookSource(_RowSource):
+    """
+    Data rows of the active sheet of an input workbook, read in read-only mode.
+
+    The read-only sheet takes its number of rows from the dimension declared in the file, which may be missing or
+    stale: the rows past a stale dimension would not be read, and the part sizes would not match the rows read.
+    The last row is counted from the row tags of the sheet instead, and every read stops on it.
+    """
+
+    def __init__(self, path: str, header_rows: int):
+        super().__init__(path, header_rows)
+        self._workbook: Optional[Workbook] = None
+        self._last_row: Optional[int] = None
+
+    @property
+    def sheet(self):
+        if self._workbook is None:
+            self._workbook = load_workbook(self.path, read_only=True)
+        return self._workbook.active
+
+    @property
+    def last_row(self) -> int:
+        if self._last_row is None:
+            self._last_row = count_sheet_rows(self.path)
+            if self.sheet.max_row is not None and self.sheet.max_row != self._last_row:
+                logger.warning(
+                    "%s declares %d rows, %d rows counted", self.path, self.sheet.max_row, self._last_row
+                )
+        return self._last_row
+
+    def count_rows(self) -> int:
+        return max(self.last_row - self.header_rows, 0)  # Exclude the header rows
+
+    def group_sizes(self, column: int) -> Sequence[int]:
+        if self.last_row <= self.header_rows:
+            return []
+        return group_sizes(
+            row[0] if row else None
+            for row in self.sheet.iter_rows(
+                min_row=self.header_rows + 1,
+                max_row=self.last_row,
+                min_col=column + 1,
+                max_col=column + 1,
+                values_only=True,
+            )
+        )
+
+    def open_rows(self, stack: ExitStack) -> Tuple[Iterator[List], Callable[[List], List]]:
+        rows = iter(())
+        if self.last_row > self.header_rows:
+            rows = self.sheet.iter_rows(min_row=self.header_rows + 1, max_row=self.last_row, values_only=True)
+
+        # Infer the column types from the first data rows, then put them back in the stream
+        sample_rows = list(islice(rows, SCHEMA_SAMPLE_ROWS))
+        column_types = infer_native_column_types(sample_rows)
+        _log_column_types(column_types)
+        return chain(sample_rows, rows), NativeRowConverter(column_types)
+
+    def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+class _ColumnsSource(_RowSource):
+    """Data rows of a columnar file, memory mapped."""
+
+    def __init__(self, path: str, header_rows: int):
+        super().__init__(path, header_rows)
+        self._store: Optional[ColumnStore] = None
+
+    @property
+    def store(self) -> ColumnStore:
+        if self._store is None:
+            store = ColumnStore(self.path)
+            if len(store.header_rows) != self.header_rows:
+                raise ValueError(
+                    f"{self.path} has {len(store.header_rows)} header rows, {self.header_rows} expected"
+                )
+            self._store = store
+        return self._store
+
+    def count_rows(self) -> int:
+        return self.store.row_count
+
+    def group_sizes(self, column: int) -> Sequence[int]:
+        return self.store.group_sizes(column)
+
+    def slice_factory(self) -> Optional[Callable[[int, int], Iterable[List]]]:
+        return partial(ColumnSlice, self.path)
+
+    def open_rows(self, stack: ExitStack) -> Tuple[Iterator[List], Callable[[List], List]]:
+        column_types = infer_native_column_types(list(self.store.rows(0, SCHEMA_SAMPLE_ROWS)))
+        _log_column_types(column_types)
+        return self.store.rows(), NativeRowConverter(column_types)
+
+
+def _split_source_to_excel(
+    source: _RowSource,
+    model_xlsx_path: str,
+    output_folder: str,
+    product_name: str,
+    N: int,
+    table_start_row: int,
+    header_rows: int,
+    row_ref_odd: int,
+    row_ref_even: int,
+    workers: int,
+    engine: str,
+    manifest: Optional[RunManifest],
+    stage: str,
+    split_strategy: str,
+    group_column: int,
+    tolerance: float,
+    max_rows_per_part: Optional[int],
+    max_bytes_per_part: Optional[int],
+    pipeline_depth: int,
+    compression_level: Optional[int],
+    bundle: Optional[BundleArchive],
+    footer_row: bool,
+) -> None:
+    """
+    Splits the data rows of a source into Excel files, with the arguments of split_csv_to_excel(): checks the
+    manifest, compiles the model, plans the parts (fixed, sliced or rolling over), runs the pipeline and the part
+    writers, and removes the stale output files. The source is closed at the end.
+    """
+    rollover = bool(max_rows_per_part or max_bytes_per_part)
+    output_paths = [] if rollover else _output_file_paths(output_folder, product_name, N)
+    params = _split_params(
+        None if rollover else N,
+        table_start_row,
+        header_rows,
+        row_ref_odd,
+        row_ref_even,
+        engine,
+        split_strategy,
+        group_column,
+        max_rows_per_part,
+        max_bytes_per_part,
+        compression_level,
+        footer_row,
+    )
+    if bundle is not None:
+        _log_bundle_split(workers)
+        manifest, workers = None, 1
+    with closing(source):
+        if _start_split_stage(manifest, [source.path, model_xlsx_path], params, output_paths, stage):
+            return
+
+        # Compile the model Excel file once for all the output files
+        with measure_stage(STAGE_TEMPLATE_LOAD):
+            model_template = load_model_template(
+                model_xlsx_path,
+                header_rows=header_rows,
+                row_ref_odd=row_ref_odd,
+                row_ref_even=row_ref_even,
+            )
+        if not rollover:
+            part_sizes = _plan_part_sizes(
+                source.count_rows(),
+                N,
+                split_strategy,
+                partial(source.group_sizes, group_column),
+                tolerance,
+                footer_row,
+            )
+            output_paths = output_paths[:len(part_sizes)]
+
+        # With random access to the source, the worker processes read the rows of their parts themselves
+        slice_rows = None if rollover or workers <= 1 else source.slice_factory()
+
+        # The pipeline threads stop reading before the source is closed
+        with ExitStack() as pipeline:
+            rows, convert_row = source.open_rows(pipeline)
+            if pipeline_depth and slice_rows is None:
+                rows = pipeline.enter_context(closing(prefetch_rows(rows, pipeline_depth)))
+            if rollover:
+                parts = _rollover_parts(
+                    rows,
+                    output_folder,
+                    product_name,
+                    max_rows_per_part,
+                    max_bytes_per_part,
+                    _rollover_group_column(split_strategy, group_column),
+                    footer_row,
+                )
+            elif slice_rows is not None:
+                parts = _slice_parts(slice_rows, part_sizes, output_paths)
+            else:
+                parts = _fixed_parts(rows, part_sizes, output_paths)
+            if not footer_row:
+                parts = _without_footer(parts)
+            parts, convert_row = _pipeline_parts(pipeline, parts, convert_row, pipeline_depth, workers)
+            part_writer = _make_part_writer(
+                model_template, table_start_row, engine, convert_row, compression_level, bundle
+            )
+            part_count = _split_rows(
+                parts, len(output_paths) or None, part_writer, workers, manifest, stage
+            )
+            if bundle is None:
+                _remove_stale_parts(output_folder, product_name, part_count)
 
 
 def split_csv_to_excel(
@@ -326,11 +1468,58 @@ def split_csv_to_excel(
     header_rows: int = 12,
     row_ref_odd: int = 13,
     row_ref_even: int = 14,
+    workers: int = 1,
+    engine: str = OUTPUT_ENGINE_WORKBOOK,
+    manifest: Optional[RunManifest] = None,
+    stage: str = SPLIT_STAGE,
+    split_strategy: str = SPLIT_STRATEGY_ROWS,
+    group_column: int = N_DOC_COLUMN,
+    tolerance: float = SPLIT_TOLERANCE,
+    max_rows_per_part: Optional[int] = None,
+    max_bytes_per_part: Optional[int] = None,
+    pipeline_depth: int = 0,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+    footer_row: bool = True,
 ) -> None:
     """
     Splits the data from the CSV into N Excel files, maintaining the header and formatting.
     Data will always be written starting from the specified table_start_row in the output file.
 
+    The CSV is not loaded in memory: the number of rows is read from its row index (or counted in a first pass),
+    then the rows are streamed from the CSV reader into the part being written, which is closed as soon as it is full.
+    With the row index of the CSV, the group index of the "groups" strategy is read from it, and with workers > 1
+    every worker process reads the rows of its file from the CSV itself instead of receiving them from the reader.
+
+    With workers > 1 the output files are built and saved by a pool of worker processes. Each file is
+    produced by the same code as in the serial path, so the output is identical.
+
+    The output engine is either "workbook" (in-memory openpyxl workbook, formatted after the data is written)
+    or "write_only" (streaming openpyxl workbook, each row is written once with its style).
+
+    With a run manifest, the output files already built from the same inputs and parameters are not rebuilt.
+
+    The split strategy is either "rows" (all the files get the same number of rows) or "groups": the runs of
+    consecutive rows with the same value in group_column ('N. doc.') are never divided between two files, and are
+    balanced between the files using an index of the run sizes built by an extra streaming pass over the CSV.
+
+    With max_rows_per_part and/or max_bytes_per_part, the number of files is not fixed: the rows are streamed into
+    a file until it reaches max_rows_per_part rows or an estimated max_bytes_per_part bytes of uncompressed cell
+    payload, then the split rolls over to a new file. With the "groups" strategy a file is only closed between two
+    groups. The output files of a previous run numbered above the last file of the split are removed.
+
+    With a pipeline depth, the CSV is read by a reader thread and (with serial writing) the rows are converted by a
+    converter thread, so that reading and converting the next rows overlap with building and compressing the
+    current file. The threads are joined by queues of at most pipeline_depth chunks of rows (see row_pipeline).
+
+    With a bundle archive, the output files are streamed as entries of the archive while they are built, instead of
+    being saved in output_folder. The archive is a single sequential stream, so the files are built serially (use
+    a pipeline depth to overlap reading and converting with building) and always rebuilt, without the manifest.
+
+    The last row of the CSV file is the footer of the table, formatted as the model last row in the last output
+    file. The CSV files of the partitions have no footer row (it stays in the main partition): they are split with
+    footer_row=False, and none of their rows gets the model last row format.
+
     Args:
         model_xlsx_path (str): Path to the Excel file used as a model for formatting.
         source_csv_file (str): Path to the CSV file containing the data.
@@ -341,54 +1530,205 @@ def split_csv_to_excel(
         header_rows (int): Number of rows that make up the header.
         row_ref_odd (int): Reference row for the style of odd rows.
         row_ref_even (int): Reference row for the style of even rows.
+        workers (int): Number of worker processes used to build the output files (default: 1, serial).
+        engine (str): Output engine, "workbook" or "write_only".
+        manifest (Optional[RunManifest]): Manifest of the run, used to skip the output files that are up to date.
+        stage (str): Name of the split in the manifest (one per partition of the source).
+        split_strategy (str): Split strategy, "rows" or "groups".
+        group_column (int): 0-based index of the column that groups the rows, for the "groups" strategy.
+        tolerance (float): Relative difference from the average file size above which a warning is logged.
+        max_rows_per_part (Optional[int]): Maximum number of data rows of an output file (N is then ignored).
+        max_bytes_per_part (Optional[int]): Maximum estimated size of an output file (N is then ignored).
+        pipeline_depth (int): Maximum number of chunks of rows queued between two pipeline stages (0: no pipeline).
+        compression_level (Optional[int]): Zip compression of the output files: None (default deflate), 0 (stored)
+            or a deflate level from 1 (fastest) to 9 (smallest).
+        bundle (Optional[BundleArchive]): Archive the output files are streamed into, instead of output_folder.
+        footer_row (bool): Whether the last row of the CSV file is the footer of the table (default: True).
     """
-    with open(source_csv_file, mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f, delimiter=";")
-        rows = list(reader)
-
-    total_rows = len(rows) - header_rows  # Exclude the header rows
-    rows_per_file = (total_rows // N) + (total_rows % N > 0)
-
-    with tqdm(total=N, desc="Splitting files", unit="file") as pbar:
-        for file_index in range(N):
-            new_wb = Workbook()
-            new_sheet = new_wb.active
-
-            # Copy the header from the original Excel file
-            copy_header_and_style(model_xlsx_path, new_sheet, header_rows)
-
-            # Calculate the range of rows to copy into this file
-            start_row = header_rows + file_index * rows_per_file
-            end_row = min(header_rows + (file_index + 1) * rows_per_file, len(rows))
+    _split_source_to_excel(
+        _CsvSource(source_csv_file, header_rows),
+        model_xlsx_path,
+        output_folder,
+        product_name,
+        N,
+        table_start_row,
+        header_rows,
+        row_ref_odd,
+        row_ref_even,
+        workers,
+        engine,
+        manifest,
+        stage,
+        split_strategy,
+        group_column,
+        tolerance,
+        max_rows_per_part,
+        max_bytes_per_part,
+        pipeline_depth,
+        compression_level,
+        bundle,
+        footer_row,
+    )
 
-            new_start_row = table_start_row
 
-            for row_index in range(start_row, end_row):
-                for col_index, cell_value in enumerate(rows[row_index], 1):
-                    new_sheet.cell(
-                        row=new_start_row + (row_index - start_row),
-                        column=col_index,
-                        value=format_value(cell_value),
-                    )
+def split_xlsx_to_excel(
+    model_xlsx_path: str,
+    source_xlsx_file: str,
+    output_folder: str,
+    product_name: str,
+    N: int,
+    table_start_row: int = 13,
+    header_rows: int = 12,
+    row_ref_odd: int = 13,
+    row_ref_even: int = 14,
+    workers: int = 1,
+    engine: str = OUTPUT_ENGINE_WORKBOOK,
+    manifest: Optional[RunManifest] = None,
+    split_strategy: str = SPLIT_STRATEGY_ROWS,
+    group_column: int = N_DOC_COLUMN,
+    tolerance: float = SPLIT_TOLERANCE,
+    max_rows_per_part: Optional[int] = None,
+    max_bytes_per_part: Optional[int] = None,
+    pipeline_depth: int = 0,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> None:
+    """
+    Splits the data of an Excel file into N Excel files like split_csv_to_excel(), reading the rows directly from
+    the input workbook in read-only mode instead of going through an intermediate CSV file.
 
-            # Apply alternating styles and dimensions
-            apply_alternating_styles_and_dimensions(
-                model_xlsx_path, new_sheet, table_start_row, row_ref_odd, row_ref_even
-            )
+    The values are converted like the rows of the CSV pipeline: dates are formatted as 'DD/MM/YYYY', numbers are
+    kept as numbers, and the text cells of the date and numeric columns go through the converters of the column
+    schema inferred from the first data rows. With the "groups" strategy the group index is built by an extra
+    read-only pass over the group column. With max_rows_per_part and/or max_bytes_per_part the split rolls over
+    to a new file when a file is full, with a pipeline depth the input workbook is read by a reader thread, and with a
+    bundle archive the output files are streamed into the archive, as in split_csv_to_excel().
 
-            if file_index == N - 1:
-                apply_last_row_format(
-                    model_xlsx_path=model_xlsx_path,
-                    new_sheet=new_sheet,
-                )
+    Args:
+        model_xlsx_path (str): Path to the Excel file used as a model for formatting.
+        source_xlsx_file (str): Path to the Excel file containing the data.
+        output_folder (str): Folder where the output Excel files will be saved.
+        product_name (str): The base name for the output files.
+        N (int): Number of output files to split the data into.
+        table_start_row (int): Row index where the table data starts.
+        header_rows (int): Number of rows that make up the header.
+        row_ref_odd (int): Reference row for the style of odd rows.
+        row_ref_even (int): Reference row for the style of even rows.
+        workers (int): Number of worker processes used to build the output files (default: 1, serial).
+        engine (str): Output engine, "workbook" or "write_only".
+        manifest (Optional[RunManifest]): Manifest of the run, used to skip the output files that are up to date.
+        split_strategy (str): Split strategy, "rows" or "groups".
+        group_column (int): 0-based index of the column that groups the rows, for the "groups" strategy.
+        tolerance (float): Relative difference from the average file size above which a warning is logged.
+        max_rows_per_part (Optional[int]): Maximum number of data rows of an output file (N is then ignored).
+        max_bytes_per_part (Optional[int]): Maximum estimated size of an output file (N is then ignored).
+        pipeline_depth (int): Maximum number of chunks of rows queued between two pipeline stages (0: no pipeline).
+        compression_level (Optional[int]): Zip compression of the output files: None (default deflate), 0 (stored)
+            or a deflate level from 1 (fastest) to 9 (smallest).
+        bundle (Optional[BundleArchive]): Archive the output files are streamed into, instead of output_folder.
+    """
+    _split_source_to_excel(
+        _WorkbookSource(source_xlsx_file, header_rows),
+        model_xlsx_path,
+        output_folder,
+        product_name,
+        N,
+        table_start_row,
+        header_rows,
+        row_ref_odd,
+        row_ref_even,
+        workers,
+        engine,
+        manifest,
+        SPLIT_STAGE,
+        split_strategy,
+        group_column,
+        tolerance,
+        max_rows_per_part,
+        max_bytes_per_part,
+        pipeline_depth,
+        compression_level,
+        bundle,
+        True,
+    )
 
-            output_file_path = os.path.join(
-                output_folder, f"{product_name}_{file_index + 1}.xlsx"
-            )
-            new_wb.save(output_file_path)
 
-            logger.info(f"Excel file created: {output_file_path}")
-            pbar.update(1)  # Update progress bar
+def split_columns_to_excel(
+    model_xlsx_path: str,
+    source_columns_file: str,
+    output_folder: str,
+    product_name: str,
+    N: int,
+    table_start_row: int = 13,
+    header_rows: int = 12,
+    row_ref_odd: int = 13,
+    row_ref_even: int = 14,
+    workers: int = 1,
+    engine: str = OUTPUT_ENGINE_WORKBOOK,
+    manifest: Optional[RunManifest] = None,
+    split_strategy: str = SPLIT_STRATEGY_ROWS,
+    group_column: int = N_DOC_COLUMN,
+    tolerance: float = SPLIT_TOLERANCE,
+    max_rows_per_part: Optional[int] = None,
+    max_bytes_per_part: Optional[int] = None,
+    pipeline_depth: int = 0,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> None:
+    """
+    Splits the data rows of a columnar file (see columnar_store) into N Excel files like split_csv_to_excel().
 
+    The values are read with their type from the memory mapped columns, only the text cells of the date and
+    numeric columns are parsed: they are written like split_xlsx_to_excel() writes the values of the input workbook
+    (dates as 'DD/MM/YYYY', numbers as numbers, column schema of the first data rows).
+    The group index of the "groups" strategy is computed from the codes of the group column, and with workers > 1
+    every worker process reads the rows of its file from the columnar file itself. Rolling over, the pipeline and
+    the bundle archive work as in split_csv_to_excel().
 
-# TODO: gestione separata delle righe aventi su colonna N. doc. il valore CA2023 (creazione csv a parte e relativi excel)
+    Args:
+        model_xlsx_path (str): Path to the Excel file used as a model for formatting.
+        source_columns_file (str): Path to the columnar file containing the data.
+        output_folder (str): Folder where the output Excel files will be saved.
+        product_name (str): The base name for the output files.
+        N (int): Number of output files to split the data into.
+        table_start_row (int): Row index where the table data starts.
+        header_rows (int): Number of rows that make up the header (the header rows of the columnar file).
+        row_ref_odd (int): Reference row for the style of odd rows.
+        row_ref_even (int): Reference row for the style of even rows.
+        workers (int): Number of worker processes used to build the output files (default: 1, serial).
+        engine (str): Output engine, "workbook" or "write_only".
+        manifest (Optional[RunManifest]): Manifest of the run, used to skip the output files that are up to date.
+        split_strategy (str): Split strategy, "rows" or "groups".
+        group_column (int): 0-based index of the column that groups the rows, for the "groups" strategy.
+        tolerance (float): Relative difference from the average file size above which a warning is logged.
+        max_rows_per_part (Optional[int]): Maximum number of data rows of an output file (N is then ignored).
+        max_bytes_per_part (Optional[int]): Maximum estimated size of an output file (N is then ignored).
+        pipeline_depth (int): Maximum number of chunks of rows queued between two pipeline stages (0: no pipeline).
+        compression_level (Optional[int]): Zip compression of the output files: None (default deflate), 0 (stored)
+            or a deflate level from 1 (fastest) to 9 (smallest).
+        bundle (Optional[BundleArchive]): Archive the output files are streamed into, instead of output_folder.
+    """
+    _split_source_to_excel(
+        _ColumnsSource(source_columns_file, header_rows),
+        model_xlsx_path,
+        output_folder,
+        product_name,
+        N,
+        table_start_row,
+        header_rows,
+        row_ref_odd,
+        row_ref_even,
+        workers,
+        engine,
+        manifest,
+        SPLIT_STAGE,
+        split_strategy,
+        group_column,
+        tolerance,
+        max_rows_per_part,
+        max_bytes_per_part,
+        pipeline_depth,
+        compression_level,
+        bundle,
+        True,
+    )
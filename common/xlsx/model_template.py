@@ -0,0 +1,431 @@
+"""
+Compiled representation of the model Excel file used to format the split output files.
+
+The model workbook is parsed once per run and reduced to plain data (header values, style vectors,
+dimensions and merged ranges), so that every output part can be formatted without loading the model again.
+"""
+
+import os
+import sys
+from copy import copy
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import Cell, MergedCell
+from openpyxl.cell.read_only import ReadOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.worksheet import Worksheet
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+
+class CellStyle(NamedTuple):
+    """Style attributes copied from a single model cell."""
+
+    font: Font
+    fill: PatternFill
+    border: Border
+    alignment: Alignment
+    number_format: Optional[str] = None  # None means the number format is not copied
+
+
+@dataclass
+class ModelTemplate:
+    """
+    Formatting information extracted from the model Excel file.
+
+    Attributes:
+        max_column (int): Number of columns of the model sheet.
+        header_values (List[List]): Cell values of the header rows.
+        header_styles (List[List[Optional[CellStyle]]]): Cell styles of the header rows.
+        odd_styles (List[Optional[CellStyle]]): Column styles for odd data rows.
+        even_styles (List[Optional[CellStyle]]): Column styles for even data rows.
+        last_styles (List[Optional[CellStyle]]): Column styles for the last row of the output.
+        odd_height (Optional[float]): Row height for odd data rows.
+        even_height (Optional[float]): Row height for even data rows.
+        column_widths (Dict[str, Optional[float]]): Column widths by column letter.
+        merged_ranges (List[str]): Merged ranges of the model sheet.
+        row_merge_spans (List[Tuple[int, int]]): (start_col, end_col) of the merges in the odd reference row,
+                                                 repeated on every data row.
+    """
+
+    max_column: int
+    header_values: List[List] = field(default_factory=list)
+    header_styles: List[List[Optional[CellStyle]]] = field(default_factory=list)
+    odd_styles: List[Optional[CellStyle]] = field(default_factory=list)
+    even_styles: List[Optional[CellStyle]] = field(default_factory=list)
+    last_styles: List[Optional[CellStyle]] = field(default_factory=list)
+    odd_height: Optional[float] = None
+    even_height: Optional[float] = None
+    column_widths: Dict[str, Optional[float]] = field(default_factory=dict)
+    merged_ranges: List[str] = field(default_factory=list)
+    row_merge_spans: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def header_rows(self) -> int:
+        return len(self.header_values)
+
+    def row_styles(self, row_index: int) -> List[Optional[CellStyle]]:
+        """Returns the style vector for the given (1-based) output row."""
+        return self.odd_styles if row_index % 2 == 1 else self.even_styles
+
+    def row_height(self, row_index: int) -> Optional[float]:
+        """Returns the row height for the given (1-based) output row."""
+        return self.odd_height if row_index % 2 == 1 else self.even_height
+
+
+class RowLayout(NamedTuple):
+    """Final formatting of an output row, after the merged ranges have been applied."""
+
+    styles: List[Optional[CellStyle]]
+    merged: List[bool]  # True where the cell is covered by a merged range and holds no value
+    height: Optional[float]
+
+
+@dataclass
+class SheetLayout:
+    """
+    Row by row formatting of an output sheet, used by the streaming writer which cannot go back over the
+    cells once they are written.
+
+    Attributes:
+        rows (Dict[int, RowLayout]): Layout of the rows affected by the model merged ranges (header included).
+        odd (RowLayout): Layout of the odd data rows after the last explicit row.
+        even (RowLayout): Layout of the even data rows after the last explicit row.
+        last_styles (List[Optional[CellStyle]]): Column styles for the last row of the output.
+    """
+
+    rows: Dict[int, RowLayout]
+    odd: RowLayout
+    even: RowLayout
+    last_styles: List[Optional[CellStyle]]
+
+    def row_layout(self, row_index: int, is_last_row: bool = False) -> RowLayout:
+        """Returns the layout of the given (1-based) output row."""
+        layout = self.rows.get(row_index)
+        if layout is None:
+            layout = self.odd if row_index % 2 == 1 else self.even
+        if is_last_row:
+            layout = layout._replace(
+                styles=[
+                    last_style if last_style is not None else style
+                    for style, last_style in zip(layout.styles, self.last_styles)
+                ]
+            )
+        return layout
+
+
+def read_cell_style(cell: Cell, with_number_format: bool) -> Optional[CellStyle]:
+    """Returns a copy of the style of the given cell (read-only cells included), or None if it has no style."""
+    if not getattr(cell, "has_style", False):  # The padding cells of read-only rows have no style attributes
+        return None
+    return CellStyle(
+        font=copy(cell.font),
+        fill=copy(cell.fill),
+        border=copy(cell.border),
+        alignment=copy(cell.alignment),
+        number_format=cell.number_format if with_number_format else None,
+    )
+
+
+def _read_row_styles(sheet: Worksheet, row_index: int) -> List[Optional[CellStyle]]:
+    return [
+        read_cell_style(sheet.cell(row=row_index, column=col_index), True)
+        for col_index in range(1, sheet.max_column + 1)
+    ]
+
+
+# Templates kept by the current process. Every version of a model file (path, size, mtime) gets its own entry: the
+# least recently used templates are dropped, so that a long batch or watch run does not keep every version
+COMPILED_TEMPLATES_CACHE_SIZE = 8
+
+
+def load_model_template(
+    model_xlsx_path: str,
+    header_rows: int = 12,
+    row_ref_odd: int = 13,
+    row_ref_even: int = 14,
+    model_last_row: int = 45,
+) -> ModelTemplate:
+    """
+    Loads the model Excel file once and compiles it into a ModelTemplate. The template is kept by the process: the
+    next jobs of a batch run using the same, unchanged model file get it without loading the model again.
+
+    Args:
+        model_xlsx_path (str): Path to the Excel file used as a model for formatting.
+        header_rows (int): Number of header rows to copy.
+        row_ref_odd (int): Reference row for the style of odd rows.
+        row_ref_even (int): Reference row for the style of even rows.
+        model_last_row (int): Reference row for the style of the last row of the output.
+
+    Returns:
+        ModelTemplate: The compiled model template (not to be modified, it may be shared).
+    """
+    stat = os.stat(model_xlsx_path)
+    return _cached_model_template(
+        os.path.abspath(model_xlsx_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        header_rows,
+        row_ref_odd,
+        row_ref_even,
+        model_last_row,
+    )
+
+
+@lru_cache(maxsize=COMPILED_TEMPLATES_CACHE_SIZE)
+def _cached_model_template(
+    model_xlsx_path: str,
+    size: int,
+    mtime_ns: int,
+    header_rows: int,
+    row_ref_odd: int,
+    row_ref_even: int,
+    model_last_row: int,
+) -> ModelTemplate:
+    """Compiles the model file, cached by its path, size and modification time and by the reference rows."""
+    return _compile_model_template(model_xlsx_path, header_rows, row_ref_odd, row_ref_even, model_last_row)
+
+
+def _compile_model_template(
+    model_xlsx_path: str,
+    header_rows: int,
+    row_ref_odd: int,
+    row_ref_even: int,
+    model_last_row: int,
+) -> ModelTemplate:
+    wb = load_workbook(model_xlsx_path)
+    sheet = wb.active
+    max_col = sheet.max_column
+
+    template = ModelTemplate(max_column=max_col)
+
+    # Header values and styles (the number format is not copied for the header)
+    for row_index in range(1, header_rows + 1):
+        values, styles = [], []
+        for col_index in range(1, max_col + 1):
+            cell = sheet.cell(row=row_index, column=col_index)
+            values.append(cell.value)
+            styles.append(read_cell_style(cell, False))
+        template.header_values.append(values)
+        template.header_styles.append(styles)
+
+    # Style vectors for the data rows and the last row
+    template.odd_styles = _read_row_styles(sheet, row_ref_odd)
+    template.even_styles = _read_row_styles(sheet, row_ref_even)
+    template.last_styles = _read_row_styles(sheet, model_last_row)
+
+    # Dimensions
+    template.odd_height = sheet.row_dimensions[row_ref_odd].height
+    template.even_height = sheet.row_dimensions[row_ref_even].height
+    for col_index in range(1, max_col + 1):
+        col_letter = get_column_letter(col_index)
+        template.column_widths[col_letter] = sheet.column_dimensions[col_letter].width
+
+    # Merged cell structure
+    for merged_range in sheet.merged_cells.sorted():
+        template.merged_ranges.append(str(merged_range))
+        if merged_range.min_row == row_ref_odd:
+            template.row_merge_spans.append(
+                (merged_range.min_col, merged_range.max_col)
+            )
+
+    wb.close()
+    return template
+
+
+class StyleCache:
+    """
+    Style arrays of the styles given to the cells of a target workbook.
+
+    Assigning a font, a fill, a border and an alignment to a cell makes openpyxl look each of them up in the style
+    tables of the workbook. Here every distinct style is looked up once, the first time it is used, and then given
+    to the cells as a copy of the internal style array of the workbook.
+    """
+
+    def __init__(self):
+        self._model_styles: Dict[int, Tuple[CellStyle, StyleArray]] = {}
+        self._cell_styles: Dict[Tuple, Tuple[Workbook, StyleArray]] = {}
+
+    def style_array(self, worksheet: Worksheet, style: CellStyle) -> StyleArray:
+        """Returns the style array of a model style in the workbook of the given worksheet."""
+        entry = self._model_styles.get(id(style))
+        if entry is None:
+            scratch_cell = Cell(worksheet)
+            _assign_cell_style(scratch_cell, style)
+            # The style is kept with its array so that its id is not reused
+            entry = self._model_styles[id(style)] = (style, scratch_cell._style)
+        return entry[1]
+
+    def apply(self, target_cell: Cell, style: Optional[CellStyle]) -> None:
+        """Applies a model style to the target cell, like apply_cell_style()."""
+        if style is None:
+            return
+        _assign_style_array(
+            target_cell,
+            self.style_array(target_cell.parent, style),
+            style.number_format is not None,
+        )
+
+    def copy_cell_style(
+        self, source_cell: Cell, target_cell: Cell, with_number_format: bool = True
+    ) -> None:
+        """
+        Copies the font, fill, border, alignment and optionally the number format of a cell of another workbook
+        to the target cell. The source cell can also be a cell of a read-only workbook.
+        """
+        if not source_cell.has_style:
+            return
+        source_workbook = source_cell.parent.parent
+        source_style = (
+            source_cell.style_array if isinstance(source_cell, ReadOnlyCell) else source_cell._style
+        )
+        key = (id(source_workbook), tuple(source_style), with_number_format)
+        entry = self._cell_styles.get(key)
+        if entry is None:
+            style = read_cell_style(source_cell, with_number_format)
+            entry = self._cell_styles[key] = (
+                source_workbook,
+                self.style_array(target_cell.parent, style),
+            )
+        _assign_style_array(target_cell, entry[1], with_number_format)
+
+
+_STYLE_CACHES: "WeakKeyDictionary[Workbook, StyleCache]" = WeakKeyDictionary()
+
+
+def style_cache(worksheet: Worksheet) -> StyleCache:
+    """
+    Returns the style cache of the workbook of the given worksheet, created on first use.
+
+    Args:
+        worksheet (Worksheet): A worksheet of the target workbook.
+
+    Returns:
+        StyleCache: The style cache of the workbook.
+    """
+    workbook = worksheet.parent
+    cache = _STYLE_CACHES.get(workbook)
+    if cache is None:
+        cache = _STYLE_CACHES[workbook] = StyleCache()
+    return cache
+
+
+def _assign_cell_style(target_cell: Cell, style: CellStyle) -> None:
+    target_cell.font = style.font
+    target_cell.fill = style.fill
+    target_cell.border = style.border
+    target_cell.alignment = style.alignment
+    if style.number_format is not None:
+        target_cell.number_format = style.number_format
+
+
+def _assign_style_array(
+    target_cell: Cell, style_array: StyleArray, with_number_format: bool
+) -> None:
+    if not target_cell.has_style:
+        target_cell._style = copy(style_array)
+        return
+    # Keep the other attributes of the cell style, like the number format set for a date value
+    target_style = target_cell._style
+    target_style.fontId = style_array.fontId
+    target_style.fillId = style_array.fillId
+    target_style.borderId = style_array.borderId
+    target_style.alignmentId = style_array.alignmentId
+    if with_number_format:
+        target_style.numFmtId = style_array.numFmtId
+
+
+def apply_cell_style(target_cell: Cell, style: Optional[CellStyle]) -> None:
+    """
+    Applies a style from the model template to the target cell.
+
+    Args:
+        target_cell (Cell): The target cell where the style will be applied.
+        style (Optional[CellStyle]): The style to apply, None leaves the cell untouched.
+    """
+    if style is None:
+        return
+    style_cache(target_cell.parent).apply(target_cell, style)
+
+
+def compile_sheet_layout(
+    model_template: ModelTemplate, table_start_row: int
+) -> SheetLayout:
+    """
+    Computes the final per-row formatting of an output sheet. The header, the alternating styles and the merged
+    ranges are applied to a small scratch sheet exactly as for a full output file, and the resulting cells are
+    read back, so that streamed rows look the same as the ones of an in-memory workbook.
+
+    Args:
+        model_template (ModelTemplate): The compiled model Excel file used for formatting.
+        table_start_row (int): Row index where the table data starts.
+
+    Returns:
+        SheetLayout: The layout of the output rows.
+    """
+    max_col = model_template.max_column
+    sheet = Workbook().active
+
+    # Header rows: every header cell is created, as the in-memory writer does
+    for row_index, styles in enumerate(model_template.header_styles, 1):
+        for col_index, style in enumerate(styles, 1):
+            apply_cell_style(sheet.cell(row=row_index, column=col_index), style)
+
+    # Data rows: all the rows touched by the model merged ranges, plus one odd and one even row after them
+    merged_ranges = [CellRange(merged_range) for merged_range in model_template.merged_ranges]
+    last_explicit_row = max(
+        [table_start_row + 1] + [merged_range.max_row for merged_range in merged_ranges]
+    )
+    last_scratch_row = last_explicit_row + 2
+    for row_index in range(table_start_row, last_scratch_row + 1):
+        for col_index, style in enumerate(model_template.row_styles(row_index), 1):
+            apply_cell_style(sheet.cell(row=row_index, column=col_index), style)
+
+    for merged_range in model_template.merged_ranges:
+        sheet.merge_cells(merged_range)
+    for start_col, end_col in model_template.row_merge_spans:
+        for row_index in range(table_start_row, last_scratch_row + 1):
+            sheet.merge_cells(
+                start_row=row_index,
+                start_column=start_col,
+                end_row=row_index,
+                end_column=end_col,
+            )
+
+    def read_row(row_index: int) -> RowLayout:
+        styles, merged = [], []
+        for col_index in range(1, max_col + 1):
+            cell = sheet._cells.get((row_index, col_index))
+            styles.append(read_cell_style(cell, True) if cell is not None else None)
+            merged.append(isinstance(cell, MergedCell))
+        height = (
+            model_template.row_height(row_index)
+            if row_index >= table_start_row
+            else None
+        )
+        return RowLayout(styles=styles, merged=merged, height=height)
+
+    rows = {
+        row_index: read_row(row_index)
+        for row_index in range(1, last_explicit_row + 1)
+    }
+    odd_row, even_row = (
+        (last_explicit_row + 1, last_explicit_row + 2)
+        if last_explicit_row % 2 == 0
+        else (last_explicit_row + 2, last_explicit_row + 1)
+    )
+    return SheetLayout(
+        rows=rows,
+        odd=read_row(odd_row),
+        even=read_row(even_row),
+        last_styles=model_template.last_styles,
+    )
@@ -0,0 +1,181 @@
+"""
+Sizes of the output parts of a split.
+
+The data rows are either divided into parts of the same number of rows, or grouped in runs of consecutive rows
+sharing the same key (the 'N. doc.' series renumbered by process_csv) which are never divided between two parts.
+The group index holds only the size of each run, and the parts are balanced with a single linear pass over it.
+
+Alternatively the number of parts is not fixed: the rows are streamed into a part until it reaches a maximum
+number of rows or an estimated maximum size, then the next rows roll over to a new part.
+"""
+
+import math
+import os
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+# Estimated size of the XML markup of a cell and of a row in the sheet file, in addition to the values
+CELL_XML_OVERHEAD = 30
+ROW_XML_OVERHEAD = 20
+
+
+def even_part_sizes(total_rows: int, N: int) -> List[int]:
+    """Returns the sizes of N parts of the same number of rows (the last part takes the remaining rows)."""
+    rows_per_file = math.ceil(total_rows / N)
+    sizes = []
+    remaining = total_rows
+    for _ in range(N):
+        size = min(rows_per_file, remaining)
+        sizes.append(size)
+        remaining -= size
+    return sizes
+
+
+def group_sizes(keys: Iterable) -> array:
+    """
+    Returns the size of every run of consecutive equal keys. An empty key never belongs to a run, like a missing
+    'N. doc.' in process_csv.
+
+    Args:
+        keys (Iterable): The key of each data row, in order.
+
+    Returns:
+        array: The number of rows of each group, in order.
+    """
+    sizes = array("I")
+    previous = None
+    for key in keys:
+        if key is not None and key != "" and key == previous:
+            sizes[-1] += 1
+        else:
+            sizes.append(1)
+        previous = key
+    return sizes
+
+
+def balance_groups(sizes: Sequence[int], N: int) -> List[int]:
+    """
+    Assigns consecutive groups to N parts: the k-th cut is placed on the group boundary closest to k * total / N,
+    so that no group is divided and every part stays as close as possible to the same number of rows.
+    The boundaries are visited once, in order.
+
+    Args:
+        sizes (Sequence[int]): The number of rows of each group, in order.
+        N (int): The number of parts.
+
+    Returns:
+        List[int]: The number of rows of each part (a part is empty when there are fewer groups than parts).
+    """
+    total_rows = sum(sizes)
+    part_sizes = []
+    boundary = 0  # Rows before the current group
+    group_index = 0
+    previous_cut = 0
+    for part_index in range(1, N):
+        target = part_index * total_rows / N
+        # Move to the last boundary at or before the target, then compare it with the next one
+        while group_index < len(sizes) and boundary + sizes[group_index] <= target:
+            boundary += sizes[group_index]
+            group_index += 1
+        cut = boundary
+        if group_index < len(sizes):
+            next_boundary = boundary + sizes[group_index]
+            if next_boundary - target < target - boundary or cut <= previous_cut:
+                cut = next_boundary
+                boundary = next_boundary
+                group_index += 1
+        part_sizes.append(cut - previous_cut)
+        previous_cut = cut
+    part_sizes.append(total_rows - previous_cut)
+    return part_sizes
+
+
+def max_imbalance(part_sizes: Sequence[int]) -> float:
+    """Returns the largest relative difference between the size of a part and the average size of the parts."""
+    average = sum(part_sizes) / len(part_sizes)
+    if not average:
+        return 0.0
+    return max(abs(size - average) for size in part_sizes) / average
+
+
+def estimate_row_bytes(row: Sequence) -> int:
+    """Returns an estimate of the uncompressed size of a row in the sheet XML, from the length of its values."""
+    return ROW_XML_OVERHEAD + sum(
+        CELL_XML_OVERHEAD + len(value if isinstance(value, str) else str(value))
+        for value in row
+        if value is not None
+    )
+
+
+class RowStream:
+    """Stream of data rows that can look at the next row before taking it, and knows whether it is the last one."""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows = iter(rows)
+        self._next = next(self._rows, None)
+        self._after = next(self._rows, None) if self._next is not None else None
+
+    @property
+    def exhausted(self) -> bool:
+        return self._next is None
+
+    @property
+    def at_last_row(self) -> bool:
+        return self._next is not None and self._after is None
+
+    def peek(self) -> Optional[Sequence]:
+        return self._next
+
+    def pop(self) -> Optional[Sequence]:
+        row = self._next
+        self._next = self._after
+        self._after = next(self._rows, None) if self._next is not None else None
+        return row
+
+
+def take_part(
+    stream: RowStream,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    group_column: Optional[int] = None,
+    footer_row: bool = False,
+) -> Iterator[Sequence]:
+    """
+    Yields the rows of the next part from the stream, until the part has max_rows rows or the next row would take
+    its estimated size over max_bytes. A part always gets at least one row. With a group column, a part is only
+    closed between two groups, so a group can take a part over its limits.
+
+    Args:
+        stream (RowStream): The stream of data rows.
+        max_rows (Optional[int]): Maximum number of rows of the part.
+        max_bytes (Optional[int]): Maximum estimated size of the part, in bytes of uncompressed cell payload.
+        group_column (Optional[int]): 0-based index of the column of the group key.
+        footer_row (bool): If True, the last row of the stream is the footer of the table: it never starts a part
+            of its own and always goes with the rows before it.
+
+    Yields:
+        Sequence: The rows of the part.
+    """
+    rows = 0
+    size = 0
+    previous_key = None
+    while not stream.exhausted:
+        row = stream.peek()
+        key = None
+        if group_column is not None and group_column < len(row):
+            key = row[group_column]
+        same_group = key is not None and key != "" and key == previous_key
+        row_bytes = estimate_row_bytes(row) if max_bytes else 0
+        if rows and not same_group and not (footer_row and stream.at_last_row):
+            if (max_rows and rows >= max_rows) or (max_bytes and size + row_bytes > max_bytes):
+                return
+        stream.pop()
+        rows += 1
+        size += row_bytes
+        previous_key = key
+        yield row
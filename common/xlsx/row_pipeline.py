@@ -0,0 +1,193 @@
+"""
+Pipelined execution of a split.
+
+Reading the source, converting the values and building the output files normally run one after the other in the
+same thread. In pipelined mode the source is read (and decoded) by a reader thread, the rows are cut into parts and
+converted by a converter thread, and the calling thread only builds and compresses the output files. The threads
+are joined by bounded queues of chunks of rows: a stage that gets ahead blocks as soon as its queue is full, so at
+most depth chunks of rows wait between two stages, whatever the size of the source.
+
+The output files are the same as without the pipeline: the parts are cut from the same rows in the same order.
+"""
+
+import os
+import queue
+import sys
+import threading
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+# Rows per item of the queues between two stages
+PIPELINE_CHUNK_ROWS = 1000
+
+_END = object()  # End of the stream
+_STOP_POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    """Raised in a stage thread when its consumer is closed."""
+
+
+class _Failure:
+    """Exception raised in a stage thread, re-raised in the consuming thread."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _PartStart:
+    def __init__(self, path: str):
+        self.path = path
+
+
+class _PartEnd:
+    def __init__(self, is_last_part: bool):
+        self.is_last_part = is_last_part
+
+
+class _Stage:
+    """
+    Thread producing the items of a bounded queue. The producer stops as soon as the consumer is closed, even if it
+    is blocked on a full queue.
+    """
+
+    def __init__(self, name: str, produce: Callable[["_Stage"], None], depth: int):
+        self.queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._produce = produce
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            try:
+                self._produce(self)
+            except _Stopped:
+                raise
+            except BaseException as error:
+                self.put(_Failure(error))
+                return
+            self.put(_END)
+        except _Stopped:
+            return
+
+    def put(self, item) -> None:
+        """Puts an item on the queue, waiting while it is full. Raises _Stopped once the stage is stopped."""
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                self.queue.put(item, timeout=_STOP_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def get(self):
+        """Returns the next item of the queue, re-raising the exception of the producer if it failed."""
+        item = self.queue.get()
+        if isinstance(item, _Failure):
+            raise item.error
+        return item
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def prefetch_rows(
+    rows: Iterable, depth: int, chunk_rows: int = PIPELINE_CHUNK_ROWS
+) -> Iterator:
+    """
+    Reads the rows in a reader thread, at most depth chunks of chunk_rows rows ahead of the consumer.
+    The generator must be closed (e.g. with contextlib.closing) to stop the reader before the source is closed.
+
+    Args:
+        rows (Iterable): The source rows; they are only iterated by the reader thread.
+        depth (int): Maximum number of chunks waiting in the queue.
+        chunk_rows (int): Rows per chunk.
+
+    Yields:
+        The source rows, in order.
+    """
+
+    def produce(stage: _Stage) -> None:
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, chunk_rows))
+            if not chunk:
+                return
+            stage.put(chunk)
+
+    stage = _Stage("split-reader", produce, depth)
+    try:
+        while True:
+            chunk = stage.get()
+            if chunk is _END:
+                return
+            yield from chunk
+    finally:
+        stage.stop()
+
+
+def convert_parts(
+    parts: Iterable[Tuple[str, Iterable, Union[bool, Callable[[], bool]]]],
+    convert_row: Callable[[List], List],
+    depth: int,
+    chunk_rows: int = PIPELINE_CHUNK_ROWS,
+) -> Iterator[Tuple[str, Iterator[List], Callable[[], bool]]]:
+    """
+    Cuts the parts and converts their rows in a converter thread, at most depth chunks of converted rows ahead of
+    the part writer. The parts are yielded like the source parts, with their converted rows; whether a part is the
+    last one is resolved by the converter thread when it closes the part. The rows of a part must be consumed
+    before moving to the next part. The generator must be closed to stop the converter.
+
+    Args:
+        parts (Iterable): The (output path, rows, is last part) of the parts, as cut from the source rows.
+        convert_row (Callable[[List], List]): Converts a source row into the values to write.
+        depth (int): Maximum number of chunks waiting in the queue.
+        chunk_rows (int): Rows per chunk.
+
+    Yields:
+        Tuple[str, Iterator[List], Callable[[], bool]]: The output path, the converted rows and the last part flag.
+    """
+
+    def produce(stage: _Stage) -> None:
+        for path, part_rows, is_last_part in parts:
+            stage.put(_PartStart(path))
+            chunk = []
+            for row in part_rows:
+                chunk.append(convert_row(row))
+                if len(chunk) >= chunk_rows:
+                    stage.put(chunk)
+                    chunk = []
+            if chunk:
+                stage.put(chunk)
+            stage.put(_PartEnd(is_last_part() if callable(is_last_part) else is_last_part))
+
+    stage = _Stage("split-converter", produce, depth)
+
+    def part_rows(part_end: List[Optional[_PartEnd]]) -> Iterator[List]:
+        while True:
+            item = stage.get()
+            if isinstance(item, _PartEnd):
+                part_end[0] = item
+                return
+            yield from item
+
+    try:
+        item = stage.get()
+        while item is not _END:
+            part_end: List[Optional[_PartEnd]] = [None]
+            rows = part_rows(part_end)
+            yield item.path, rows, lambda part_end=part_end: part_end[0].is_last_part
+            # Rows the writer did not take
+            if part_end[0] is None:
+                for _ in rows:
+                    pass
+            item = stage.get()
+    finally:
+        stage.stop()
@@ -0,0 +1,536 @@
+"""
+Fast reader for the values of the active sheet of an xlsx file.
+
+The worksheet XML and the shared strings table are stream-parsed straight out of the zip archive, without building
+openpyxl cell objects or looking up cell styles: shared strings are resolved through a pre-built list and only the
+number format of each cell style is read, to convert date serials. The worksheet is read in chunks and cut into rows;
+plain cells are matched directly on the raw XML, the other rows are parsed with ElementTree. Rows are yielded as
+tuples of values, like openpyxl's read-only iter_rows(values_only=True), including the padding of short rows and
+the filling of missing rows before the last row of the sheet.
+
+The formatting of the sheet that openpyxl's read-only mode does not expose (column widths, row heights and merged
+ranges) is read by a separate raw scan of the worksheet XML, see read_sheet_format().
+"""
+
+import os
+import posixpath
+import re
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from xml.etree.ElementTree import ParseError, fromstring
+from zipfile import ZipFile
+
+from openpyxl.formula.translate import Translator
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.numbers import (
+    builtin_format_code,
+    is_date_format,
+    is_timedelta_format,
+)
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904,
+    CALENDAR_WINDOWS_1900,
+    from_excel,
+    from_ISO8601,
+)
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+from openpyxl.xml.constants import PKG_REL_NS, REL_NS, SHEET_MAIN_NS
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+_MAIN = "{%s}" % SHEET_MAIN_NS
+_PKG_REL = "{%s}" % PKG_REL_NS
+_CELL_TAG = f"{_MAIN}c"
+_VALUE_TAG = f"{_MAIN}v"
+_FORMULA_TAG = f"{_MAIN}f"
+_INLINE_STRING_TAG = f"{_MAIN}is"
+_TEXT_TAG = f"{_MAIN}t"
+_RUN_TAG = f"{_MAIN}r"
+
+# Raw patterns used to read the sheet XML without a full parse
+_CHUNK_SIZE = 4 * 1024 * 1024
+_ROOT_RE = re.compile(rb"<((?:[\w.-]+:)?worksheet)\b[^>]*>")
+_SHEET_DATA_RE = re.compile(rb"<(?:([\w.-]+):)?sheetData\b[^>]*?(/?)>")
+_DIMENSION_RE = re.compile(rb"<(?:[\w.-]+:)?dimension\b[^>]*?\sref=\"([^\"]*)\"")
+_ROW_INDEX_RE = re.compile(r'\sr="([0-9]+)"')
+_REFERENCE_RE = re.compile(r"&(#[0-9]+|#x[0-9a-fA-F]+|lt|gt|amp|quot|apos);")
+_ENTITIES = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+
+# Raw patterns of the formatting elements read by read_sheet_format()
+_FORMAT_TAG_RE = re.compile(rb"<(?:[\w.-]+:)?(col|row|mergeCell)\s[^>]*>")
+_ATTRIBUTE_RE = re.compile(rb'\s([\w:]+)="([^"]*)"')
+
+
+class SheetFormat(NamedTuple):
+    """
+    Formatting of a worksheet that is not available in openpyxl's read-only mode.
+
+    Attributes:
+        column_widths (Dict[str, float]): Widths of the columns that declare one, by column letter.
+        row_heights (Dict[int, float]): Heights of the rows (up to the requested row) that declare one.
+        merged_ranges (List[str]): Merged ranges of the sheet, in document order.
+    """
+
+    column_widths: Dict[str, float]
+    row_heights: Dict[int, float]
+    merged_ranges: List[str]
+
+
+class _WorkbookParts:
+    """Paths and settings of the workbook needed to read the values of its active sheet."""
+
+    def __init__(self, archive: ZipFile):
+        workbook_path = self._find_target(archive, "_rels/.rels", "/officeDocument")
+        workbook_dir = posixpath.dirname(workbook_path)
+        rels_path = posixpath.join(
+            workbook_dir, "_rels", posixpath.basename(workbook_path) + ".rels"
+        )
+        rels = self._read_rels(archive, rels_path, workbook_dir)
+
+        workbook = fromstring(archive.read(workbook_path))
+        properties = workbook.find(f"{_MAIN}workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        view = workbook.find(f"{_MAIN}bookViews/{_MAIN}workbookView")
+        active_tab = int(view.get("activeTab", 0)) if view is not None else 0
+        sheets = workbook.findall(f"{_MAIN}sheets/{_MAIN}sheet")
+        sheet = sheets[active_tab if active_tab < len(sheets) else 0]
+        self.sheet_path = rels[sheet.get("{%s}id" % REL_NS)][0]
+
+        by_type = {rel_type.rsplit("/", 1)[-1]: target for target, rel_type in rels.values()}
+        self.shared_strings_path = by_type.get("sharedStrings")
+        self.styles_path = by_type.get("styles")
+
+    @staticmethod
+    def _read_rels(archive: ZipFile, rels_path: str, base_dir: str) -> Dict[str, Tuple[str, str]]:
+        rels = {}
+        for rel in fromstring(archive.read(rels_path)).iter(f"{_PKG_REL}Relationship"):
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(base_dir, target))
+            rels[rel.get("Id")] = (target, rel.get("Type"))
+        return rels
+
+    @classmethod
+    def _find_target(cls, archive: ZipFile, rels_path: str, type_suffix: str) -> str:
+        for target, rel_type in cls._read_rels(archive, rels_path, "").values():
+            if rel_type.endswith(type_suffix):
+                return target
+        raise ValueError(f"No {type_suffix[1:]} relationship in {rels_path}")
+
+
+def _read_date_styles(archive: ZipFile, styles_path: Optional[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    Returns the indexes of the cell styles whose number format is a date, and a timedelta. The indexes are kept
+    as strings, to be compared with the 's' attribute of the cells without converting it.
+    """
+    date_styles: Set[str] = set()
+    timedelta_styles: Set[str] = set()
+    if styles_path is None:
+        return date_styles, timedelta_styles
+
+    stylesheet = fromstring(archive.read(styles_path))
+    custom_formats = {
+        int(num_fmt.get("numFmtId")): num_fmt.get("formatCode")
+        for num_fmt in stylesheet.iter(f"{_MAIN}numFmt")
+    }
+    cell_xfs = stylesheet.find(f"{_MAIN}cellXfs")
+    if cell_xfs is None:
+        return date_styles, timedelta_styles
+
+    for idx, xf in enumerate(cell_xfs.iter(f"{_MAIN}xf")):
+        num_fmt_id = int(xf.get("numFmtId", 0))
+        fmt = custom_formats.get(num_fmt_id) or builtin_format_code(num_fmt_id)
+        if is_date_format(fmt):
+            date_styles.add(str(idx))
+        if is_timedelta_format(fmt):
+            timedelta_styles.add(str(idx))
+    return date_styles, timedelta_styles
+
+
+def _parse_dimension(ref: str) -> Tuple[Optional[int], Optional[int]]:
+    """Returns (max_row, max_col) of a dimension reference like 'A1:N313'."""
+    last = ref.split(":")[-1]
+    letters = last.rstrip("0123456789")
+    if not letters or len(letters) == len(last):
+        return None, None
+    return int(last[len(letters):]), column_index_from_string(letters)
+
+
+def iter_sheet_rows(xlsx_path: str) -> Iterator[Tuple]:
+    """
+    Yields the rows of the active sheet of an xlsx file as tuples of values.
+
+    Args:
+        xlsx_path (str): Path to the xlsx file.
+
+    Yields:
+        Tuple: The values of a row, padded to the sheet width declared in the file.
+    """
+    with ZipFile(xlsx_path) as archive:
+        parts = _WorkbookParts(archive)
+        shared_strings: List[str] = []
+        if parts.shared_strings_path in archive.NameToInfo:
+            with archive.open(parts.shared_strings_path) as src:
+                shared_strings = read_string_table(src)
+        date_styles, timedelta_styles = _read_date_styles(archive, parts.styles_path)
+
+        with archive.open(parts.sheet_path) as src:
+            yield from _parse_rows(
+                src, shared_strings, date_styles, timedelta_styles, parts.epoch
+            )
+
+
+def read_sheet_format(xlsx_path: str, max_row: int) -> SheetFormat:
+    """
+    Reads the column widths, the heights of the first max_row rows and the merged ranges of the active sheet of an
+    xlsx file. The worksheet XML is scanned in chunks for the start tags of the col, row and mergeCell elements,
+    without parsing the cells; the row tags are no longer looked at once past max_row.
+
+    Args:
+        xlsx_path (str): Path to the xlsx file.
+        max_row (int): Last row whose height is read.
+
+    Returns:
+        SheetFormat: The formatting of the sheet.
+    """
+    sheet_format = SheetFormat(column_widths={}, row_heights={}, merged_ranges=[])
+    row_counter = 0
+    with ZipFile(xlsx_path) as archive:
+        parts = _WorkbookParts(archive)
+        with archive.open(parts.sheet_path) as src:
+            buffer = b""
+            while True:
+                chunk = src.read(_CHUNK_SIZE)
+                buffer += chunk
+                # Scan up to the end of the last complete tag, keep the rest for the next chunk
+                cut = len(buffer) if not chunk else buffer.rfind(b">") + 1
+                for match in _FORMAT_TAG_RE.finditer(buffer, 0, cut):
+                    tag = match.group(1)
+                    if tag == b"row" and row_counter >= max_row:
+                        continue
+                    attributes = {
+                        name.decode(): value.decode()
+                        for name, value in _ATTRIBUTE_RE.findall(match.group(0))
+                    }
+                    if tag == b"row":
+                        row_counter = int(attributes.get("r", row_counter + 1))
+                        if "ht" in attributes and row_counter <= max_row:
+                            sheet_format.row_heights[row_counter] = float(attributes["ht"])
+                    elif tag == b"col" and "width" in attributes:
+                        for col_index in range(int(attributes["min"]), int(attributes["max"]) + 1):
+                            sheet_format.column_widths[get_column_letter(col_index)] = float(
+                                attributes["width"]
+                            )
+                    elif tag == b"mergeCell" and "ref" in attributes:
+                        sheet_format.merged_ranges.append(attributes["ref"])
+                if not chunk:
+                    break
+                buffer = buffer[cut:]
+    return sheet_format
+
+
+def count_sheet_rows(xlsx_path: str) -> int:
+    """
+    Returns the index of the last row of the active sheet of an xlsx file, read from the row tags of the worksheet
+    XML without parsing the cells. Unlike the dimension declared in the file, which may be missing or stale, it is
+    the number of rows that a full read of the sheet yields, missing rows included.
+
+    Args:
+        xlsx_path (str): Path to the xlsx file.
+
+    Returns:
+        int: Index of the last row of the sheet (0 for an empty sheet).
+    """
+    row_counter = 0
+    with ZipFile(xlsx_path) as archive:
+        parts = _WorkbookParts(archive)
+        with archive.open(parts.sheet_path) as src:
+            for start_tag, _, _ in _SheetData(src).rows():
+                ref = _ROW_INDEX_RE.search(start_tag)
+                row_counter = int(ref.group(1)) if ref else row_counter + 1
+    return row_counter
+
+
+class _SheetData:
+    """
+    Raw XML of the sheetData of a worksheet, read from a stream in batches of complete rows.
+
+    Attributes:
+        dimension (Optional[str]): The dimension reference of the sheet, if declared.
+        prefix (str): Namespace prefix of the worksheet elements, with its colon ('' for the default namespace).
+    """
+
+    def __init__(self, src):
+        self._src = src
+        head = b""
+        match = None
+        while match is None:
+            chunk = src.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            head += chunk
+            match = _SHEET_DATA_RE.search(head)
+
+        dimension = _DIMENSION_RE.search(head, 0, match.start() if match else len(head))
+        self.dimension = dimension.group(1).decode() if dimension else None
+        self.prefix = match.group(1).decode() + ":" if match and match.group(1) else ""
+
+        # No sheetData, or an empty <sheetData/>
+        self._buffer = head[match.end():] if match and not match.group(2) else None
+        if self._buffer is None:
+            return
+
+        root = _ROOT_RE.search(head, 0, match.start())
+        self._opening = ((root.group(0) if root else b"") + match.group(0)).decode()
+        self._closing = f"</{self.prefix}sheetData>" + (f"</{root.group(1).decode()}>" if root else "")
+        self._has_root = root is not None
+        self._row_end = f"</{self.prefix}row>".encode()
+        self._sheet_data_end = f"</{self.prefix}sheetData>".encode()
+
+    def batches(self) -> Iterator[str]:
+        """Yields the XML of consecutive runs of complete rows, in document order."""
+        buffer = self._buffer
+        while buffer is not None:
+            end = buffer.find(self._sheet_data_end)
+            if end != -1:
+                batch, buffer = buffer[:end], None
+            else:
+                # Take the complete rows read so far, keep the rest for the next batch
+                cut = buffer.rfind(self._row_end)
+                cut = cut + len(self._row_end) if cut != -1 else 0
+                batch, buffer = buffer[:cut], buffer[cut:]
+                chunk = self._src.read(_CHUNK_SIZE)
+                if not chunk:
+                    raise ParseError("no element found: unclosed sheetData")
+                buffer += chunk
+            if batch:
+                yield batch.decode("utf-8")
+
+    def rows(self) -> Iterator[Tuple[str, str, str]]:
+        """Yields (start_tag, body, xml) of every row, the body being the raw XML between the row tags."""
+        row_start = f"<{self.prefix}row"
+        row_end = f"</{self.prefix}row>"
+        for batch in self.batches():
+            position = batch.find(row_start)
+            while position != -1:
+                tag_end = batch.index(">", position) + 1
+                if batch[tag_end - 2] == "/":
+                    body_end = next_position = tag_end
+                else:
+                    body_end = batch.index(row_end, tag_end)
+                    next_position = body_end + len(row_end)
+                yield (
+                    batch[position:tag_end],
+                    batch[tag_end:body_end],
+                    batch[position:next_position],
+                )
+                position = batch.find(row_start, next_position)
+
+    def parse_row(self, row_xml: str):
+        """Parses the XML of a single row into an Element, with the namespaces of the worksheet."""
+        sheet_data = fromstring(self._opening + row_xml + self._closing)
+        if self._has_root:
+            sheet_data = sheet_data[-1]
+        return sheet_data[0]
+
+
+class _RowParser:
+    """
+    Converts the cells of a row to values. Rows made only of plain cells (a value or a simple inline string) are
+    matched with a regular expression on the raw XML; any other row (formulas, rich text, unusual attributes) is
+    parsed with ElementTree. Both paths convert the values like openpyxl's read-only worksheet.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        max_col: Optional[int],
+        shared_strings: List[str],
+        date_styles: Set[str],
+        timedelta_styles: Set[str],
+        epoch,
+    ):
+        p = re.escape(prefix)
+        self._cell_re = re.compile(
+            rf'<{p}c r="([A-Z]{{1,3}})[0-9]+"(?: s="([0-9]+)")?(?: t="([a-zA-Z]+)")?\s*'
+            rf"(?:/>|>(?:<{p}v>([^<\r]*)</{p}v>"
+            rf'|(<{p}is><{p}t(?: xml:space="preserve")?>)([^<\r]*)</{p}t></{p}is>)?</{p}c>)'
+        )
+        self._cell_starts = tuple(f"<{prefix}c{end}" for end in (" ", ">", "/"))
+        self._max_col = max_col
+        self._shared_strings = shared_strings
+        self._date_styles = date_styles
+        self._timedelta_styles = timedelta_styles
+        self._epoch = epoch
+        self._column_indexes: Dict[str, int] = {}
+        self._shared_formulae: Dict[str, Translator] = {}
+
+    def _column_index(self, letters: str) -> int:
+        col_index = self._column_indexes.get(letters)
+        if col_index is None:
+            col_index = self._column_indexes[letters] = column_index_from_string(letters)
+        return col_index
+
+    def _set_value(self, values: List, col_index: int, value) -> None:
+        if not self._max_col:
+            values.extend([None] * (col_index - len(values)))
+        values[col_index - 1] = value
+
+    def _convert(self, value: str, data_type: str, style: Optional[str]):
+        """Converts the (non-empty) text of a <v> element according to the cell type and number format."""
+        if data_type == "s":
+            return self._shared_strings[int(value)]
+        if data_type == "n":
+            value = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            if style in self._date_styles:
+                try:
+                    return from_excel(
+                        value, self._epoch, timedelta=style in self._timedelta_styles
+                    )
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value
+
+    def text_values(self, row_body: str) -> Optional[List]:
+        """
+        Returns the values of a row from the raw XML between its tags, or None if some cell is not a plain cell.
+        """
+        cells = self._cell_re.findall(row_body)
+        if len(cells) != sum(row_body.count(start) for start in self._cell_starts):
+            return None
+
+        max_col = self._max_col
+        values: List = [None] * max_col if max_col else []
+        for letters, style, data_type, text, inline, inline_text in cells:
+            col_index = self._column_index(letters)
+            if max_col and col_index > max_col:
+                continue
+            if data_type == "inlineStr":
+                value = _unescape(inline_text) if inline else None
+            elif text and not inline:
+                value = self._convert(_unescape(text), data_type or "n", style)
+            else:
+                value = None
+            self._set_value(values, col_index, value)
+        return values
+
+    def element_values(self, row) -> List:
+        """Returns the values of a row from its parsed Element."""
+        max_col = self._max_col
+        values: List = [None] * max_col if max_col else []
+        col_index = 0
+        for cell in row:
+            if cell.tag != _CELL_TAG:
+                continue
+            coordinate = cell.get("r")
+            if coordinate:
+                col_index = self._column_index(coordinate.rstrip("0123456789"))
+            else:
+                col_index += 1
+            if max_col and col_index > max_col:
+                continue
+
+            data_type = cell.get("t", "n")
+            if cell.find(_FORMULA_TAG) is not None:
+                value = _parse_formula(cell, coordinate, self._shared_formulae)
+            elif data_type == "inlineStr":
+                inline = cell.find(_INLINE_STRING_TAG)
+                value = _inline_string(inline) if inline is not None else None
+            else:
+                value = cell.findtext(_VALUE_TAG) or None
+                if value is not None:
+                    value = self._convert(value, data_type, cell.get("s"))
+            self._set_value(values, col_index, value)
+        return values
+
+
+def _parse_rows(
+    src,
+    shared_strings: List[str],
+    date_styles: Set[str],
+    timedelta_styles: Set[str],
+    epoch,
+) -> Iterator[Tuple]:
+    sheet_data = _SheetData(src)
+    max_row, max_col = _parse_dimension(sheet_data.dimension or "")
+    empty_row: Tuple = (None,) * max_col if max_col else ()
+    parser = _RowParser(
+        sheet_data.prefix, max_col, shared_strings, date_styles, timedelta_styles, epoch
+    )
+    row_counter = 0
+
+    for start_tag, body, row_xml in sheet_data.rows():
+        ref = _ROW_INDEX_RE.search(start_tag)
+        row_index = int(ref.group(1)) if ref else row_counter + 1
+        if max_row is not None and row_index > max_row:
+            break
+
+        # Some rows are missing
+        while row_counter + 1 < row_index:
+            row_counter += 1
+            yield empty_row
+        row_counter = row_index
+
+        values = parser.text_values(body)
+        if values is None:
+            values = parser.element_values(sheet_data.parse_row(row_xml))
+        yield tuple(values)
+
+
+def _unescape(text: str) -> str:
+    """Replaces the XML character and entity references of a raw text."""
+    if "&" not in text:
+        return text
+    return _REFERENCE_RE.sub(_resolve_reference, text)
+
+
+def _resolve_reference(match) -> str:
+    name = match.group(1)
+    if name.startswith("#x"):
+        return chr(int(name[2:], 16))
+    if name.startswith("#"):
+        return chr(int(name[1:]))
+    return _ENTITIES[name]
+
+
+def _inline_string(inline) -> str:
+    """Returns the plain text of an inline string, phonetic runs excluded."""
+    if len(inline) == 1 and inline[0].tag == _TEXT_TAG:
+        return inline[0].text or ""
+    snippets = [inline.findtext(_TEXT_TAG) or ""]
+    for run in inline.findall(_RUN_TAG):
+        snippets.append(run.findtext(_TEXT_TAG) or "")
+    return "".join(snippets)
+
+
+def _parse_formula(cell, coordinate: Optional[str], shared_formulae: Dict[str, Translator]):
+    """Returns the formula of a cell as openpyxl does when loading a workbook without data_only."""
+    formula = cell.find(_FORMULA_TAG)
+    formula_type = formula.get("t")
+    value = "="
+    if formula.text is not None:
+        value += formula.text
+
+    if formula_type == "array":
+        value = ArrayFormula(ref=formula.get("ref"), text=value)
+    elif formula_type == "shared":
+        idx = formula.get("si")
+        if idx in shared_formulae:
+            value = shared_formulae[idx].translate_formula(coordinate)
+        elif value != "=":
+            shared_formulae[idx] = Translator(value, coordinate)
+    elif formula_type == "dataTable":
+        value = DataTableFormula(**formula.attrib)
+    return value
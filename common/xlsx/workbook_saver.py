@@ -0,0 +1,176 @@
+"""
+Utility file to save openpyxl workbooks in a reproducible way.
+
+openpyxl stamps the document properties and every zip entry with the current time, so two saves of the same
+workbook never produce the same bytes. The functions below pin those timestamps to a given run timestamp, so that
+the output files do not depend on when (or in which process) they were written.
+
+The zip compression of the xlsx files can be tuned (from stored, for fast intermediate hand-offs, to the maximum
+deflate level), and the files can be streamed as entries of a single bundle archive instead of separate files.
+"""
+
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from typing import IO, List, Optional, Tuple, Union
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from openpyxl import Workbook
+from openpyxl.writer.excel import ExcelWriter
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+# Compression level of the xlsx files: None is the openpyxl default (deflate, zlib default level),
+# 0 stores the entries uncompressed, 1 (fastest) to 9 (smallest) are deflate levels
+COMPRESSION_STORED = 0
+COMPRESSION_LEVELS = range(0, 10)
+
+
+class _FixedTimeZipFile(ZipFile):
+    """ZipFile writing every entry with the same modification time."""
+
+    def __init__(self, file, date_time: tuple, **kwargs):
+        super().__init__(file, "w", **kwargs)
+        self._date_time = date_time
+
+    def writestr(self, zinfo_or_arcname, data, compress_type=None, compresslevel=None):
+        if not isinstance(zinfo_or_arcname, ZipInfo):
+            zinfo = ZipInfo(filename=zinfo_or_arcname, date_time=self._date_time)
+            zinfo.compress_type = self.compression
+            zinfo._compresslevel = self.compresslevel
+            zinfo.external_attr = 0o600 << 16
+            zinfo_or_arcname = zinfo
+        super().writestr(zinfo_or_arcname, data, compress_type, compresslevel)
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        # Used by openpyxl for the worksheets of write-only workbooks
+        zinfo = ZipInfo.from_file(filename, arcname)
+        zinfo.date_time = self._date_time
+        zinfo.external_attr = 0o600 << 16
+        zinfo.compress_type = compress_type if compress_type is not None else self.compression
+        zinfo._compresslevel = compresslevel if compresslevel is not None else self.compresslevel
+        with open(filename, "rb") as src, self.open(zinfo, "w") as dest:
+            shutil.copyfileobj(src, dest, 1024 * 1024)
+
+
+def run_timestamp() -> datetime:
+    """Returns the current UTC time truncated to the second, to be shared by all the files of a run."""
+    return datetime.now(tz=timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def zip_compression(compression_level: Optional[int]) -> Tuple[int, Optional[int]]:
+    """
+    Returns the zipfile compression method and level of a compression level of the configuration.
+
+    Args:
+        compression_level (Optional[int]): None (default deflate), 0 (stored) or a deflate level from 1 to 9.
+
+    Returns:
+        Tuple[int, Optional[int]]: The compression method and the compresslevel argument of zipfile.
+    """
+    if compression_level is None:
+        return ZIP_DEFLATED, None
+    if compression_level not in COMPRESSION_LEVELS:
+        raise ValueError(f"Invalid compression level: {compression_level} (expected 0 to 9)")
+    if compression_level == COMPRESSION_STORED:
+        return ZIP_STORED, None
+    return ZIP_DEFLATED, compression_level
+
+
+class BundleArchive:
+    """
+    Zip archive receiving the output files of a run while they are saved: every file is streamed into an entry
+    of the archive, it is never written to disk on its own. The entries are stored (the xlsx files are already
+    compressed) with the timestamp of the run.
+
+    The archive is written to a temporary file next to its path and renamed when it is closed, so the path only
+    ever holds a complete archive. If the run fails, the temporary file is removed.
+    """
+
+    def __init__(self, path: str, timestamp: Optional[datetime] = None):
+        if timestamp is None:
+            timestamp = run_timestamp()
+        self.path = path
+        self.names: List[str] = []
+        self._temp_path = f"{path}.partial"
+        self._date_time = timestamp.timetuple()[:6]
+        self._archive = ZipFile(self._temp_path, "w", compression=ZIP_STORED, allowZip64=True)
+
+    def open_entry(self, name: str) -> IO[bytes]:
+        """Returns the writable stream of a new entry of the archive; it must be closed before the next one."""
+        zinfo = ZipInfo(filename=name, date_time=self._date_time)
+        zinfo.compress_type = ZIP_STORED
+        zinfo.external_attr = 0o600 << 16
+        self.names.append(name)
+        return self._archive.open(zinfo, "w", force_zip64=True)
+
+    def close(self) -> None:
+        """Writes the central directory and moves the archive to its path."""
+        self._archive.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self) -> None:
+        """Closes the archive and removes it, leaving the previous archive (if any) in place."""
+        self._archive.close()
+        os.remove(self._temp_path)
+
+    def __enter__(self) -> "BundleArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _write_workbook(
+    workbook: Workbook,
+    file: Union[str, IO[bytes]],
+    timestamp: datetime,
+    compression_level: Optional[int],
+) -> None:
+    compression, compresslevel = zip_compression(compression_level)
+    archive = _FixedTimeZipFile(
+        file,
+        date_time=timestamp.timetuple()[:6],
+        compression=compression,
+        compresslevel=compresslevel,
+        allowZip64=True,
+    )
+    writer = ExcelWriter(workbook, archive)
+    writer.save()
+
+
+def save_workbook(
+    workbook: Workbook,
+    filename: str,
+    timestamp: Optional[datetime] = None,
+    compression_level: Optional[int] = None,
+    bundle: Optional[BundleArchive] = None,
+) -> None:
+    """
+    Saves the workbook like Workbook.save(), using the given timestamp for the document properties and the
+    zip entries, so that the same workbook content always produces the same file.
+
+    Args:
+        workbook (Workbook): The workbook to save.
+        filename (str): Path of the output xlsx file (its base name is the entry name in a bundle).
+        timestamp (Optional[datetime]): UTC timestamp of the run (default: now).
+        compression_level (Optional[int]): None (default deflate), 0 (stored) or a deflate level from 1 to 9.
+        bundle (Optional[BundleArchive]): If given, the file is streamed into this archive instead of filename.
+    """
+    if timestamp is None:
+        timestamp = run_timestamp()
+
+    workbook.properties.created = timestamp
+    workbook.properties.modified = timestamp
+
+    if bundle is None:
+        _write_workbook(workbook, filename, timestamp, compression_level)
+        return
+    with bundle.open_entry(os.path.basename(filename)) as entry:
+        _write_workbook(workbook, entry, timestamp, compression_level)
@@ -1,11 +1,18 @@
 import math
 import os
 import sys
-from copy import copy
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Side, borders
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import MergedCell
+from openpyxl.cell.read_only import EmptyCell
+from openpyxl.styles import Alignment, Side, borders
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
@@ -13,6 +20,20 @@ from openpyxl.worksheet.worksheet import Worksheet
 CWD = os.getcwd()
 sys.path.append(CWD)
 
+from common.utilities.logger import SingletonLogger
+from common.xlsx.model_template import CellStyle, read_cell_style, style_cache
+from common.xlsx.sheet_xml_reader import read_sheet_format
+from common.xlsx.workbook_saver import run_timestamp, save_workbook
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+# Righe di intestazione dei file da dividere
+HEADER_ROWS = 12
+# Riga dell'intestazione che riceve il bordo inferiore grigio
+HEADER_BORDER_ROW = 11
+# Larghezza data da openpyxl alle colonne senza una larghezza propria, copiata così nei file di output
+DEFAULT_COLUMN_WIDTH = 13
+
 
 def get_no_border_style():
     side = Side(border_style=None)
@@ -25,62 +46,181 @@ def get_no_border_style():
     return no_border
 
 
-def remove_odd_columns(sheet):
+def remove_odd_columns(sheet: Worksheet) -> None:
+    """
+    Elimina le colonne dispari del foglio. Ogni colonna pari è spostata una sola volta nella sua nuova colonna con
+    move_range(), che sposta solo le celle di quella colonna, poi le colonne rimaste oltre l'ultima colonna pari sono
+    eliminate con un solo delete_cols(), invece di un delete_cols() per colonna che sposta ogni volta tutte le celle
+    successive. Come delete_cols(), non modifica le celle unite e le dimensioni delle colonne.
+
+    Args:
+        sheet (Worksheet): Il foglio da modificare.
+    """
     max_col = sheet.max_column
-    columns_to_delete = []
+    min_row, max_row = sheet.min_row, sheet.max_row
+    kept_columns = max_col // 2
+    for col_index in range(1, kept_columns + 1):
+        # La colonna 2k diventa la colonna k: la colonna k è dispari, o è una colonna pari già spostata
+        column_letter = get_column_letter(2 * col_index)
+        sheet.move_range(f"{column_letter}{min_row}:{column_letter}{max_row}", cols=-col_index)
+    if max_col > kept_columns:
+        sheet.delete_cols(kept_columns + 1, max_col - kept_columns)
+    logger.info("%d colonne dispari eliminate su %d", (max_col + 1) // 2, max_col)
 
-    # Identifica le colonne dispari
-    for col_index in range(1, max_col + 1):
-        if (
-            col_index % 2 != 0
-        ):  # Se l'indice è dispari, aggiungi la colonna da eliminare
-            columns_to_delete.append(col_index)
 
-    # Inizia a eliminare le colonne dalla fine verso l'inizio per non alterare gli indici
-    for col_index in reversed(columns_to_delete):
-        col_letter = get_column_letter(col_index)
-        sheet.delete_cols(col_index)
-        print(f"Colonna {col_letter} eliminata")
+@dataclass
+class HeaderTemplate:
+    """
+    Intestazione di un foglio sorgente, letta una sola volta e copiata in ogni file di output.
 
+    Attributes:
+        values (List[List]): Valori delle righe di intestazione.
+        styles (List[List[Optional[CellStyle]]]): Stili delle celle di intestazione (senza formato numerico).
+        row_heights (Dict[int, float]): Altezze delle righe di intestazione.
+        column_widths (Dict[str, float]): Larghezze delle colonne, per lettera.
+        merged_ranges (List[str]): Celle unite del foglio sorgente.
+    """
+
+    values: List[List] = field(default_factory=list)
+    styles: List[List[Optional[CellStyle]]] = field(default_factory=list)
+    row_heights: Dict[int, float] = field(default_factory=dict)
+    column_widths: Dict[str, float] = field(default_factory=dict)
+    merged_ranges: List[str] = field(default_factory=list)
 
-def copy_header(source_sheet: Worksheet, target_sheet: Worksheet):
-    # Copia le prime 12 righe (intestazione) e le celle unite
-    for row_index in range(1, 13):  # Copiamo le prime 12 righe
-        for col_index in range(1, source_sheet.max_column + 1):
-            cell = source_sheet.cell(row=row_index, column=col_index)
-            new_cell = target_sheet.cell(
-                row=row_index, column=col_index, value=cell.value
-            )
-            # Copia la formattazione delle celle
-            if cell.has_style:
-                new_cell.font = copy(cell.font)
-                new_cell.fill = copy(cell.fill)
-                new_cell.border = copy(cell.border)
-                new_cell.alignment = copy(cell.alignment)
-
-            # Copia la larghezza delle colonne
-            if col_index <= source_sheet.max_column:
-                new_sheet_col_letter = get_column_letter(col_index)
-                source_sheet_col_letter = get_column_letter(col_index)
-                target_sheet.column_dimensions[new_sheet_col_letter].width = (
-                    source_sheet.column_dimensions[source_sheet_col_letter].width
-                )
-
-    # Copia le altezze delle righe
-    for row_index in range(1, 13):
-        target_sheet.row_dimensions[row_index].height = source_sheet.row_dimensions[
-            row_index
-        ].height
 
+def _header_border_style(style: Optional[CellStyle]) -> CellStyle:
+    """Restituisce lo stile con il solo bordo inferiore grigio scuro della riga HEADER_BORDER_ROW."""
     dark_gray = Side(border_style="thin", color="A0A0A0")  # Colore grigio scuro
     border = borders.Border(bottom=dark_gray)
+    if style is None:
+        return CellStyle(font=DEFAULT_FONT, fill=DEFAULT_EMPTY_FILL, border=border, alignment=Alignment())
+    return style._replace(border=border)
+
+
+def _read_header_cells(header: HeaderTemplate, rows: Iterable[Sequence], max_column: int) -> None:
+    """
+    Legge valori e stili delle celle di intestazione (celle normali o read-only), e imposta la larghezza predefinita
+    delle colonne.
+    """
+    for col_index in range(1, max_column + 1):
+        header.column_widths[get_column_letter(col_index)] = DEFAULT_COLUMN_WIDTH
+    for row_index, row in enumerate(rows, 1):
+        header.values.append([cell.value for cell in row])
+        styles = [read_cell_style(cell, False) for cell in row]
+        if row_index == HEADER_BORDER_ROW:
+            styles = [_header_border_style(style) for style in styles]
+        header.styles.append(styles)
+
+
+def compile_header(source_sheet: Worksheet, header_rows: int = HEADER_ROWS) -> HeaderTemplate:
+    """
+    Compila l'intestazione di un foglio caricato in memoria.
+
+    Args:
+        source_sheet (Worksheet): Il foglio sorgente.
+        header_rows (int): Numero di righe di intestazione.
+
+    Returns:
+        HeaderTemplate: L'intestazione compilata.
+    """
+    header = HeaderTemplate()
+    max_column = source_sheet.max_column
+    _read_header_cells(
+        header, source_sheet.iter_rows(min_row=1, max_row=header_rows, max_col=max_column), max_column
+    )
+    for dimension in source_sheet.column_dimensions.values():
+        if dimension.width is not None and dimension.min is not None:
+            for col_index in range(dimension.min, (dimension.max or dimension.min) + 1):
+                header.column_widths[get_column_letter(col_index)] = dimension.width
+    for row_index in range(1, header_rows + 1):
+        dimension = source_sheet.row_dimensions.get(row_index)
+        if dimension is not None and dimension.height is not None:
+            header.row_heights[row_index] = dimension.height
+    header.merged_ranges = [str(merged_range) for merged_range in source_sheet.merged_cells.ranges]
+    return header
+
+
+def load_header_template(input_file: str, header_rows: int = HEADER_ROWS) -> HeaderTemplate:
+    """
+    Compila l'intestazione del foglio attivo di un file excel senza caricarlo: le celle sono lette in modalità
+    read-only, le dimensioni e le celle unite da una scansione dell'XML del foglio.
+
+    Args:
+        input_file (str): Percorso del file excel.
+        header_rows (int): Numero di righe di intestazione.
+
+    Returns:
+        HeaderTemplate: L'intestazione compilata.
+    """
+    header = HeaderTemplate()
+    wb = load_workbook(input_file, read_only=True)
+    try:
+        sheet = wb.active
+        max_column = sheet.max_column
+        if max_column is None:
+            # Il file non dichiara le sue dimensioni: le colonne sono quelle della riga di intestazione più lunga
+            max_column = max((len(row) for row in sheet.iter_rows(min_row=1, max_row=header_rows)), default=0)
+        _read_header_cells(
+            header, sheet.iter_rows(min_row=1, max_row=header_rows, max_col=max_column), max_column
+        )
+    finally:
+        wb.close()
+    sheet_format = read_sheet_format(input_file, header_rows)
+    header.column_widths.update(sheet_format.column_widths)
+    header.row_heights = sheet_format.row_heights
+    header.merged_ranges = sheet_format.merged_ranges
+    return header
+
+
+def apply_header(header: HeaderTemplate, target_sheet: Worksheet) -> None:
+    """
+    Copia l'intestazione compilata nel foglio di destinazione, con la formattazione, le dimensioni e le celle unite.
 
-    for col_index in range(1, target_sheet.max_column + 1):
-        target_sheet.cell(row=11, column=col_index).border = border
+    Args:
+        header (HeaderTemplate): L'intestazione compilata.
+        target_sheet (Worksheet): Il foglio di destinazione.
+    """
+    styles_cache = style_cache(target_sheet)
+    for row_index, (values, styles) in enumerate(zip(header.values, header.styles), 1):
+        for col_index, (value, style) in enumerate(zip(values, styles), 1):
+            new_cell = target_sheet.cell(row=row_index, column=col_index, value=value)
+            styles_cache.apply(new_cell, style)
+
+    # Le larghezze delle colonne sono impostate una sola volta per colonna
+    for col_letter, width in header.column_widths.items():
+        target_sheet.column_dimensions[col_letter].width = width
+    for row_index, height in header.row_heights.items():
+        target_sheet.row_dimensions[row_index].height = height
 
     # Copia la struttura delle celle unite
-    for merged_range in source_sheet.merged_cells.ranges:
-        target_sheet.merge_cells(str(merged_range))
+    for merged_range in header.merged_ranges:
+        target_sheet.merge_cells(merged_range)
+
+
+def copy_header(source_sheet: Worksheet, target_sheet: Worksheet):
+    # Copia l'intestazione con la formattazione e le celle unite
+    apply_header(compile_header(source_sheet), target_sheet)
+
+
+def _compile_header_rows(header: HeaderTemplate) -> List[List[Tuple[object, Optional[CellStyle]]]]:
+    """
+    Restituisce (valore, stile) di ogni cella di intestazione come appare dopo l'unione delle celle: l'intestazione
+    è copiata una volta in un foglio di appoggio e riletta, per poterla scrivere in streaming in ogni file.
+    """
+    scratch_sheet = Workbook().active
+    apply_header(header, scratch_sheet)
+    rows = []
+    for row_index, values in enumerate(header.values, 1):
+        row = []
+        for col_index in range(1, len(values) + 1):
+            cell = scratch_sheet._cells.get((row_index, col_index))
+            if cell is None:
+                row.append((None, None))
+            else:
+                value = None if isinstance(cell, MergedCell) else cell.value
+                row.append((value, read_cell_style(cell, False)))
+        rows.append(row)
+    return rows
 
 
 def format_date_cell(cell):
@@ -92,52 +232,117 @@ def format_date_cell(cell):
     return cell.value
 
 
+def _write_part(
+    header: HeaderTemplate,
+    header_rows: List[List[Tuple[object, Optional[CellStyle]]]],
+    rows: Iterable[Sequence],
+    start_row: int,
+    output_file: str,
+    timestamp: datetime,
+) -> None:
+    """
+    Scrive un file di output in streaming: l'intestazione compilata e le righe di dati lette dal file sorgente in
+    modalità read-only, con lo stile di ogni cella. Le righe di dati mantengono il loro indice di riga originale.
+    """
+    new_wb = Workbook(write_only=True)
+    new_sheet = new_wb.create_sheet()
+    styles_cache = style_cache(new_sheet)
+
+    # Le larghezze delle colonne e le celle unite vanno impostate prima di scrivere le righe
+    for col_letter, width in header.column_widths.items():
+        new_sheet.column_dimensions[col_letter].width = width
+    for merged_range in header.merged_ranges:
+        new_sheet.merged_cells.add(merged_range)
+
+    for row_index, row in enumerate(header_rows, 1):
+        if row_index in header.row_heights:
+            new_sheet.row_dimensions[row_index].height = header.row_heights[row_index]
+        cells = []
+        for value, style in row:
+            if value is None and style is None:
+                cells.append(None)
+                continue
+            new_cell = WriteOnlyCell(new_sheet, value=value)
+            styles_cache.apply(new_cell, style)
+            cells.append(new_cell)
+        new_sheet.append(cells)
+        if row_index in header.row_heights:
+            del new_sheet.row_dimensions[row_index]  # Già scritta
+
+    first_row = True
+    for row in rows:
+        if first_row:
+            # Le righe precedenti a quelle di questo file restano vuote
+            for _ in range(len(header_rows) + 1, start_row):
+                new_sheet.append([])
+            first_row = False
+        cells = []
+        for cell in row:
+            if isinstance(cell, EmptyCell) or (cell.value is None and not cell.has_style):
+                cells.append(None)
+                continue
+            value = cell.value.date() if isinstance(cell.value, datetime) else cell.value
+            new_cell = WriteOnlyCell(new_sheet, value=value)
+            # Copia la formattazione delle celle
+            styles_cache.copy_cell_style(cell, new_cell, with_number_format=False)
+            cells.append(new_cell)
+        new_sheet.append(cells)
+
+    save_workbook(new_wb, output_file, timestamp)
+
+
 def split_excel(input_file, product_name, output_folder, N):
-    # Carica il file excel originale
-    print(f"Loading workload.")
-    wb: Workbook = load_workbook(input_file)
-    sheet = wb.active
-    print(f"Done.")
-
-    # Determina il numero di righe totali (a partire dalla riga 13)
-    total_rows = sheet.max_row - 12  # Escludiamo le prime 12 righe di intestazione
-    rows_per_file = math.ceil(total_rows / N)
-
-    # Suddivisione delle righe della tabella nei vari file
-    for file_index in range(N):
-        new_wb = Workbook()
-        new_sheet = new_wb.active
-
-        print(f"Coping header.")
-        # Copia l'intestazione con la formattazione e le celle unite
-        copy_header(sheet, new_sheet)
-        print(f"Done.")
-
-        # Calcola l'intervallo di righe per questo file
-        start_row = 13 + file_index * rows_per_file
-        end_row = min(12 + (file_index + 1) * rows_per_file, sheet.max_row)
-
-        # Copia le righe di dati con la formattazione
-        for row_index in range(start_row, end_row + 1):
-            for col_index in range(1, sheet.max_column + 1):
-                cell = sheet.cell(row=row_index, column=col_index)
-                new_cell = new_sheet.cell(
-                    row=row_index, column=col_index, value=format_date_cell(cell)
-                )
-                # Copia la formattazione delle celle
-                if cell.has_style:
-                    new_cell.font = copy(cell.font)
-                    new_cell.fill = copy(cell.fill)
-                    new_cell.border = copy(cell.border)
-                    new_cell.alignment = copy(cell.alignment)
-
-                print(f"Cell ({row_index},{col_index}) copied.")
-
-        # Salva il nuovo file
+    """
+    Divide le righe di dati del file excel in N file, ognuno con l'intestazione del file originale.
+
+    Il file è letto in modalità read-only in un solo passaggio e l'intestazione è compilata una sola volta; ogni
+    file di output è scritto in streaming, quindi la memoria usata non dipende dal numero di righe.
+
+    Args:
+        input_file (str): Percorso del file excel da dividere.
+        product_name (str): Nome base dei file di output.
+        output_folder (str): Cartella dei file di output.
+        N (int): Numero di file di output.
+    """
+    # Carica l'intestazione del file excel originale
+    logger.info("Loading workload.")
+    header = load_header_template(input_file)
+    header_rows = _compile_header_rows(header)
+    timestamp = run_timestamp()
+
+    wb = load_workbook(input_file, read_only=True)
+    try:
+        sheet = wb.active
+        max_row = sheet.max_row
+        if max_row is None:
+            # Il file non dichiara le sue dimensioni: conta le righe
+            max_row = sum(1 for _ in sheet.iter_rows(values_only=True))
+        logger.info("Done.")
+
+        # Determina il numero di righe totali (a partire dalla riga 13)
+        total_rows = max_row - HEADER_ROWS  # Escludiamo le prime 12 righe di intestazione
+        rows_per_file = math.ceil(total_rows / N)
+        rows = sheet.iter_rows(min_row=HEADER_ROWS + 1, max_row=max_row, max_col=sheet.max_column)
+
+        # Suddivisione delle righe della tabella nei vari file
         os.makedirs(output_folder, exist_ok=True)
-        output_file = f"{output_folder}\\{product_name}_part_{file_index + 1}.xlsx"
-        new_wb.save(output_file)
-        print(f"File {output_file} created.")
+        for file_index in range(N):
+            # Calcola l'intervallo di righe per questo file
+            start_row = HEADER_ROWS + 1 + file_index * rows_per_file
+            end_row = min(HEADER_ROWS + (file_index + 1) * rows_per_file, max_row)
+
+            output_file = os.path.join(output_folder, f"{product_name}_part_{file_index + 1}.xlsx")
+            _write_part(
+                header,
+                header_rows,
+                islice(rows, max(end_row - start_row + 1, 0)),
+                start_row,
+                output_file,
+                timestamp,
+            )
+            logger.info("File %s created.", output_file)
+    finally:
+        wb.close()
 
 
 # # Example
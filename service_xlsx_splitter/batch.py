@@ -0,0 +1,313 @@
+"""
+Batch mode of the splitter: many input workbooks split in one run.
+
+The `jobs` of the configuration are expanded into one configuration per input workbook: every job entry overrides
+the top-level settings with its own (input, model, split settings...), and an entry with an `input_glob` stands for
+every input Excel file of the input folder matching the pattern.
+
+The jobs are run largest input first, on one pool of worker processes created for the whole batch, so a run pays
+the interpreter start-up and the imports once per worker instead of once per workbook, and every worker keeps the
+model templates it has compiled for its next jobs. With a single worker the jobs run one after the other in the
+main process. The run ends with a summary of the rows, output files and throughput of every job.
+"""
+
+import glob
+import os
+import shutil
+import sys
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.configuration_keys import ConfigKeys
+from common.utilities.logger import SingletonLogger
+from common.utilities.metrics import STAGE_JOB
+from common.utilities.metrics import configure_worker as configure_metrics_worker
+from common.utilities.metrics import current_settings as current_metrics_settings
+from common.utilities.metrics import measure_stage
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+# Files of an output folder counted as the outputs of a job (output files and bundle archives)
+_OUTPUT_EXTENSIONS = (".xlsx", ".zip")
+
+
+class JobResult(NamedTuple):
+    """
+    Outcome of a job of the batch.
+
+    Attributes:
+        name (str): Name of the input workbook of the job.
+        rows (Optional[int]): Data rows of the split source, None if unknown (direct split of the workbook).
+        output_files (int): Number of files in the output folder of the job.
+        output_bytes (int): Size of those files.
+        wall_seconds (float): Wall time of the job.
+        error (Optional[str]): Why the job failed, None if it succeeded.
+    """
+
+    name: str
+    rows: Optional[int]
+    output_files: int
+    output_bytes: int
+    wall_seconds: float
+    error: Optional[str] = None
+
+
+def _job_defaults(configs: Dict) -> Dict:
+    """Returns the top-level settings of the configuration, shared by all the jobs."""
+    return {
+        key: value
+        for key, value in configs.items()
+        if key not in (ConfigKeys.JOBS.value, ConfigKeys.INPUT_GLOB.value)
+    }
+
+
+def expand_jobs(configs: Dict, input_folder: str) -> List[Dict]:
+    """
+    Returns the configuration of every job of the batch: the top-level configuration updated with the settings
+    of the job, one per matching input Excel file for the entries with an `input_glob`.
+
+    Args:
+        configs (Dict): The configuration, with its list of jobs.
+        input_folder (str): Folder of the input Excel files.
+
+    Returns:
+        List[Dict]: The configurations of the jobs, in the order of the configuration.
+
+    Raises:
+        ValueError: If a job has no input, its glob matches no file, or two jobs have the same input.
+    """
+    defaults = _job_defaults(configs)
+    job_configs = []
+    for job_index, job in enumerate(configs.get(ConfigKeys.JOBS.value) or []):
+        if not isinstance(job, dict):
+            raise ValueError(f"job {job_index} must be an object")
+        settings = {key: value for key, value in job.items() if key != ConfigKeys.INPUT_GLOB.value}
+        pattern = job.get(ConfigKeys.INPUT_GLOB.value)
+        if pattern is None:
+            if not job.get(ConfigKeys.INPUT_XLSX_NAME.value):
+                raise ValueError(
+                    f"job {job_index} needs an '{ConfigKeys.INPUT_XLSX_NAME.value}' "
+                    f"or an '{ConfigKeys.INPUT_GLOB.value}'"
+                )
+            job_configs.append({**defaults, **settings})
+            continue
+
+        paths = sorted(
+            path
+            for path in glob.glob(os.path.join(input_folder, pattern))
+            if path.lower().endswith(".xlsx") and not os.path.basename(path).startswith("~$")
+        )
+        if not paths:
+            raise ValueError(f"job {job_index}: no input Excel file matches '{pattern}'")
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            job_configs.append({**defaults, **settings, ConfigKeys.INPUT_XLSX_NAME.value: name})
+
+    names = [job_config[ConfigKeys.INPUT_XLSX_NAME.value] for job_config in job_configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"input split by more than one job: {', '.join(duplicates)}")
+    return job_configs
+
+
+def job_config_for(configs: Dict, input_xlsx_name: str) -> Dict:
+    """
+    Returns the configuration of the job of an input Excel file: the top-level configuration updated with the
+    settings of the first job naming the file, or whose `input_glob` matches it.
+    """
+    for job in configs.get(ConfigKeys.JOBS.value) or []:
+        pattern = job.get(ConfigKeys.INPUT_GLOB.value)
+        if job.get(ConfigKeys.INPUT_XLSX_NAME.value) == input_xlsx_name or (
+            pattern is not None and fnmatch(f"{input_xlsx_name}.xlsx", pattern)
+        ):
+            settings = {key: value for key, value in job.items() if key != ConfigKeys.INPUT_GLOB.value}
+            break
+    else:
+        settings = {}
+    return {**_job_defaults(configs), **settings, ConfigKeys.INPUT_XLSX_NAME.value: input_xlsx_name}
+
+
+def job_output_folder(job_config: Dict) -> str:
+    """Returns the output folder of a job (see main.run_job())."""
+    return os.path.join(CWD, "output", str(job_config[ConfigKeys.INPUT_XLSX_NAME.value]))
+
+
+def _input_size(job_config: Dict, input_folder: str) -> int:
+    path = os.path.join(input_folder, f"{job_config[ConfigKeys.INPUT_XLSX_NAME.value]}.xlsx")
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def largest_first(job_configs: List[Dict], input_folder: str) -> List[Dict]:
+    """Returns the jobs in the order they are run: largest input Excel file first."""
+    return sorted(job_configs, key=lambda job_config: -_input_size(job_config, input_folder))
+
+
+def job_pool(workers: int) -> ProcessPoolExecutor:
+    """Returns a pool of worker processes for the jobs, logging and measuring through the main process."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure_metrics_worker,
+        initargs=(current_metrics_settings(), SingletonLogger.worker_queue()),
+    )
+
+
+def pool_job(args: Namespace, job_config: Dict) -> Tuple[Namespace, Dict]:
+    """
+    Returns the arguments and the configuration of a job run by a worker of a job pool: the job builds its output
+    files serially, as it must not start its own pool inside a worker.
+    """
+    return Namespace(**{**vars(args), "workers": None}), {**job_config, ConfigKeys.WORKERS.value: 1}
+
+
+def publish_output_folder(staging_folder: str, output_folder: str) -> None:
+    """
+    Replaces the output folder with the staging folder of a job, by renaming the folders: the files of the output
+    folder are always those of a finished run, never files being written.
+    """
+    previous_folder = f"{output_folder}.previous"
+    shutil.rmtree(previous_folder, ignore_errors=True)
+    if os.path.exists(output_folder):
+        os.replace(output_folder, previous_folder)
+    os.replace(staging_folder, output_folder)
+    shutil.rmtree(previous_folder, ignore_errors=True)
+
+
+def _output_files(output_folder: str) -> List[str]:
+    if not os.path.isdir(output_folder):
+        return []
+    return [
+        os.path.join(output_folder, file_name)
+        for file_name in sorted(os.listdir(output_folder))
+        if file_name.lower().endswith(_OUTPUT_EXTENSIONS)
+    ]
+
+
+def run_batch_job(
+    run_job: Callable[..., Optional[int]],
+    args: Namespace,
+    job_config: Dict,
+    atomic_output: bool = False,
+) -> JobResult:
+    """
+    Runs a job (in a worker process, or in the main process) and returns its outcome. With atomic_output, the job
+    writes its files to a staging folder (output/<name>.partial) which replaces the output folder once the job has
+    succeeded; a failed job leaves the output folder as it was.
+    """
+    name = str(job_config[ConfigKeys.INPUT_XLSX_NAME.value])
+    output_folder = job_output_folder(job_config)
+    staging_folder = f"{output_folder}.partial" if atomic_output else None
+    if staging_folder is not None:
+        shutil.rmtree(staging_folder, ignore_errors=True)  # Left by an interrupted run
+    rows, error = None, None
+    start = time.perf_counter()
+    with measure_stage(STAGE_JOB, name=name) as record:
+        try:
+            rows = run_job(args, job_config, True, output_folder=staging_folder)
+            if staging_folder is not None:
+                publish_output_folder(staging_folder, output_folder)
+                logger.info("Output files published in %s", output_folder)
+        except SystemExit:  # The job stopped on an error it has logged
+            error = "stopped on an error, see the log"
+        except Exception as e:
+            logger.error("An error occurred while running the job of %s: %s", name, e)
+            error = str(e)
+        if error is not None and staging_folder is not None:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+            outputs = []
+        else:
+            outputs = _output_files(output_folder)
+        record.update(rows=rows, outputs=outputs, error=error)
+    return JobResult(
+        name=name,
+        rows=rows,
+        output_files=len(outputs),
+        output_bytes=sum(os.path.getsize(path) for path in outputs),
+        wall_seconds=time.perf_counter() - start,
+        error=error,
+    )
+
+
+def run_batch(
+    run_job: Callable[..., Optional[int]],
+    args: Namespace,
+    job_configs: List[Dict],
+    input_folder: str,
+    workers: int = 1,
+) -> List[JobResult]:
+    """
+    Runs the jobs of a batch, largest input first, and returns their outcomes in the order they were scheduled.
+
+    With workers > 1 the jobs are shared by a pool of worker processes, each job splitting its own workbook
+    serially (the pool is the parallelism of the batch); otherwise they run one after the other in the main
+    process with their own settings.
+
+    Args:
+        run_job (Callable): Runs the job of a configuration, returns the data rows it split (main.run_job()).
+        args (Namespace): The command-line arguments, shared by all the jobs.
+        job_configs (List[Dict]): The configurations of the jobs (see expand_jobs()).
+        input_folder (str): Folder of the input Excel files.
+        workers (int): Number of worker processes of the pool.
+
+    Returns:
+        List[JobResult]: The outcome of every job.
+    """
+    scheduled = largest_first(job_configs, input_folder)
+    workers = min(workers, len(scheduled))
+    logger.info("Running %d jobs with %d worker(s), largest input first.", len(scheduled), max(workers, 1))
+    if workers <= 1:
+        return [run_batch_job(run_job, args, job_config) for job_config in scheduled]
+
+    with job_pool(workers) as executor:
+        # The pool takes the jobs in the order they are submitted
+        futures = [
+            executor.submit(run_batch_job, run_job, *pool_job(args, job_config))
+            for job_config in scheduled
+        ]
+        return [future.result() for future in futures]
+
+
+def log_job_result(result: JobResult, prefix: str = "  ") -> None:
+    """Logs the rows, output files and throughput of a job."""
+    rows = "-" if result.rows is None else str(result.rows)
+    rows_per_second = (
+        f"{result.rows / result.wall_seconds:.0f}"
+        if result.rows and result.wall_seconds
+        else "-"
+    )
+    status = f"FAILED ({result.error})" if result.error else "ok"
+    logger.info(
+        "%s%s: %s rows, %d files (%.1f MB) in %.1f s, %s rows/s, %s",
+        prefix,
+        result.name,
+        rows,
+        result.output_files,
+        result.output_bytes / (1024 * 1024),
+        result.wall_seconds,
+        rows_per_second,
+        status,
+    )
+
+
+def log_summary(results: List[JobResult], wall_seconds: float) -> None:
+    """Logs the rows, output files and throughput of every job of the batch, and of the batch as a whole."""
+    logger.info("Batch summary:")
+    for result in results:
+        log_job_result(result)
+    total_rows = sum(result.rows or 0 for result in results)
+    failed = sum(1 for result in results if result.error)
+    logger.info(
+        "  %d jobs (%d failed): %d rows, %d files in %.1f s, %.0f rows/s",
+        len(results),
+        failed,
+        total_rows,
+        sum(result.output_files for result in results),
+        wall_seconds,
+        total_rows / wall_seconds if wall_seconds else 0,
+    )
@@ -6,6 +6,7 @@ existing CSV file if available, allowing users to skip the CSV generation step.
 ### Functionality:
 - Converts a specified Excel file to a CSV format.
 - Splits the CSV into multiple Excel files, each containing a portion of the data.
+- Optionally routes the data rows to separate partitions in a single pass, each split into its own Excel files.
 - Copies header and alternating row styles, merged cell structures, and column widths from a model Excel file to the 
   smaller Excel files.
 - Uses a configuration file (`config.json`) to define the input/output paths, formatting model, and the number of 
@@ -14,6 +15,20 @@ existing CSV file if available, allowing users to skip the CSV generation step.
 ### Parameters:
 - The script accepts command-line arguments via `argparse`:
   - `--csv`: Skip the CSV generation step if the CSV file already exists.
+  - `--direct_xlsx`: Split the input Excel file directly, without the intermediate CSV file.
+  - `--workers`: Number of worker processes used to build the output files (overrides `WORKERS`).
+  - `--force`: Rebuild every stage and output file, ignoring the run manifest.
+  - `--metrics`: Write the wall time, CPU time, rows/sec, peak memory and output bytes of every stage (extract,
+    process, template load, and per output file fill, style and save) to `metrics.jsonl` in the output folder.
+  - `--profile STAGE`: Run the given stage under cProfile and write its statistics to the output folder.
+  - `--watch`: Keep running as a service: every Excel file dropped into (or changed in) the `input` folder is
+    extracted and split with the settings of its job (see `JOBS`, the top-level settings otherwise) as soon as it
+    has been completely written, largest first, by a pool of `WORKERS` processes kept warm between the files. The
+    model workbooks are never split. The files of a job are built in `output/<name>.partial`, which replaces
+    `output/<name>` once the job has succeeded. Stop the service with Ctrl+C.
+
+- A run manifest (`run_manifest.json`) is kept in the output folder: the stages and output files that are already
+  up to date with their inputs and parameters are skipped, so an interrupted run resumes where it stopped.
   
 - The script loads the following configuration values from a `config.json` file:
   - `INPUT_XLSX_NAME`: The name of the input Excel file (without extension).
@@ -23,6 +38,51 @@ existing CSV file if available, allowing users to skip the CSV generation step.
   - `HEADER_ROWS`: The number of rows at the top of the file to be treated as a header.
   - `ROW_REF_ODD`: The reference row for the style of odd-numbered rows in the data table.
   - `ROW_REF_EVEN`: The reference row for the style of even-numbered rows in the data table.
+  - `WORKERS`: The number of worker processes used to build the output files (optional, default 1).
+  - `OUTPUT_ENGINE`: The output engine, `workbook` (in-memory, default) or `write_only` (streaming,
+    optional).
+  - `EXTRACT_ENGINE`: The CSV extraction engine, `openpyxl` (default) or, opt-in, `xml` (native sheet XML
+    parser, optional).
+  - `MANIFEST_HASH`: Compare the files of the run manifest by content hash, not only by size and time (optional).
+  - `PARTITIONS`: Partitions of the data rows, each split into its own output files (optional). Every entry has a
+    `name`, the 0-based CSV `column` tested, the `values` and/or the regular expression `pattern` that select the
+    row, and the `num_target_file` of the partition. No partition is configured by default; e.g. to split the rows
+    with `CA2023` in column 'N. doc.' (11) into a file of their own:
+    `"partitions" : [{"name" : "CA2023", "column" : 11, "values" : ["CA2023"], "num_target_file" : 1}]`.
+    The rows selected by no partition, and the footer row of the table, are split into `NUM_TARGET_FILE` files as
+    usual; the last row of a partition is formatted as a data row.
+  - `SPLIT_STRATEGY`: `rows` (same number of rows in every file, default) or, opt-in, `groups` (the 'N. doc.'
+    series are never divided between two files, at the cost of an extra pass over the group column, optional).
+    With fewer series than files, only the files with rows are created; the footer row goes with the last series.
+  - `SPLIT_TOLERANCE`: Relative difference of the file sizes from the average above which the `groups` strategy
+    logs a warning (optional, default 0.1).
+  - `MAX_ROWS_PER_PART`, `MAX_BYTES_PER_PART`: Alternative to `NUM_TARGET_FILE`: the maximum number of data rows
+    and/or the maximum estimated size in bytes (uncompressed cell payload) of an output file. When a file is full,
+    the split rolls over to a new file (optional).
+  - `PIPELINE_DEPTH`: Pipelined split: the source is read, and its rows converted, by separate threads while the
+    output files are built and compressed, with at most this many chunks of rows queued between two threads
+    (optional, default 0: no pipeline).
+  - `COMPRESSION_LEVEL`: Zip compression of the output files: `0` stores them uncompressed (fastest, e.g. for
+    intermediate hand-offs), `1` (fastest deflate) to `9` (smallest files) (optional, default: openpyxl deflate).
+  - `BUNDLE_ARCHIVE`: Stream all the output files into a single `<INPUT_XLSX_NAME>.zip` archive in the output
+    folder while they are built, instead of saving them as separate files. The archive is rebuilt as a whole by
+    every run and its files are built serially (optional, default false).
+  - `JOBS`: Batch mode: a list of jobs, each splitting its own input Excel file in the same run (optional). Every
+    job is an object overriding any of the settings above (e.g. `input_xlsx_name`, `model_xlsx_name`,
+    `num_target_file`, `split_strategy`), the other settings being taken from the top level of `config.json`. A
+    job with an `input_glob` (e.g. `"LG *_2023.xlsx"`) stands for every matching Excel file of the `input` folder.
+    The jobs run largest input first on one pool of `WORKERS` (or `--workers`) processes, each job building its
+    output files serially, and the run ends with a summary of the rows and throughput of every job. The metrics
+    of all the jobs are written to `output/metrics.jsonl`.
+  - `WATCH_PATTERN`, `WATCH_POLL_SECONDS`: Watch mode (`--watch`): pattern of the Excel files of the `input` folder
+    split by the service (optional, default `*.xlsx`) and polling interval of the folder (optional, default 1 s).
+  - `INTERMEDIATE_FORMAT`: `csv` (text) or `columnar` (typed, memory-mapped `.cols` files: numbers, dates and text
+    keep their type, and the split reads the rows and the group sizes without parsing). With `columnar` the
+    extraction and processing stages write `input/<INPUT_XLSX_NAME>.cols` and `input/<INPUT_XLSX_NAME>_proc.cols`,
+    driven by the same `--extract_csv` and `--process_csv` options; partitions are not supported (optional,
+    default `csv`).
+  - `EXPORT_CSV`: With the `columnar` format, also write the usual CSV file of the split source, for the
+    consumers of the CSV intermediate (optional, default false).
 
 ### Usage:
 1. Ensure that the input Excel file and the model Excel file are present in the `input` folder.
@@ -34,7 +94,10 @@ existing CSV file if available, allowing users to skip the CSV generation step.
 
 import os
 import sys
+import time
 from argparse import Namespace
+from contextlib import nullcontext
+from typing import Optional
 
 # Add current working directory to system path for importing modules
 CWD = os.getcwd()
@@ -44,8 +107,11 @@ from common.utilities.argument_parser import parse_args
 from common.utilities.config_loader import load_json_configs_dict
 from common.utilities.configuration_keys import ConfigKeys
 from common.utilities.logger import SingletonLogger
-from common.xlsx.large_xlsx_splitter_utils import split_csv_to_excel
-from service_xlsx_splitter.subroutines import extract_csv_from_excel, process_csv_file
+from common.utilities.metrics import METRICS_FILE_NAME, MetricsSettings
+from common.utilities.metrics import configure as configure_metrics
+from common.utilities.run_manifest import MANIFEST_FILE_NAME, RunManifest
+from service_xlsx_splitter.batch import expand_jobs, log_summary, run_batch
+from service_xlsx_splitter.watcher import watch_input_folder
 
 CONFIG_JSON_PATH = os.path.join(CWD, "service_xlsx_splitter", "config.json")
 
@@ -58,6 +124,8 @@ def main() -> None:
     """
     Main function to process an Excel file by converting it to CSV and splitting it into multiple smaller Excel files.
     The CSV conversion can be skipped if an existing CSV file is already present by passing the --csv option.
+    With a list of jobs in the configuration, every input Excel file of the jobs is processed in a single run.
+    With --watch, the input folder is watched and every new or changed Excel file is processed until interrupted.
     """
 
     args: Namespace = parse_args()
@@ -65,20 +133,144 @@ def main() -> None:
     # Load configuration values from the JSON file
     configs: dict = load_json_configs_dict(json_path=CONFIG_JSON_PATH)
 
+    if not (args.watch or configs.get(ConfigKeys.JOBS.value)):
+        run_job(args, configs)
+        return
+
+    INPUT_FOLDER: str = os.path.join(CWD, "input")
+    WORKERS: int = int(args.workers or configs.get(ConfigKeys.WORKERS.value, 1))
+    job_configs = []
+    if not args.watch:
+        try:
+            job_configs = expand_jobs(configs, INPUT_FOLDER)
+        except ValueError as e:
+            logger.error("Invalid jobs configuration: %s", e)
+            exit(-1)
+
+    # Metrics and profiles of all the jobs go to the output folder of the batch
+    OUTPUT_FOLDER: str = os.path.join(CWD, "output")
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    configure_metrics(
+        MetricsSettings(
+            metrics_path=(
+                os.path.join(OUTPUT_FOLDER, METRICS_FILE_NAME) if args.metrics else None
+            ),
+            profile_stage=args.profile,
+            profile_dir=OUTPUT_FOLDER,
+        )
+    )
+
+    if args.watch:
+        # Every workbook dropped into the input folder is extracted (and processed with --process_csv)
+        if not args.direct_xlsx:
+            args.extract_csv = True
+        watch_input_folder(run_job, args, configs, INPUT_FOLDER, workers=WORKERS)
+        return
+
+    start = time.perf_counter()
+    results = run_batch(run_job, args, job_configs, INPUT_FOLDER, workers=WORKERS)
+    log_summary(results, time.perf_counter() - start)
+    if any(result.error for result in results):
+        exit(-1)
+
+
+def run_job(
+    args: Namespace, configs: dict, batch: bool = False, output_folder: Optional[str] = None
+) -> Optional[int]:
+    """
+    Splits the input Excel file of a configuration (the whole run, or a job of a batch run).
+
+    Args:
+        args (Namespace): The command-line arguments.
+        configs (dict): The configuration of the job.
+        batch (bool): Whether the job is part of a batch, whose metrics are configured once for all the jobs.
+        output_folder (Optional[str]): Folder of the output files (default: output/<INPUT_XLSX_NAME>).
+
+    Returns:
+        Optional[int]: Number of data rows of the split source, None if not counted (direct split).
+    """
+    # The stages and their dependencies (openpyxl, numpy) are loaded only once the arguments are parsed: --help
+    # and the batch set-up start without them
+    from common.xlsx.columnar_store import ColumnStore
+    from common.xlsx.csv_partitioner import DEFAULT_PARTITION, load_partitions
+    from common.xlsx.large_xlsx_splitter_utils import (
+        EXTRACT_ENGINE_OPENPYXL,
+        INTERMEDIATE_FORMAT_COLUMNAR,
+        INTERMEDIATE_FORMAT_CSV,
+        INTERMEDIATE_FORMATS,
+        OUTPUT_ENGINE_WORKBOOK,
+        SPLIT_STAGE,
+        SPLIT_STRATEGY_ROWS,
+        SPLIT_TOLERANCE,
+        count_csv_rows,
+        split_columns_to_excel,
+        split_csv_to_excel,
+        split_xlsx_to_excel,
+    )
+    from common.xlsx.workbook_saver import BundleArchive, zip_compression
+    from service_xlsx_splitter.subroutines import (
+        export_columns_to_csv,
+        extract_columns_from_excel,
+        extract_csv_from_excel,
+        partition_csv_file,
+        process_columns_file,
+        process_csv_file,
+    )
+
     # Fetch configuration values for input and model Excel names and the number of target files
     INPUT_XLSX_NAME: str = str(configs.get(ConfigKeys.INPUT_XLSX_NAME.value, None))
     MODEL_XLSX_NAME: str = str(configs.get(ConfigKeys.MODEL_XLSX_NAME.value, None))
-    NUM_TARGET_FILE: int = int(configs.get(ConfigKeys.NUM_TARGET_FILE.value, None))
+    NUM_TARGET_FILE: int = int(configs.get(ConfigKeys.NUM_TARGET_FILE.value) or 0)
     TABLE_START_ROW: int = int(configs.get(ConfigKeys.TABLE_START_ROW.value, None))
     HEADER_ROWS: int = int(configs.get(ConfigKeys.HEADER_ROWS.value, None))
     ROW_REF_ODD: int = int(configs.get(ConfigKeys.ROW_REF_ODD.value, None))
     ROW_REF_EVEN: int = int(configs.get(ConfigKeys.ROW_REF_EVEN.value, None))
+    WORKERS: int = int(args.workers or configs.get(ConfigKeys.WORKERS.value, 1))
+    OUTPUT_ENGINE: str = str(
+        configs.get(ConfigKeys.OUTPUT_ENGINE.value, OUTPUT_ENGINE_WORKBOOK)
+    )
+    EXTRACT_ENGINE: str = str(
+        configs.get(ConfigKeys.EXTRACT_ENGINE.value, EXTRACT_ENGINE_OPENPYXL)
+    )
+    MANIFEST_HASH: bool = bool(configs.get(ConfigKeys.MANIFEST_HASH.value, False))
+    SPLIT_STRATEGY: str = str(
+        configs.get(ConfigKeys.SPLIT_STRATEGY.value, SPLIT_STRATEGY_ROWS)
+    )
+    TOLERANCE: float = float(
+        configs.get(ConfigKeys.SPLIT_TOLERANCE.value, SPLIT_TOLERANCE)
+    )
+    MAX_ROWS_PER_PART: int = int(configs.get(ConfigKeys.MAX_ROWS_PER_PART.value) or 0)
+    MAX_BYTES_PER_PART: int = int(configs.get(ConfigKeys.MAX_BYTES_PER_PART.value) or 0)
+    PIPELINE_DEPTH: int = int(configs.get(ConfigKeys.PIPELINE_DEPTH.value) or 0)
+    COMPRESSION_LEVEL: Optional[int] = configs.get(ConfigKeys.COMPRESSION_LEVEL.value)
+    BUNDLE_ARCHIVE: bool = bool(configs.get(ConfigKeys.BUNDLE_ARCHIVE.value, False))
+    INTERMEDIATE_FORMAT: str = str(
+        configs.get(ConfigKeys.INTERMEDIATE_FORMAT.value, INTERMEDIATE_FORMAT_CSV)
+    )
+    EXPORT_CSV: bool = bool(configs.get(ConfigKeys.EXPORT_CSV.value, False))
+    if INTERMEDIATE_FORMAT not in INTERMEDIATE_FORMATS:
+        logger.error(
+            "Invalid intermediate format: %s (expected one of %s)",
+            INTERMEDIATE_FORMAT,
+            ", ".join(INTERMEDIATE_FORMATS),
+        )
+        exit(-1)
+    try:
+        zip_compression(COMPRESSION_LEVEL)
+    except ValueError as e:
+        logger.error("Invalid compression configuration: %s", e)
+        exit(-1)
+    try:
+        PARTITIONS = load_partitions(configs.get(ConfigKeys.PARTITIONS.value, []))
+    except ValueError as e:
+        logger.error("Invalid partitions configuration: %s", e)
+        exit(-1)
 
     # Check if mandatory configuration values are present
     if not (
         INPUT_XLSX_NAME
         and MODEL_XLSX_NAME
-        and NUM_TARGET_FILE
+        and (NUM_TARGET_FILE or MAX_ROWS_PER_PART or MAX_BYTES_PER_PART)
         and TABLE_START_ROW
         and HEADER_ROWS
         and ROW_REF_EVEN
@@ -90,37 +282,202 @@ def main() -> None:
     # Define file paths for input Excel, CSV, output folder, and model Excel file
     INPUT_XLSX_PATH: str = os.path.join(CWD, "input", f"{INPUT_XLSX_NAME}.xlsx")
     INPUT_CSV_PATH: str = os.path.join(CWD, "input", f"{INPUT_XLSX_NAME}.csv")
-    OUTPUT_FOLDER: str = os.path.join(CWD, "output", INPUT_XLSX_NAME)
+    OUTPUT_FOLDER: str = output_folder or os.path.join(CWD, "output", INPUT_XLSX_NAME)
     MODEL_XLSX_PATH: str = os.path.join(CWD, "input", f"{MODEL_XLSX_NAME}.xlsx")
     PROCESSED_CSV_PATH: str = os.path.join(CWD, "input", f"{INPUT_XLSX_NAME}_proc.csv")
+    BUNDLE_PATH: str = os.path.join(OUTPUT_FOLDER, f"{INPUT_XLSX_NAME}.zip")
+    INPUT_COLUMNS_PATH: str = os.path.join(CWD, "input", f"{INPUT_XLSX_NAME}.cols")
+    PROCESSED_COLUMNS_PATH: str = os.path.join(CWD, "input", f"{INPUT_XLSX_NAME}_proc.cols")
+
+    # The run manifest lets a new run skip what is already up to date
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    manifest = RunManifest(
+        os.path.join(OUTPUT_FOLDER, MANIFEST_FILE_NAME),
+        use_hash=MANIFEST_HASH,
+        reset=args.force,
+    )
+
+    # Metrics and profiling of the stages, written to the output folder
+    if not batch:
+        configure_metrics(
+            MetricsSettings(
+                metrics_path=(
+                    os.path.join(OUTPUT_FOLDER, METRICS_FILE_NAME) if args.metrics else None
+                ),
+                profile_stage=args.profile,
+                profile_dir=OUTPUT_FOLDER,
+            )
+        )
+
+    if args.direct_xlsx:
+        if args.extract_csv or args.process_csv:
+            logger.error("--direct_xlsx cannot be combined with the CSV options.")
+            exit(-1)
+        if PARTITIONS:
+            logger.error("--direct_xlsx cannot be combined with partitions.")
+            exit(-1)
+
+        # Split the input Excel file directly, without the intermediate CSV
+        with BundleArchive(BUNDLE_PATH) if BUNDLE_ARCHIVE else nullcontext() as bundle:
+            split_xlsx_to_excel(
+                model_xlsx_path=MODEL_XLSX_PATH,
+                source_xlsx_file=INPUT_XLSX_PATH,
+                output_folder=OUTPUT_FOLDER,
+                product_name=INPUT_XLSX_NAME,
+                N=NUM_TARGET_FILE,
+                table_start_row=TABLE_START_ROW,
+                header_rows=HEADER_ROWS,
+                row_ref_odd=ROW_REF_ODD,
+                row_ref_even=ROW_REF_EVEN,
+                workers=WORKERS,
+                engine=OUTPUT_ENGINE,
+                manifest=manifest,
+                split_strategy=SPLIT_STRATEGY,
+                tolerance=TOLERANCE,
+                max_rows_per_part=MAX_ROWS_PER_PART,
+                max_bytes_per_part=MAX_BYTES_PER_PART,
+                pipeline_depth=PIPELINE_DEPTH,
+                compression_level=COMPRESSION_LEVEL,
+                bundle=bundle,
+            )
+        logger.info("Files successfully created in %s", BUNDLE_PATH if BUNDLE_ARCHIVE else OUTPUT_FOLDER)
+        return None
+
+    if INTERMEDIATE_FORMAT == INTERMEDIATE_FORMAT_COLUMNAR:
+        if PARTITIONS:
+            logger.error("The columnar intermediate format cannot be combined with partitions.")
+            exit(-1)
+
+        extract_columns_from_excel(
+            args=args,
+            input_xlsx_path=INPUT_XLSX_PATH,
+            output_columns_path=INPUT_COLUMNS_PATH,
+            header_rows=HEADER_ROWS,
+            engine=EXTRACT_ENGINE,
+            manifest=manifest,
+        )
+
+        process_columns_file(
+            args=args,
+            input_columns_path=INPUT_COLUMNS_PATH,
+            processed_columns_path=PROCESSED_COLUMNS_PATH,
+            header_lines=HEADER_ROWS,
+            manifest=manifest,
+        )
+
+        SOURCE_COLUMNS_FILE = PROCESSED_COLUMNS_PATH if args.process_csv else INPUT_COLUMNS_PATH
+        if EXPORT_CSV:
+            export_columns_to_csv(
+                columns_path=SOURCE_COLUMNS_FILE,
+                output_csv_path=PROCESSED_CSV_PATH if args.process_csv else INPUT_CSV_PATH,
+                manifest=manifest,
+            )
+
+        data_rows = ColumnStore(SOURCE_COLUMNS_FILE).row_count
+        if data_rows == 0:
+            logger.info("No data rows in %s, no files created.", SOURCE_COLUMNS_FILE)
+            return 0
+
+        with BundleArchive(BUNDLE_PATH) if BUNDLE_ARCHIVE else nullcontext() as bundle:
+            split_columns_to_excel(
+                model_xlsx_path=MODEL_XLSX_PATH,
+                source_columns_file=SOURCE_COLUMNS_FILE,
+                output_folder=OUTPUT_FOLDER,
+                product_name=INPUT_XLSX_NAME,
+                N=NUM_TARGET_FILE,
+                table_start_row=TABLE_START_ROW,
+                header_rows=HEADER_ROWS,
+                row_ref_odd=ROW_REF_ODD,
+                row_ref_even=ROW_REF_EVEN,
+                workers=WORKERS,
+                engine=OUTPUT_ENGINE,
+                manifest=manifest,
+                split_strategy=SPLIT_STRATEGY,
+                tolerance=TOLERANCE,
+                max_rows_per_part=MAX_ROWS_PER_PART,
+                max_bytes_per_part=MAX_BYTES_PER_PART,
+                pipeline_depth=PIPELINE_DEPTH,
+                compression_level=COMPRESSION_LEVEL,
+                bundle=bundle,
+            )
+        logger.info("Files successfully created in %s", BUNDLE_PATH if BUNDLE_ARCHIVE else OUTPUT_FOLDER)
+        return data_rows
 
     extract_csv_from_excel(
         args=args,
         input_xlsx_path=INPUT_XLSX_PATH,
         output_csv_path=INPUT_CSV_PATH,
+        engine=EXTRACT_ENGINE,
+        manifest=manifest,
     )
 
     process_csv_file(
         args=args,
         input_csv_path=INPUT_CSV_PATH,
         processed_csv_path=PROCESSED_CSV_PATH,
+        header_lines=HEADER_ROWS,
+        manifest=manifest,
     )
 
     SOURCE_CSV_FILE = PROCESSED_CSV_PATH if args.process_csv else INPUT_CSV_PATH
 
-    split_csv_to_excel(
-        model_xlsx_path=MODEL_XLSX_PATH,
-        source_csv_file=SOURCE_CSV_FILE,
-        output_folder=OUTPUT_FOLDER,
-        product_name=INPUT_XLSX_NAME,
-        N=NUM_TARGET_FILE,
-        table_start_row=TABLE_START_ROW,
-        header_rows=HEADER_ROWS,
-        row_ref_odd=ROW_REF_ODD,
-        row_ref_even=ROW_REF_EVEN,
-    )
+    # (CSV file, product name, number of output files, manifest stage, footer row) of every split
+    splits = [(SOURCE_CSV_FILE, INPUT_XLSX_NAME, NUM_TARGET_FILE, SPLIT_STAGE, True)]
+    if PARTITIONS:
+        partition_paths = partition_csv_file(
+            source_csv_path=SOURCE_CSV_FILE,
+            partitions=PARTITIONS,
+            header_lines=HEADER_ROWS,
+            manifest=manifest,
+        )
+        splits = [
+            (partition_paths[DEFAULT_PARTITION], INPUT_XLSX_NAME, NUM_TARGET_FILE, SPLIT_STAGE, True)
+        ] + [
+            (
+                partition_paths[partition.name],
+                f"{INPUT_XLSX_NAME}_{partition.name}",
+                partition.num_target_file,
+                f"{SPLIT_STAGE}_{partition.name}",
+                False,  # The footer row of the table stays in the main partition
+            )
+            for partition in PARTITIONS
+        ]
+
+    # All the splits go into the same bundle archive, if any
+    data_rows = 0
+    with BundleArchive(BUNDLE_PATH) if BUNDLE_ARCHIVE else nullcontext() as bundle:
+        for source_csv_file, product_name, num_target_file, stage, footer_row in splits:
+            split_rows = count_csv_rows(source_csv_file) - HEADER_ROWS
+            if split_rows <= 0:
+                logger.info("No data rows in %s, no files created.", source_csv_file)
+                continue
+            data_rows += split_rows
+            split_csv_to_excel(
+                model_xlsx_path=MODEL_XLSX_PATH,
+                source_csv_file=source_csv_file,
+                output_folder=OUTPUT_FOLDER,
+                product_name=product_name,
+                N=num_target_file,
+                table_start_row=TABLE_START_ROW,
+                header_rows=HEADER_ROWS,
+                row_ref_odd=ROW_REF_ODD,
+                row_ref_even=ROW_REF_EVEN,
+                workers=WORKERS,
+                engine=OUTPUT_ENGINE,
+                manifest=manifest,
+                stage=stage,
+                split_strategy=SPLIT_STRATEGY,
+                tolerance=TOLERANCE,
+                max_rows_per_part=MAX_ROWS_PER_PART,
+                max_bytes_per_part=MAX_BYTES_PER_PART,
+                pipeline_depth=PIPELINE_DEPTH,
+                compression_level=COMPRESSION_LEVEL,
+                bundle=bundle,
+                footer_row=footer_row,
+            )
 
-    logger.info(f"Files successfully created in {OUTPUT_FOLDER}")
+    logger.info("Files successfully created in %s", BUNDLE_PATH if BUNDLE_ARCHIVE else OUTPUT_FOLDER)
+    return data_rows
 
 
 if __name__ == "__main__":
@@ -1,28 +1,74 @@
 import os
 import sys
 from argparse import Namespace
+from typing import Dict, List, Optional
 
 # Add current working directory to system path for importing modules
 CWD = os.getcwd()
 sys.path.append(CWD)
 
 from common.utilities.logger import SingletonLogger
-from common.xlsx.large_xlsx_splitter_utils import excel_to_csv, process_csv
+from common.utilities.metrics import STAGE_EXTRACT, STAGE_PROCESS, measure_stage
+from common.utilities.run_manifest import RunManifest
+from common.xlsx.columnar_store import ColumnStore
+from common.xlsx.csv_partitioner import (
+    DEFAULT_PARTITION,
+    Partition,
+    partition_csv,
+    partition_csv_path,
+)
+from common.xlsx.large_xlsx_splitter_utils import (
+    EXTRACT_ENGINE_OPENPYXL,
+    count_csv_rows,
+    excel_to_columns,
+    excel_to_csv,
+    export_columns_csv,
+    process_columns,
+    process_csv,
+)
 
 # Configure logger with colored output and a structured format
 logger = logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
 
+# Names of the stages in the run manifest
+EXTRACT_STAGE = "extract_csv"
+PROCESS_STAGE = "process_csv"
+PARTITION_STAGE = "partition_csv"
+EXTRACT_COLUMNS_STAGE = "extract_columns"
+PROCESS_COLUMNS_STAGE = "process_columns"
+EXPORT_CSV_STAGE = "export_csv"
 
-def extract_csv_from_excel(args: Namespace, input_xlsx_path: str, output_csv_path: str):
+
+def extract_csv_from_excel(
+    args: Namespace,
+    input_xlsx_path: str,
+    output_csv_path: str,
+    engine: str = EXTRACT_ENGINE_OPENPYXL,
+    manifest: Optional[RunManifest] = None,
+):
     # If the --extract_csv option is specified, generate a CSV from the Excel file
     if args.extract_csv:
+        inputs, params = [input_xlsx_path], {"engine": engine, "delimiter": ";"}
+        if manifest is not None and manifest.is_stage_current(
+            EXTRACT_STAGE, inputs, params, [output_csv_path]
+        ):
+            logger.info("CSV file is up to date: %s", output_csv_path)
+            return
+
         logger.info(f"Generating CSV file from {input_xlsx_path}...")
         try:
-            excel_to_csv(
-                input_file_excel=input_xlsx_path,
-                output_file_csv=output_csv_path,
-                delimiter=";",  # CSV delimiter (using this since some fields may contain commas: ',')
-            )
+            if manifest is not None:
+                manifest.start_stage(EXTRACT_STAGE, inputs, params)
+            with measure_stage(STAGE_EXTRACT, engine=engine) as metrics:
+                excel_to_csv(
+                    input_file_excel=input_xlsx_path,
+                    output_file_csv=output_csv_path,
+                    delimiter=";",  # CSV delimiter (using this since some fields may contain commas: ',')
+                    engine=engine,
+                )
+                metrics.update(rows=count_csv_rows(output_csv_path), outputs=[output_csv_path])
+            if manifest is not None:
+                manifest.record_output(EXTRACT_STAGE, output_csv_path)
             logger.info(f"CSV created: {output_csv_path}")
         except Exception as e:
             logger.error(f"An error occurred while exporting the excel to csv: {e}")
@@ -31,14 +77,178 @@ def extract_csv_from_excel(args: Namespace, input_xlsx_path: str, output_csv_pat
         logger.info(f"Using existing CSV file: {output_csv_path}")
 
 
-def process_csv_file(args: Namespace, input_csv_path: str, processed_csv_path: str):
+def process_csv_file(
+    args: Namespace,
+    input_csv_path: str,
+    processed_csv_path: str,
+    header_lines: int,
+    manifest: Optional[RunManifest] = None,
+):
     if args.process_csv:
+        inputs, params = [input_csv_path], {"header_lines": header_lines}
+        if manifest is not None and manifest.is_stage_current(
+            PROCESS_STAGE, inputs, params, [processed_csv_path]
+        ):
+            logger.info("Processed CSV file is up to date: %s", processed_csv_path)
+            return
+
         logger.info(f"Processing CSV file at {input_csv_path} before splitting.")
         try:
-            process_csv(
-                input_csv=input_csv_path,
-                output_csv=processed_csv_path,
-            )
+            if manifest is not None:
+                manifest.start_stage(PROCESS_STAGE, inputs, params)
+            with measure_stage(STAGE_PROCESS) as metrics:
+                process_csv(
+                    input_csv=input_csv_path,
+                    output_csv=processed_csv_path,
+                    header_lines=header_lines,
+                )
+                metrics.update(
+                    rows=count_csv_rows(processed_csv_path), outputs=[processed_csv_path]
+                )
+            if manifest is not None:
+                manifest.record_output(PROCESS_STAGE, processed_csv_path)
         except Exception as e:
             logger.error(f"An error occurred while processing the csv file: {e}")
             exit(-1)
+
+
+def extract_columns_from_excel(
+    args: Namespace,
+    input_xlsx_path: str,
+    output_columns_path: str,
+    header_rows: int,
+    engine: str = EXTRACT_ENGINE_OPENPYXL,
+    manifest: Optional[RunManifest] = None,
+):
+    # If the --extract_csv option is specified, generate the columnar file from the Excel file
+    if args.extract_csv:
+        inputs, params = [input_xlsx_path], {"engine": engine, "header_rows": header_rows}
+        if manifest is not None and manifest.is_stage_current(
+            EXTRACT_COLUMNS_STAGE, inputs, params, [output_columns_path]
+        ):
+            logger.info("Columnar file is up to date: %s", output_columns_path)
+            return
+
+        logger.info("Generating columnar file from %s...", input_xlsx_path)
+        try:
+            if manifest is not None:
+                manifest.start_stage(EXTRACT_COLUMNS_STAGE, inputs, params)
+            with measure_stage(STAGE_EXTRACT, engine=engine) as metrics:
+                excel_to_columns(
+                    input_file_excel=input_xlsx_path,
+                    output_file_columns=output_columns_path,
+                    header_rows=header_rows,
+                    engine=engine,
+                )
+                metrics.update(
+                    rows=ColumnStore(output_columns_path).row_count,
+                    outputs=[output_columns_path],
+                )
+            if manifest is not None:
+                manifest.record_output(EXTRACT_COLUMNS_STAGE, output_columns_path)
+            logger.info("Columnar file created: %s", output_columns_path)
+        except Exception as e:
+            logger.error("An error occurred while exporting the excel to the columnar file: %s", e)
+            exit(-1)
+    else:
+        logger.info("Using existing columnar file: %s", output_columns_path)
+
+
+def process_columns_file(
+    args: Namespace,
+    input_columns_path: str,
+    processed_columns_path: str,
+    header_lines: int,
+    manifest: Optional[RunManifest] = None,
+):
+    if args.process_csv:
+        inputs, params = [input_columns_path], {"header_lines": header_lines}
+        if manifest is not None and manifest.is_stage_current(
+            PROCESS_COLUMNS_STAGE, inputs, params, [processed_columns_path]
+        ):
+            logger.info("Processed columnar file is up to date: %s", processed_columns_path)
+            return
+
+        logger.info("Processing columnar file at %s before splitting.", input_columns_path)
+        try:
+            if manifest is not None:
+                manifest.start_stage(PROCESS_COLUMNS_STAGE, inputs, params)
+            with measure_stage(STAGE_PROCESS) as metrics:
+                process_columns(
+                    input_columns=input_columns_path,
+                    output_columns=processed_columns_path,
+                    header_lines=header_lines,
+                )
+                metrics.update(
+                    rows=ColumnStore(processed_columns_path).row_count,
+                    outputs=[processed_columns_path],
+                )
+            if manifest is not None:
+                manifest.record_output(PROCESS_COLUMNS_STAGE, processed_columns_path)
+        except Exception as e:
+            logger.error("An error occurred while processing the columnar file: %s", e)
+            exit(-1)
+
+
+def export_columns_to_csv(
+    columns_path: str,
+    output_csv_path: str,
+    manifest: Optional[RunManifest] = None,
+):
+    """Writes the CSV file of a columnar file, for the consumers of the CSV intermediate."""
+    inputs, params = [columns_path], {"delimiter": ";"}
+    if manifest is not None and manifest.is_stage_current(
+        EXPORT_CSV_STAGE, inputs, params, [output_csv_path]
+    ):
+        logger.info("Exported CSV file is up to date: %s", output_csv_path)
+        return
+
+    logger.info("Exporting %s to CSV...", columns_path)
+    try:
+        if manifest is not None:
+            manifest.start_stage(EXPORT_CSV_STAGE, inputs, params)
+        export_columns_csv(
+            input_columns=columns_path,
+            output_file_csv=output_csv_path,
+            delimiter=";",
+        )
+        if manifest is not None:
+            manifest.record_output(EXPORT_CSV_STAGE, output_csv_path)
+        logger.info("CSV created: %s", output_csv_path)
+    except Exception as e:
+        logger.error("An error occurred while exporting the columnar file to csv: %s", e)
+        exit(-1)
+
+
+def partition_csv_file(
+    source_csv_path: str,
+    partitions: List[Partition],
+    header_lines: int,
+    manifest: Optional[RunManifest] = None,
+) -> Dict[str, str]:
+    """Splits the source CSV into one CSV per partition, and returns the paths of the partition CSV files by name."""
+    names = [DEFAULT_PARTITION] + [partition.name for partition in partitions]
+    paths = {name: partition_csv_path(source_csv_path, name) for name in names}
+    inputs = [source_csv_path]
+    params = {
+        "partitions": [partition.to_dict() for partition in partitions],
+        "header_lines": header_lines,
+    }
+    if manifest is not None and manifest.is_stage_current(
+        PARTITION_STAGE, inputs, params, list(paths.values())
+    ):
+        logger.info("Partition CSV files are up to date.")
+        return paths
+
+    logger.info("Partitioning CSV file at %s.", source_csv_path)
+    try:
+        if manifest is not None:
+            manifest.start_stage(PARTITION_STAGE, inputs, params)
+        paths = partition_csv(source_csv_path, partitions, header_lines=header_lines)
+        if manifest is not None:
+            for path in paths.values():
+                manifest.record_output(PARTITION_STAGE, path)
+    except Exception as e:
+        logger.error("An error occurred while partitioning the csv file: %s", e)
+        exit(-1)
+    return paths
@@ -0,0 +1,180 @@
+"""
+Watch mode of the splitter: a long-running service splitting every workbook dropped into the input folder.
+
+The input folder is polled: an Excel file is queued once its size and modification time are the same on two
+consecutive polls (it is no longer being copied), and queued again whenever it changes. At start-up, the workbooks
+whose output folder is newer than them are considered already split. The model workbooks of the configuration are
+never queued.
+
+The queued workbooks are split largest first, by a pool of worker processes kept for the whole life of the service
+(or in the main process with a single worker): the imports, the compiled model templates and the processes stay
+warm between the jobs, so a workbook is split as soon as it has arrived. Every job builds its files in a staging
+folder which replaces output/<name> when the job has succeeded (see batch.run_batch_job()), so the output folder
+never holds the files of an unfinished job.
+"""
+
+import os
+import sys
+import time
+from argparse import Namespace
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from fnmatch import fnmatch
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.configuration_keys import ConfigKeys
+from common.utilities.logger import SingletonLogger
+from service_xlsx_splitter.batch import (
+    job_config_for,
+    job_output_folder,
+    job_pool,
+    largest_first,
+    log_job_result,
+    pool_job,
+    run_batch_job,
+)
+
+logger = SingletonLogger.get_instance("my_logger", log_to_console=True)
+
+# Default pattern of the watched Excel files and polling interval of the input folder
+WATCH_PATTERN = "*.xlsx"
+WATCH_POLL_SECONDS = 1.0
+
+# Size and modification time of a file
+Signature = Tuple[int, int]
+
+
+class InputWatcher:
+    """
+    Finds the new and changed Excel files of the input folder, polled with poll().
+
+    Attributes:
+        input_folder (str): The watched folder.
+        pattern (str): Pattern of the names of the watched files.
+        excluded_names (Set[str]): Names (without extension) of the files never reported, e.g. the models.
+    """
+
+    def __init__(self, input_folder: str, pattern: str, excluded_names: Iterable[str] = ()):
+        self.input_folder = input_folder
+        self.pattern = pattern
+        self.excluded_names: Set[str] = set(excluded_names)
+        self._last_seen: Dict[str, Signature] = {}  # Signature at the previous poll
+        self._done: Dict[str, Signature] = {}  # Signature of the last reported version
+
+    def _scan(self) -> Dict[str, Signature]:
+        signatures = {}
+        for file_name in os.listdir(self.input_folder):
+            name, extension = os.path.splitext(file_name)
+            if (
+                extension.lower() != ".xlsx"
+                or file_name.startswith("~$")  # Lock file of an open workbook
+                or not fnmatch(file_name, self.pattern)
+                or name in self.excluded_names
+            ):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.input_folder, file_name))
+            except FileNotFoundError:  # Removed since listed
+                continue
+            signatures[name] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def skip_already_split(self) -> None:
+        """Marks the files whose output folder is newer than them as already reported."""
+        for name, signature in self._scan().items():
+            output_folder = job_output_folder({ConfigKeys.INPUT_XLSX_NAME.value: name})
+            if os.path.isdir(output_folder) and os.stat(output_folder).st_mtime_ns >= signature[1]:
+                self._done[name] = signature
+
+    def poll(self, busy_names: Iterable[str] = ()) -> List[str]:
+        """
+        Returns the names of the files that are new or changed since they were last reported, and unchanged since
+        the previous poll. Every version of a file is reported once; the busy files are reported by a later poll.
+        """
+        signatures = self._scan()
+        busy_names = set(busy_names)
+        ready = [
+            (name, signature)
+            for name, signature in signatures.items()
+            if self._last_seen.get(name) == signature
+            and self._done.get(name) != signature
+            and name not in busy_names
+        ]
+        self._last_seen = signatures
+        for name, signature in ready:
+            self._done[name] = signature
+        return [name for name, _ in ready]
+
+
+def _model_names(configs: Dict) -> Set[str]:
+    """Returns the names of the model Excel files of the configuration (top-level and jobs)."""
+    jobs = [configs] + list(configs.get(ConfigKeys.JOBS.value) or [])
+    return {
+        str(job[ConfigKeys.MODEL_XLSX_NAME.value])
+        for job in jobs
+        if job.get(ConfigKeys.MODEL_XLSX_NAME.value)
+    }
+
+
+def watch_input_folder(
+    run_job: Callable[..., Optional[int]],
+    args: Namespace,
+    configs: Dict,
+    input_folder: str,
+    workers: int = 1,
+) -> None:
+    """
+    Splits every new or changed Excel file of the input folder, until interrupted (Ctrl+C).
+
+    Args:
+        run_job (Callable): Runs the job of a configuration (main.run_job()).
+        args (Namespace): The command-line arguments, shared by all the jobs.
+        configs (Dict): The configuration: the settings of a file are those of its job (see batch.job_config_for()).
+        input_folder (str): The watched input folder.
+        workers (int): Number of worker processes of the pool kept by the service.
+    """
+    pattern = str(configs.get(ConfigKeys.WATCH_PATTERN.value) or WATCH_PATTERN)
+    poll_seconds = float(configs.get(ConfigKeys.WATCH_POLL_SECONDS.value) or WATCH_POLL_SECONDS)
+    watcher = InputWatcher(input_folder, pattern, excluded_names=_model_names(configs))
+    watcher.skip_already_split()
+
+    executor = job_pool(workers) if workers > 1 else None
+    running: Dict[Future, str] = {}
+    logger.info(
+        "Watching %s for %s every %.1f s with %d worker(s), Ctrl+C to stop.",
+        input_folder,
+        pattern,
+        poll_seconds,
+        max(workers, 1),
+    )
+    try:
+        while True:
+            # A changed file is queued again only once its previous job is over
+            ready = watcher.poll(busy_names=running.values())
+            job_configs = largest_first([job_config_for(configs, name) for name in ready], input_folder)
+            for job_config in job_configs:
+                logger.info("Splitting %s.xlsx", job_config[ConfigKeys.INPUT_XLSX_NAME.value])
+                if executor is None:
+                    log_job_result(run_batch_job(run_job, args, job_config, atomic_output=True), prefix="")
+                    continue
+                future = executor.submit(
+                    run_batch_job, run_job, *pool_job(args, job_config), atomic_output=True
+                )
+                running[future] = job_config[ConfigKeys.INPUT_XLSX_NAME.value]
+
+            # Wait for the next poll, or for the end of a job
+            if not running:
+                time.sleep(poll_seconds)
+                continue
+            done, _ = wait(list(running), timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                log_job_result(future.result(), prefix="")
+    except KeyboardInterrupt:
+        logger.info("Watch stopped.")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,122 @@
+"""
+Tests of the column schema: type inference from a sample of rows and per-column conversion of the rows read from
+the CSV file and directly from the workbook.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.column_schema import (
+    ColumnType,
+    NativeRowConverter,
+    RowConverter,
+    convert_date,
+    convert_decimal,
+    convert_integer,
+    infer_column_types,
+    infer_native_column_types,
+)
+
+
+def test_infer_date_column():
+    rows = [["2023-12-30 00:00:00"], ["not a date"], [""]]
+    assert infer_column_types(rows) == [ColumnType.DATE]
+
+
+def test_infer_code_column_with_leading_zeros():
+    # A single code is enough: "00000001" must not become the number 1
+    rows = [["12"], ["00000001"], ["7"]]
+    assert infer_column_types(rows) == [ColumnType.CODE]
+
+
+def test_infer_code_column_too_long_for_excel():
+    rows = [["1234567890123456"], ["12"]]
+    assert infer_column_types(rows) == [ColumnType.CODE]
+
+
+def test_infer_integer_column():
+    rows = [["0"], ["-15"], ["392"], [""]]
+    assert infer_column_types(rows) == [ColumnType.INTEGER]
+
+
+def test_infer_decimal_column_with_comma_and_dot_separators():
+    rows = [["77201,04"], ["1.5"], ["3"], ["-2e3"]]
+    assert infer_column_types(rows) == [ColumnType.DECIMAL]
+
+
+def test_infer_text_column():
+    rows = [["12"], ["12 pcs"]]
+    assert infer_column_types(rows) == [ColumnType.TEXT]
+
+
+def test_infer_empty_and_ragged_columns():
+    rows = [["1", ""], ["2"], ["3", "", "x"]]
+    assert infer_column_types(rows) == [ColumnType.INTEGER, ColumnType.TEXT, ColumnType.TEXT]
+    assert infer_column_types([]) == []
+
+
+def test_converters():
+    assert convert_date("2023-12-30 10:20:30") == "30/12/2023"
+    assert convert_integer("-42") == -42
+    assert convert_decimal("77201,04") == 77201.04
+    assert convert_decimal("1.5e2") == 150.0
+
+
+def test_converters_leave_non_matching_values_unchanged():
+    assert convert_date("30/12/2023") == "30/12/2023"
+    assert convert_date("2023-13-01 00:00:00") == "2023-13-01 00:00:00"
+    assert convert_integer("007") == "007"
+    assert convert_integer("1234567890123456") == "1234567890123456"
+    assert convert_integer("1,5") == "1,5"
+    assert convert_decimal("1.000,50") == "1.000,50"
+    assert convert_decimal("TOTAL") == "TOTAL"
+    assert convert_decimal("") == ""
+
+
+def test_row_converter_converts_only_typed_columns():
+    column_types = [ColumnType.TEXT, ColumnType.CODE, ColumnType.DATE, ColumnType.INTEGER, ColumnType.DECIMAL]
+    convert = RowConverter(column_types)
+    row = ["A0", "00000001", "2023-01-01 00:00:00", "392", "847,43"]
+    assert convert(row) == ["A0", "00000001", "01/01/2023", 392, 847.43]
+
+
+def test_row_converter_keeps_values_not_matching_their_column():
+    convert = RowConverter([ColumnType.INTEGER, ColumnType.DECIMAL, ColumnType.DATE])
+    # e.g. the footer row of the table
+    assert convert(["TOTAL", "", "n/a"]) == ["TOTAL", "", "n/a"]
+
+
+def test_row_converter_short_and_long_rows():
+    convert = RowConverter([ColumnType.INTEGER, ColumnType.INTEGER])
+    assert convert(["1"]) == [1]
+    assert convert(["1", "2", "3"]) == [1, 2, "3"]
+
+
+def test_native_types_are_inferred_like_the_csv_text():
+    native_rows = [["A0", "00000001", datetime(2023, 1, 1), None, "847,43", 392, 1.5]]
+    csv_rows = [["A0", "00000001", "2023-01-01 00:00:00", "", "847,43", "392", "1.5"]]
+    assert infer_native_column_types(native_rows) == infer_column_types(csv_rows)
+
+
+def test_native_row_converter_matches_the_csv_conversion():
+    native_row = ["A0", "00000001", datetime(2023, 1, 1), None, "847,43", 392, 1.5]
+    csv_row = ["A0", "00000001", "2023-01-01 00:00:00", "", "847,43", "392", "1.5"]
+    native = NativeRowConverter(infer_native_column_types([native_row]))(native_row)
+    from_csv = RowConverter(infer_column_types([csv_row]))(csv_row)
+    assert native == ["A0", "00000001", "01/01/2023", None, 847.43, 392, 1.5]
+    # Empty cells are None in the workbook and "" in the CSV file, the other values are the same
+    assert [value if value is not None else "" for value in native] == from_csv
+
+
+def test_native_row_converter_keeps_non_string_values():
+    convert = NativeRowConverter([ColumnType.DECIMAL, ColumnType.INTEGER, ColumnType.TEXT])
+    assert convert([2.5, "TOTAL", datetime(2024, 2, 29, 13, 0)]) == [2.5, "TOTAL", "29/02/2024"]
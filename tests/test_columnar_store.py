@@ -0,0 +1,174 @@
+"""
+Tests of the typed columnar intermediate: round trip of the rows through the memory mapped file, values that do
+not fit the kind of their column, missing values, group sizes and atomic writes.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx import columnar_store
+from common.xlsx.columnar_store import (
+    KIND_DATETIME,
+    KIND_EMPTY,
+    KIND_NUMBER,
+    KIND_STRING,
+    ColumnSlice,
+    ColumnStore,
+    ColumnStoreWriter,
+    write_columns,
+)
+from common.xlsx.part_balancer import group_sizes
+
+HEADER_ROWS = [["Report", date(2023, 12, 31)], ["Riga", "Data", "Importo", "N. doc.", None, "Ora"]]
+
+ROWS = [
+    ["00000001", datetime(2023, 1, 1), 392, "DOC1", None, time(10, 30)],
+    ["00000002", datetime(2023, 1, 2, 13, 5), 847.43, "DOC1", None, None],
+    ["00000003", None, None, "", None, timedelta(hours=1)],
+    ["00000004", datetime(2023, 2, 28), 3.0, "", None],
+    ["00000005", datetime(2023, 3, 1), -15, "DOC2"],
+    ["TOTAL", "", 1239.43],
+]
+
+
+def _write(path: str, rows, header_rows=HEADER_ROWS) -> ColumnStore:
+    with ColumnStoreWriter(path, len(header_rows)) as writer:
+        writer.write_rows(list(header_rows) + rows[:2])
+        writer.write_rows(rows[2:])
+    return ColumnStore(path)
+
+
+def _padded(rows, width: int):
+    return [list(row) + [None] * (width - len(row)) for row in rows]
+
+
+def test_mixed_kinds_round_trip(tmp_path):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+
+    assert store.row_count == len(ROWS)
+    assert store.header_rows == [HEADER_ROWS[0], HEADER_ROWS[1]]
+    assert [column.kind for column in store.columns] == [
+        KIND_STRING,
+        KIND_DATETIME,
+        KIND_NUMBER,
+        KIND_STRING,
+        KIND_EMPTY,
+        KIND_EMPTY,  # time and timedelta values are exceptions
+    ]
+    assert list(store.rows()) == _padded(ROWS, 6)
+
+
+def test_number_types_are_kept(tmp_path):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+    amounts = [row[2] for row in store.rows()]
+
+    assert amounts == [392, 847.43, None, 3.0, -15, 1239.43]
+    assert [type(amount) for amount in amounts] == [int, float, type(None), float, int, float]
+
+
+def test_values_not_fitting_their_column_are_exceptions(tmp_path):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+
+    # The footer text of the first column fits, the empty string of the date column does not
+    assert store.columns[1].exceptions == {5: ""}
+    assert store.columns[5].exceptions == {0: time(10, 30), 2: timedelta(hours=1)}
+    rows = [["TOTAL", True, "1"], [1.5, False, 2]]
+    store = _write(str(tmp_path / "other.cols"), rows, header_rows=[])
+    # Booleans are never numbers
+    assert store.columns[0].exceptions == {1: 1.5}
+    assert store.columns[1].exceptions == {0: True, 1: False}
+    assert store.columns[2].exceptions == {1: 2}
+    assert list(store.rows()) == rows
+
+
+def test_missing_values(tmp_path):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+    dates, amounts = store.columns[1], store.columns[2]
+
+    assert np.isnan(amounts.arrays["values"][2])
+    assert not amounts.arrays["ints"][2]
+    assert np.isnat(dates.arrays["values"][2].view("datetime64[us]"))
+    # The missing values of a string column have the code -1, an empty string has a code of its own
+    rows = [["a"], [None], [""], ["a"]]
+    store = _write(str(tmp_path / "strings.cols"), rows, header_rows=[])
+    assert store.columns[0].arrays["codes"].tolist() == [0, -1, 1, 0]
+    assert store.columns[0].dictionary == ["a", ""]
+    assert list(store.rows()) == rows
+
+
+def test_missing_values_before_the_first_value_of_a_column(tmp_path):
+    rows = [["a"], ["b"], ["c", 1]]
+    store = _write(str(tmp_path / "table.cols"), rows, header_rows=[])
+
+    assert store.columns[1].kind == KIND_NUMBER
+    assert list(store.rows()) == [["a", None], ["b", None], ["c", 1]]
+
+
+def test_integers_beyond_float_precision_are_exact(tmp_path):
+    large = 2**53 + 1
+    rows = [[2**53], [large], [-large], [7]]
+    store = _write(str(tmp_path / "table.cols"), rows, header_rows=[])
+
+    assert store.columns[0].kind == KIND_NUMBER
+    assert store.columns[0].exceptions == {1: large, 2: -large}
+    assert list(store.rows()) == rows
+    assert all(type(row[0]) is int for row in store.rows())
+
+
+def test_rows_by_chunks_and_slices(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar_store, "_READ_CHUNK_ROWS", 4)
+    rows = [[f"K{index // 3}", index, index * 0.5] for index in range(23)]
+    path = str(tmp_path / "table.cols")
+    store = _write(path, rows, header_rows=[])
+
+    assert list(store.rows()) == rows
+    assert list(store.rows(5, 18)) == rows[5:18]
+    assert list(store.rows(20, 100)) == rows[20:]
+    assert list(ColumnSlice(path, 3, 11)) == rows[3:11]
+
+
+@pytest.mark.parametrize("column", range(6))
+def test_group_sizes_match_the_part_balancer(tmp_path, column):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+
+    for first_row in range(len(ROWS) + 1):
+        keys = [row[column] for row in store.rows(first_row)]
+        assert list(store.group_sizes(column, first_row)) == list(group_sizes(keys))
+
+
+def test_group_sizes_of_a_missing_column(tmp_path):
+    store = _write(str(tmp_path / "table.cols"), ROWS)
+    assert list(store.group_sizes(10)) == [1] * len(ROWS)
+
+
+def test_write_replaces_the_file_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / "table.cols")
+    store = _write(path, ROWS)
+    with open(path, "rb") as f:
+        previous = f.read()
+
+    def interrupted_write(values):
+        raise KeyboardInterrupt
+
+    # The write is interrupted after the metadata, while writing the arrays
+    monkeypatch.setattr(columnar_store.np, "ascontiguousarray", interrupted_write)
+    with pytest.raises(KeyboardInterrupt):
+        write_columns(path, store.header_rows, store.row_count, store.columns)
+    monkeypatch.undo()
+
+    with open(path, "rb") as f:
+        assert f.read() == previous
+    assert not os.path.exists(path + ".tmp")
+    assert list(ColumnStore(path).rows()) == _padded(ROWS, 6)
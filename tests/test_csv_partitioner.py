@@ -0,0 +1,208 @@
+"""
+Tests of the partitioning of the data rows of a CSV file by the value of a column.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import csv
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import PatternFill
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.csv_partitioner import (
+    DEFAULT_PARTITION,
+    Partition,
+    load_partitions,
+    partition_csv,
+    partition_csv_path,
+)
+from common.xlsx.large_xlsx_splitter_utils import (
+    OUTPUT_ENGINE_WORKBOOK,
+    OUTPUT_ENGINE_WRITE_ONLY,
+    split_csv_to_excel,
+)
+
+HEADER_LINES = 2
+
+
+def _write_csv(path: str, rows) -> None:
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(rows)
+
+
+def _read_csv(path: str):
+    with open(path, mode="r", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f, delimiter=";"))
+
+
+def _data_row(n_riga: int, n_doc: str):
+    # 'N. doc.' is the column 11, as in the input workbooks
+    return [f"A{n_riga}", str(n_riga)] + [""] * 9 + [n_doc]
+
+
+@pytest.fixture
+def source_csv(tmp_path):
+    path = str(tmp_path / "source.csv")
+    header = [["H1"], ["H2"]]
+    data = [
+        _data_row(1, "CA2023"),
+        _data_row(2, "DOC00001"),
+        _data_row(3, "CB2023-7"),
+        _data_row(4, "CA2023"),
+        _data_row(5, "DOC00002"),
+    ]
+    _write_csv(path, header + data + [["TOTAL"]])
+    return path
+
+
+def test_load_partitions():
+    partitions = load_partitions(
+        [
+            {"name": "CA2023", "column": 11, "values": ["CA2023"], "num_target_file": 2},
+            {"name": "CB", "column": 11, "pattern": "CB[0-9]+-[0-9]+"},
+        ]
+    )
+    assert [partition.name for partition in partitions] == ["CA2023", "CB"]
+    assert partitions[0].values == frozenset({"CA2023"})
+    assert partitions[0].num_target_file == 2
+    assert partitions[1].num_target_file == 1
+    assert load_partitions(None) == []
+    assert load_partitions([]) == []
+
+
+@pytest.mark.parametrize(
+    "partition_configs",
+    [
+        [{"column": 11, "values": ["CA2023"]}],
+        [{"name": "CA2023", "values": ["CA2023"]}],
+        [{"name": "CA2023", "column": 11}],
+        [{"name": DEFAULT_PARTITION, "column": 11, "values": ["CA2023"]}],
+        [
+            {"name": "CA2023", "column": 11, "values": ["CA2023"]},
+            {"name": "CA2023", "column": 11, "values": ["CA2024"]},
+        ],
+    ],
+)
+def test_load_partitions_rejects_invalid_entries(partition_configs):
+    with pytest.raises(ValueError):
+        load_partitions(partition_configs)
+
+
+def test_partition_matches_values_and_whole_pattern():
+    partition = Partition(name="P", column=1, values={"x"}, pattern="C[0-9]+")
+    assert partition.matches(["", "x"])
+    assert partition.matches(["", "C12"])
+    assert not partition.matches(["", "C12b"])  # The pattern must match the whole value
+    assert not partition.matches(["", "y"])
+    assert not partition.matches(["x"])  # Short row: the column is missing
+
+
+def test_partition_csv_routes_every_row_once(source_csv):
+    partitions = load_partitions(
+        [
+            {"name": "CA2023", "column": 11, "values": ["CA2023"]},
+            # Also matches CA2023: the first matching partition takes the row
+            {"name": "C", "column": 11, "pattern": "C[AB]2023.*"},
+        ]
+    )
+    paths = partition_csv(source_csv, partitions, header_lines=HEADER_LINES)
+
+    assert paths == {
+        name: partition_csv_path(source_csv, name) for name in (DEFAULT_PARTITION, "CA2023", "C")
+    }
+    rows = {name: _read_csv(path) for name, path in paths.items()}
+    for name in paths:
+        assert rows[name][:HEADER_LINES] == [["H1"], ["H2"]]
+    assert [row[1] for row in rows["CA2023"][HEADER_LINES:]] == ["1", "4"]
+    assert [row[1] for row in rows["C"][HEADER_LINES:]] == ["3"]
+    # The rows of no partition keep their order, and the footer of the table stays in the main partition
+    assert rows[DEFAULT_PARTITION][HEADER_LINES:] == [
+        _data_row(2, "DOC00001"),
+        _data_row(5, "DOC00002"),
+        ["TOTAL"],
+    ]
+
+
+def test_partition_footer_is_never_routed_to_a_partition(tmp_path):
+    # The footer row has the value of a partition in the tested column
+    path = str(tmp_path / "source.csv")
+    _write_csv(path, [["H1"], ["H2"], _data_row(1, "CA2023"), _data_row(2, "CA2023")])
+    partitions = load_partitions([{"name": "CA2023", "column": 11, "values": ["CA2023"]}])
+    paths = partition_csv(path, partitions, header_lines=HEADER_LINES)
+
+    assert [row[1] for row in _read_csv(paths["CA2023"])[HEADER_LINES:]] == ["1"]
+    assert [row[1] for row in _read_csv(paths[DEFAULT_PARTITION])[HEADER_LINES:]] == ["2"]
+
+
+def test_partition_csv_without_data_rows(tmp_path):
+    path = str(tmp_path / "source.csv")
+    _write_csv(path, [["H1"], ["H2"]])
+    partitions = load_partitions([{"name": "CA2023", "column": 11, "values": ["CA2023"]}])
+    paths = partition_csv(path, partitions, header_lines=HEADER_LINES)
+
+    for partition_path in paths.values():
+        assert _read_csv(partition_path) == [["H1"], ["H2"]]
+
+
+def test_partition_csv_writes_a_row_index(source_csv):
+    partitions = load_partitions([{"name": "CA2023", "column": 11, "values": ["CA2023"]}])
+    paths = partition_csv(source_csv, partitions, header_lines=HEADER_LINES)
+
+    for partition_path in paths.values():
+        assert any(
+            file_name.startswith(os.path.basename(partition_path) + ".rows")
+            for file_name in os.listdir(os.path.dirname(partition_path))
+        )
+
+
+# Model row of the footer format (see model_template.load_model_template())
+MODEL_LAST_ROW = 45
+FOOTER_COLOR = "00FFFF00"
+
+
+def _write_model(path: str) -> None:
+    """Model with the header lines, the odd and even data rows (3, 4) and a yellow footer row."""
+    wb = Workbook()
+    sheet = wb.active
+    for row_index, color in ((3, "00FFFFFF"), (4, "00EEEEFF"), (MODEL_LAST_ROW, FOOTER_COLOR)):
+        for col_index in range(1, 13):
+            sheet.cell(row=row_index, column=col_index).fill = PatternFill("solid", fgColor=color)
+    sheet.cell(row=1, column=1, value="H1")
+    wb.save(path)
+
+
+@pytest.mark.parametrize("engine", [OUTPUT_ENGINE_WORKBOOK, OUTPUT_ENGINE_WRITE_ONLY])
+def test_only_the_main_partition_gets_the_footer_format(tmp_path, source_csv, engine):
+    model_path = str(tmp_path / "model.xlsx")
+    _write_model(model_path)
+    partitions = load_partitions([{"name": "CA2023", "column": 11, "values": ["CA2023"]}])
+    paths = partition_csv(source_csv, partitions, header_lines=HEADER_LINES)
+
+    for name, footer_row in ((DEFAULT_PARTITION, True), ("CA2023", False)):
+        output_folder = tmp_path / name
+        output_folder.mkdir()
+        split_csv_to_excel(
+            model_xlsx_path=model_path,
+            source_csv_file=paths[name],
+            output_folder=str(output_folder),
+            product_name=name,
+            N=1,
+            table_start_row=HEADER_LINES + 1,
+            header_rows=HEADER_LINES,
+            row_ref_odd=3,
+            row_ref_even=4,
+            engine=engine,
+            footer_row=footer_row,
+        )
+        sheet = load_workbook(str(output_folder / f"{name}_1.xlsx")).active
+        last_color = sheet.cell(row=sheet.max_row, column=1).fill.fgColor.rgb
+        assert (last_color == FOOTER_COLOR) == footer_row
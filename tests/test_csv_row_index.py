@@ -0,0 +1,141 @@
+"""
+Tests of the row index of the CSV files: round trip of the row offsets through the sidecar file, with quoted
+values spanning several lines, and rejection of the index once its CSV file changed.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import csv
+import io
+import os
+import sys
+
+import pytest
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.csv_row_index import (
+    IndexedCsvWriter,
+    load_row_index,
+    row_index_path,
+)
+from common.xlsx.part_balancer import group_sizes
+
+HEADER_ROWS = 2
+GROUP_COLUMN = 2
+
+ROWS = [
+    ["H1"],
+    ["Riga", "Descrizione", "N. doc."],
+    ["1", "plain", "DOC1"],
+    ["2", "two\nlines", "DOC1"],
+    ["3", 'quoted "value"; with delimiter', "DOC2"],
+    ["4", "three\r\nlines\n", ""],
+    ["5", "città", ""],
+    ["6", "", "DOC3"],
+    ["7", "\n", "DOC3"],
+    ["TOTAL"],
+]
+
+
+def _read_csv(path: str):
+    with open(path, mode="r", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f, delimiter=";"))
+
+
+@pytest.fixture
+def indexed_csv(tmp_path):
+    path = str(tmp_path / "table.csv")
+    with IndexedCsvWriter(path, GROUP_COLUMN, header_rows=HEADER_ROWS) as writer:
+        # Rows written in blocks, both as values and as rendered text
+        writer.write_rows(ROWS[:3])
+        text = io.StringIO()
+        csv.writer(text, delimiter=";", lineterminator="\n").writerows(ROWS[3:6])
+        writer.write_text(text.getvalue())
+        writer.write_rows(ROWS[6:])
+    return path
+
+
+def test_rows_round_trip(indexed_csv):
+    row_index = load_row_index(indexed_csv)
+
+    assert row_index is not None
+    assert row_index.row_count == len(ROWS) == len(_read_csv(indexed_csv))
+    assert row_index.header_rows == HEADER_ROWS
+    assert row_index.group_column == GROUP_COLUMN
+    for row_number, row in enumerate(ROWS):
+        assert list(row_index.rows(row_number, row_number + 1)) == [row]
+    assert list(row_index.rows(HEADER_ROWS, len(ROWS) - 1)) == ROWS[HEADER_ROWS:-1]
+    assert list(row_index.rows(0, len(ROWS))) == ROWS
+
+
+def test_byte_ranges(indexed_csv):
+    row_index = load_row_index(indexed_csv)
+    with open(indexed_csv, "rb") as f:
+        data = f.read()
+
+    start, end = row_index.byte_range(3, 6)
+    assert list(csv.reader(data[start:end].decode("utf-8").splitlines(keepends=True), delimiter=";")) == ROWS[3:6]
+    # Ranges are clipped to the rows of the file
+    assert row_index.byte_range(-5, 2) == row_index.byte_range(0, 2)
+    assert row_index.byte_range(8, 100) == (row_index.byte_range(8, 9)[0], len(data))
+    assert row_index.byte_range(6, 3) == (row_index.byte_range(6, 7)[0],) * 2
+
+
+def test_footer_offset(indexed_csv):
+    row_index = load_row_index(indexed_csv)
+    with open(indexed_csv, "rb") as f:
+        f.seek(row_index.footer_offset)
+        assert f.read() == b"TOTAL\n"
+
+
+def test_group_sizes_match_the_part_balancer(indexed_csv):
+    row_index = load_row_index(indexed_csv)
+    keys = [row[GROUP_COLUMN] if GROUP_COLUMN < len(row) else None for row in ROWS]
+
+    for first_row in range(len(ROWS) + 1):
+        assert list(row_index.group_sizes(first_row)) == list(group_sizes(keys[first_row:]))
+
+
+def test_index_is_rejected_after_the_csv_changes(indexed_csv):
+    with open(indexed_csv, "a", encoding="utf-8", newline="") as f:
+        f.write("8;extra;DOC4\n")
+    assert load_row_index(indexed_csv) is None
+
+
+def test_index_is_rejected_after_the_csv_mtime_changes(indexed_csv):
+    stat = os.stat(indexed_csv)
+    os.utime(indexed_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_row_index(indexed_csv) is None
+
+
+def test_missing_or_truncated_index_is_ignored(indexed_csv):
+    index_path = row_index_path(indexed_csv)
+    with open(index_path, "rb") as f:
+        data = f.read()
+    with open(index_path, "wb") as f:
+        f.write(data[:-8])
+    assert load_row_index(indexed_csv) is None
+
+    os.remove(index_path)
+    assert load_row_index(indexed_csv) is None
+
+
+def test_no_index_is_written_when_the_writing_fails(tmp_path):
+    path = str(tmp_path / "table.csv")
+    with pytest.raises(RuntimeError):
+        with IndexedCsvWriter(path, GROUP_COLUMN) as writer:
+            writer.write_rows(ROWS[:3])
+            raise RuntimeError("interrupted")
+    assert not os.path.exists(row_index_path(path))
+
+
+def test_unknown_header_rows(tmp_path):
+    path = str(tmp_path / "table.csv")
+    with IndexedCsvWriter(path, GROUP_COLUMN) as writer:
+        writer.write_rows(ROWS)
+    assert load_row_index(path).header_rows is None
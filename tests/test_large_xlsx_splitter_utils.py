@@ -0,0 +1,128 @@
+"""
+Tests of the split of the data rows into the output workbooks.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import csv
+import os
+import re
+import sys
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import PatternFill
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.large_xlsx_splitter_utils import (
+    OUTPUT_ENGINE_WORKBOOK,
+    OUTPUT_ENGINE_WRITE_ONLY,
+    SPLIT_STRATEGY_GROUPS,
+    split_csv_to_excel,
+    split_xlsx_to_excel,
+)
+
+HEADER_ROWS = 12
+DATA_ROWS = 30
+# Model row of the footer format (see model_template.load_model_template())
+MODEL_LAST_ROW = 45
+FOOTER_COLOR = "00FFFF00"
+
+
+def _write_model(path: str) -> None:
+    """Model with the header rows and a yellow footer row."""
+    wb = Workbook()
+    sheet = wb.active
+    for row_index in range(1, HEADER_ROWS + 1):
+        sheet.cell(row=row_index, column=1, value=f"H{row_index}")
+    for col_index in range(1, 13):
+        sheet.cell(row=MODEL_LAST_ROW, column=col_index).fill = PatternFill("solid", fgColor=FOOTER_COLOR)
+    wb.save(path)
+
+
+def _write_csv(path: str, data_rows) -> None:
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerows([[f"H{row_index}"] for row_index in range(1, HEADER_ROWS + 1)])
+        writer.writerows(data_rows)
+
+
+def _footer_rows(sheet) -> list:
+    """Returns the indexes of the rows of a sheet with the footer format."""
+    return [
+        row[0].row
+        for row in sheet.iter_rows(min_row=1, max_row=sheet.max_row)
+        if row[0].fill.fgColor.rgb == FOOTER_COLOR
+    ]
+
+
+def _write_source(path: str, dimension) -> None:
+    """Source workbook with the header rows and DATA_ROWS data rows, declaring the given dimension (or none)."""
+    wb = Workbook()
+    sheet = wb.active
+    for row_index in range(1, HEADER_ROWS + 1):
+        sheet.cell(row=row_index, column=1, value=f"H{row_index}")
+    for index in range(DATA_ROWS):
+        sheet.append([f"A{index}", index, "x"])
+    wb.save(path + ".tmp")
+
+    replacement = f'<dimension ref="{dimension}"/>'.encode() if dimension else b""
+    with zipfile.ZipFile(path + ".tmp") as source, zipfile.ZipFile(path, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*" ?/>', replacement, data)
+            target.writestr(item, data)
+
+
+@pytest.mark.parametrize("dimension", ["A1:C42", "A1:C20", "A1:C99", None])
+def test_direct_split_does_not_trust_the_declared_dimension(tmp_path, dimension):
+    model_path = str(tmp_path / "model.xlsx")
+    source_path = str(tmp_path / "source.xlsx")
+    _write_model(model_path)
+    _write_source(source_path, dimension)
+
+    split_xlsx_to_excel(model_path, source_path, str(tmp_path), "P", N=3)
+
+    parts = [load_workbook(str(tmp_path / f"P_{index}.xlsx")).active for index in range(1, 4)]
+    data = [row[:2] for part in parts for row in part.iter_rows(min_row=HEADER_ROWS + 1, values_only=True)]
+    assert [part.max_row - HEADER_ROWS for part in parts] == [10, 10, 10]
+    assert data == [(f"A{index}", index) for index in range(DATA_ROWS)]
+
+
+@pytest.mark.parametrize("engine", [OUTPUT_ENGINE_WORKBOOK, OUTPUT_ENGINE_WRITE_ONLY])
+def test_groups_split_adds_the_footer_to_the_last_non_empty_part(tmp_path, engine):
+    model_path = str(tmp_path / "model.xlsx")
+    source_path = str(tmp_path / "source.csv")
+    _write_model(model_path)
+    # A single 'N. doc.' series, then the footer row: a single part has rows
+    _write_csv(source_path, [[f"A{index}"] + [""] * 10 + ["DOC1"] for index in range(313)] + [["TOTAL"]])
+
+    split_csv_to_excel(
+        model_path, source_path, str(tmp_path), "P", N=3, engine=engine, split_strategy=SPLIT_STRATEGY_GROUPS
+    )
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("P_")) == ["P_1.xlsx"]
+    sheet = load_workbook(str(tmp_path / "P_1.xlsx")).active
+    assert sheet.max_row == HEADER_ROWS + 314
+    assert sheet.cell(row=sheet.max_row, column=1).value == "TOTAL"
+    assert _footer_rows(sheet) == [sheet.max_row]
+
+
+@pytest.mark.parametrize("engine", [OUTPUT_ENGINE_WORKBOOK, OUTPUT_ENGINE_WRITE_ONLY])
+def test_split_without_data_rows_creates_a_single_part_without_footer(tmp_path, engine):
+    model_path = str(tmp_path / "model.xlsx")
+    source_path = str(tmp_path / "source.csv")
+    _write_model(model_path)
+    _write_csv(source_path, [])
+
+    split_csv_to_excel(model_path, source_path, str(tmp_path), "P", N=2, engine=engine)
+
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("P_")) == ["P_1.xlsx"]
+    assert _footer_rows(load_workbook(str(tmp_path / "P_1.xlsx")).active) == []
@@ -0,0 +1,50 @@
+"""
+Tests of the rate limit of the log records of hot paths.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import logging
+import os
+import sys
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities.logger import RATE_LIMITED, RateLimitFilter
+
+
+def _record(msg: str, *args, rate_limited: bool = True) -> logging.LogRecord:
+    record = logging.LogRecord("my_logger", logging.INFO, __file__, 0, msg, args, None)
+    if rate_limited:
+        record.__dict__.update(RATE_LIMITED)
+    return record
+
+
+def test_records_without_the_rate_limited_extra_are_never_dropped():
+    rate_limit = RateLimitFilter(interval=60.0)
+    assert all(rate_limit.filter(_record("Part %s written", index, rate_limited=False)) for index in range(5))
+
+
+def test_rate_limited_records_are_dropped_per_message_template():
+    rate_limit = RateLimitFilter(interval=60.0)
+    assert rate_limit.filter(_record("Row %d", 1))
+    assert not rate_limit.filter(_record("Row %d", 2))
+    assert not rate_limit.filter(_record("Row %d", 3))
+    # Another template has its own interval
+    assert rate_limit.filter(_record("Cell %d", 1))
+
+
+def test_next_record_let_through_reports_the_dropped_records():
+    rate_limit = RateLimitFilter(interval=60.0)
+    rate_limit.filter(_record("Row %d", 1))
+    rate_limit.filter(_record("Row %d", 2))
+    rate_limit.filter(_record("Row %d", 3))
+
+    rate_limit.interval = 0.0  # The interval has elapsed
+    record = _record("Row %d", 4)
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Row 4 (2 similar messages dropped)"
@@ -0,0 +1,135 @@
+"""
+Tests of the sizes of the output parts: even parts, groups balanced between a fixed number of parts, and parts
+rolling over at a maximum number of rows or bytes.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import os
+import random
+import sys
+from itertools import accumulate
+
+import pytest
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.part_balancer import (
+    RowStream,
+    balance_groups,
+    estimate_row_bytes,
+    even_part_sizes,
+    group_sizes,
+    max_imbalance,
+    take_part,
+)
+
+
+def _parts(rows, **limits):
+    stream = RowStream(rows)
+    parts = []
+    while not stream.exhausted:
+        parts.append(list(take_part(stream, **limits)))
+    return parts
+
+
+def test_even_part_sizes():
+    assert even_part_sizes(10, 3) == [4, 4, 2]
+    assert even_part_sizes(9, 3) == [3, 3, 3]
+    assert even_part_sizes(2, 3) == [1, 1, 0]
+    assert even_part_sizes(0, 2) == [0, 0]
+
+
+def test_group_sizes_counts_runs_of_equal_keys():
+    assert list(group_sizes(["a", "a", "b", "a", "c", "c", "c"])) == [2, 1, 1, 3]
+    assert list(group_sizes([])) == []
+
+
+def test_group_sizes_never_groups_empty_keys():
+    # Like a missing 'N. doc.' in process_csv, every empty key is a group of its own
+    assert list(group_sizes(["", "", None, None, "a", "a"])) == [1, 1, 1, 1, 2]
+
+
+def test_balance_groups_on_exact_boundaries():
+    assert balance_groups([2, 2, 2, 2], 2) == [4, 4]
+    assert balance_groups([1] * 9, 3) == [3, 3, 3]
+
+
+def test_balance_groups_cuts_on_the_closest_boundary():
+    # The target of the cut (4) is inside the first group: the closest boundary is after it
+    assert balance_groups([5, 1, 1, 1], 2) == [5, 3]
+    # The target (5) is closer to the boundary before the large group
+    assert balance_groups([4, 6], 2) == [4, 6]
+    assert balance_groups([1, 1, 1, 1, 6], 2) == [4, 6]
+
+
+def test_balance_groups_with_fewer_groups_than_parts():
+    assert balance_groups([3], 3) == [3, 0, 0]
+    assert balance_groups([], 2) == [0, 0]
+    assert balance_groups([2, 2], 1) == [4]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_balance_groups_never_divides_a_group(seed):
+    generator = random.Random(seed)
+    sizes = [generator.randint(1, 20) for _ in range(generator.randint(1, 200))]
+    N = generator.randint(1, 12)
+    part_sizes = balance_groups(sizes, N)
+
+    assert len(part_sizes) == N
+    assert sum(part_sizes) == sum(sizes)
+    boundaries = {0, *accumulate(sizes)}
+    assert all(cut in boundaries for cut in accumulate(part_sizes))
+
+
+def test_balance_groups_of_single_rows_is_even():
+    # Groups of one row can be cut anywhere: the parts differ by at most one row
+    for total_rows in range(1, 50):
+        for N in range(1, 8):
+            part_sizes = balance_groups([1] * total_rows, N)
+            assert max(part_sizes) - min(part_sizes) <= 1
+
+
+def test_max_imbalance():
+    assert max_imbalance([4, 4, 4]) == 0.0
+    assert max_imbalance([4, 4, 2]) == pytest.approx(0.4)
+    assert max_imbalance([0, 0]) == 0.0
+
+
+def test_take_part_rolls_over_at_max_rows():
+    rows = [[index] for index in range(5)]
+    assert _parts(rows, max_rows=2) == [[[0], [1]], [[2], [3]], [[4]]]
+
+
+def test_take_part_never_divides_a_group():
+    rows = [["a"], ["a"], ["a"], ["b"], [""], [""]]
+    # The first group takes the part over its limit, empty keys are groups of one row
+    assert _parts(rows, max_rows=2, group_column=0) == [
+        [["a"], ["a"], ["a"]],
+        [["b"], [""]],
+        [[""]],
+    ]
+
+
+def test_take_part_never_rolls_the_footer_over_alone():
+    rows = [[index] for index in range(5)]
+    assert _parts(rows, max_rows=2, footer_row=True) == [[[0], [1]], [[2], [3], [4]]]
+    assert _parts(rows[:4], max_rows=2, footer_row=True) == [[[0], [1]], [[2], [3]]]
+    assert _parts(rows[:1], max_rows=2, footer_row=True) == [[[0]]]
+
+
+def test_take_part_rolls_over_at_max_bytes():
+    rows = [["x" * 10]] * 4
+    row_bytes = estimate_row_bytes(rows[0])
+    assert [len(part) for part in _parts(rows, max_bytes=2 * row_bytes)] == [2, 2]
+    # A part always gets at least one row, even larger than the limit
+    assert [len(part) for part in _parts(rows, max_bytes=1)] == [1, 1, 1, 1]
+
+
+def test_take_part_without_limits_takes_every_row():
+    rows = [[index] for index in range(3)]
+    assert _parts(rows) == [rows]
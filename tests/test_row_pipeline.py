@@ -0,0 +1,185 @@
+"""
+Tests of the pipelined split: rows and parts in the same order as without the pipeline, bounded read-ahead,
+exceptions of the stage threads re-raised in the consumer, last part flags resolved lazily, and stage threads
+stopped when the consumer is closed or fails.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from contextlib import ExitStack, closing
+
+import pytest
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.part_balancer import RowStream, take_part
+from common.xlsx.row_pipeline import convert_parts, prefetch_rows
+
+STAGE_THREADS = ("split-reader", "split-converter")
+
+
+def _stage_threads():
+    return [thread for thread in threading.enumerate() if thread.name in STAGE_THREADS]
+
+
+def _counted(rows, pulled):
+    for row in rows:
+        pulled.append(row)
+        yield row
+
+
+def _failing(rows, error: BaseException):
+    yield from rows
+    raise error
+
+
+def _convert(row):
+    return [value * 10 for value in row]
+
+
+def _stream_parts(rows, max_rows: int):
+    """Parts cut from a row stream, whose last part flag is only known once the rows of the part are taken."""
+    stream = RowStream(rows)
+    index = 0
+    while not stream.exhausted:
+        index += 1
+        yield f"P_{index}.xlsx", take_part(stream, max_rows=max_rows), lambda: stream.exhausted
+
+
+def test_prefetch_rows_in_order():
+    rows = [[index] for index in range(25)]
+    with closing(prefetch_rows(iter(rows), depth=2, chunk_rows=4)) as prefetched:
+        assert list(prefetched) == rows
+    assert not _stage_threads()
+
+
+def test_prefetch_reads_at_most_depth_chunks_ahead():
+    pulled = []
+    with closing(prefetch_rows(_counted(([index] for index in itertools.count()), pulled), 2, 5)) as prefetched:
+        assert next(prefetched) == [0]
+        time.sleep(0.3)
+        # Two chunks in the queue, the chunk being consumed and the chunk waiting to be put
+        assert len(pulled) <= 4 * 5
+    assert not _stage_threads()
+
+
+def test_reader_exception_is_raised_in_the_consumer():
+    rows = [[index] for index in range(7)]
+    consumed = []
+    with pytest.raises(ValueError, match="corrupt row"):
+        with closing(prefetch_rows(_failing(rows, ValueError("corrupt row")), 2, 3)) as prefetched:
+            for row in prefetched:
+                consumed.append(row)
+    # The complete chunks read before the failure are delivered first
+    assert consumed == rows[:6]
+    assert not _stage_threads()
+
+
+def test_consumer_error_stops_the_reader():
+    pulled = []
+    with pytest.raises(RuntimeError):
+        with closing(prefetch_rows(_counted(([index] for index in itertools.count()), pulled), 2, 5)) as prefetched:
+            for row in prefetched:
+                if row == [12]:
+                    raise RuntimeError("writer failed")
+    count = len(pulled)
+    assert not _stage_threads()
+    time.sleep(0.2)
+    assert len(pulled) == count
+
+
+def test_convert_parts_match_the_serial_parts():
+    rows = [[index] for index in range(23)]
+    serial = [
+        (path, [_convert(row) for row in part_rows], is_last_part())
+        for path, part_rows, is_last_part in _stream_parts(iter(rows), 10)
+    ]
+
+    pipelined = []
+    with closing(convert_parts(_stream_parts(iter(rows), 10), _convert, depth=2, chunk_rows=3)) as parts:
+        for path, part_rows, is_last_part in parts:
+            pipelined.append((path, list(part_rows), is_last_part()))
+
+    assert pipelined == serial
+    assert [is_last for _, _, is_last in pipelined] == [False, False, True]
+    assert not _stage_threads()
+
+
+def test_is_last_part_is_resolved_after_the_rows_of_the_part():
+    calls = []
+
+    def parts():
+        for index, remaining in ((1, 2), (2, 0)):
+            taken = []
+
+            def part_rows(index=index, taken=taken):
+                for row in ([index, 0], [index, 1]):
+                    taken.append(row)
+                    yield row
+
+            def is_last_part(taken=taken, remaining=remaining):
+                calls.append(len(taken))
+                return remaining == 0
+
+            yield f"P_{index}.xlsx", part_rows(), is_last_part
+
+    with closing(convert_parts(parts(), _convert, depth=1, chunk_rows=1)) as converted:
+        flags = [is_last_part() for _, part_rows, is_last_part in converted if list(part_rows)]
+
+    assert flags == [False, True]
+    # The converter thread only asks once all the rows of the part were taken
+    assert calls == [2, 2]
+
+
+def test_rows_not_taken_by_the_writer_are_skipped():
+    rows = [[index] for index in range(9)]
+    with closing(convert_parts(_stream_parts(iter(rows), 3), _convert, depth=1, chunk_rows=2)) as parts:
+        taken = []
+        for path, part_rows, is_last_part in parts:
+            taken.append((path, next(part_rows)))
+
+    assert taken == [("P_1.xlsx", [0]), ("P_2.xlsx", [30]), ("P_3.xlsx", [60])]
+    assert not _stage_threads()
+
+
+def test_conversion_exception_is_raised_in_the_writer():
+    def convert(row):
+        if row == [5]:
+            raise TypeError("unsupported value")
+        return row
+
+    rows = [[index] for index in range(9)]
+    with pytest.raises(TypeError, match="unsupported value"):
+        with closing(convert_parts(_stream_parts(iter(rows), 4), convert, depth=2, chunk_rows=1)) as parts:
+            for path, part_rows, is_last_part in parts:
+                list(part_rows)
+    assert not _stage_threads()
+
+
+def test_writer_error_mid_part_stops_both_threads():
+    pulled = []
+    source = _counted(([index] for index in itertools.count()), pulled)
+
+    with pytest.raises(RuntimeError):
+        # Stacked like the split: the reader feeds the converter, and both stop before the source is closed
+        with ExitStack() as pipeline:
+            rows = pipeline.enter_context(closing(prefetch_rows(source, 2, 5)))
+            parts = pipeline.enter_context(closing(convert_parts(_stream_parts(rows, 50), _convert, 2, 5)))
+            for path, part_rows, is_last_part in parts:
+                for row in part_rows:
+                    if row == [720]:
+                        raise RuntimeError("disk full")
+
+    count = len(pulled)
+    assert not _stage_threads()
+    time.sleep(0.2)
+    assert len(pulled) == count
@@ -0,0 +1,159 @@
+"""
+Tests of the run manifest: stages and output files skipped when up to date, rebuilt when their inputs or
+parameters changed or when they were interrupted, and atomic saves of the manifest.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.utilities import run_manifest
+from common.utilities.run_manifest import MANIFEST_FILE_NAME, RunManifest
+
+STAGE = "split"
+PARAMS = {"N": 2, "engine": "workbook"}
+
+
+def _write(path: str, content: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def _touch(path: str) -> None:
+    """Moves the modification time of a file one second forward, without changing its content."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def run(tmp_path):
+    """A completed stage: one input file, two output files recorded in the manifest saved on disk."""
+    manifest_path = str(tmp_path / MANIFEST_FILE_NAME)
+    source = _write(str(tmp_path / "source.csv"), "a;b\n1;2\n")
+    outputs = [_write(str(tmp_path / f"P_{index}.xlsx"), f"part {index}") for index in (1, 2)]
+
+    manifest = RunManifest(manifest_path)
+    manifest.start_stage(STAGE, [source], PARAMS)
+    for output in outputs:
+        manifest.record_output(STAGE, output)
+    return manifest_path, source, outputs
+
+
+def test_up_to_date_stage_is_skipped(run):
+    manifest_path, source, outputs = run
+    manifest = RunManifest(manifest_path)
+
+    assert manifest.is_stage_current(STAGE, [source], PARAMS, outputs)
+    manifest.start_stage(STAGE, [source], PARAMS)
+    assert all(manifest.is_output_current(STAGE, output) for output in outputs)
+
+
+def test_changed_input_size_forces_a_rebuild(run):
+    manifest_path, source, outputs = run
+    _write(source, "a;b\n1;2\n3;4\n")
+    manifest = RunManifest(manifest_path)
+
+    assert not manifest.is_stage_current(STAGE, [source], PARAMS, outputs)
+    manifest.start_stage(STAGE, [source], PARAMS)
+    # The outputs recorded for the previous input are forgotten
+    assert not any(manifest.is_output_current(STAGE, output) for output in outputs)
+
+
+def test_changed_input_mtime_forces_a_rebuild(run):
+    manifest_path, source, outputs = run
+    _touch(source)
+
+    assert not RunManifest(manifest_path).is_stage_current(STAGE, [source], PARAMS, outputs)
+
+
+def test_content_hash_ignores_a_changed_mtime(run):
+    manifest_path, source, outputs = run
+    # The fingerprints of the inputs are recorded with their content hash
+    manifest = RunManifest(manifest_path, use_hash=True)
+    manifest.start_stage(STAGE, [source], {**PARAMS, "hashed": True})
+    for output in outputs:
+        manifest.record_output(STAGE, output)
+    _touch(source)
+
+    assert RunManifest(manifest_path, use_hash=True).is_stage_current(
+        STAGE, [source], {**PARAMS, "hashed": True}, outputs
+    )
+
+
+def test_changed_param_forces_a_rebuild(run):
+    manifest_path, source, outputs = run
+    manifest = RunManifest(manifest_path)
+    params = {**PARAMS, "N": 3}
+
+    assert not manifest.is_stage_current(STAGE, [source], params, outputs)
+    manifest.start_stage(STAGE, [source], params)
+    assert not any(manifest.is_output_current(STAGE, output) for output in outputs)
+
+
+def test_changed_output_is_rebuilt(run):
+    manifest_path, source, outputs = run
+    _write(outputs[1], "edited part 2")
+    manifest = RunManifest(manifest_path)
+    manifest.start_stage(STAGE, [source], PARAMS)
+
+    assert manifest.is_output_current(STAGE, outputs[0])
+    assert not manifest.is_output_current(STAGE, outputs[1])
+
+
+def test_interrupted_stage_rebuilds_the_outputs_not_recorded(tmp_path):
+    manifest_path = str(tmp_path / MANIFEST_FILE_NAME)
+    source = _write(str(tmp_path / "source.csv"), "a;b\n")
+    outputs = [_write(str(tmp_path / f"P_{index}.xlsx"), f"part {index}") for index in (1, 2)]
+    manifest = RunManifest(manifest_path)
+    manifest.start_stage(STAGE, [source], PARAMS)
+    manifest.record_output(STAGE, outputs[0])
+    # The run stops before recording the second output, which may be incomplete on disk
+
+    manifest = RunManifest(manifest_path)
+    manifest.start_stage(STAGE, [source], PARAMS)
+    assert manifest.is_output_current(STAGE, outputs[0])
+    assert not manifest.is_output_current(STAGE, outputs[1])
+    assert not manifest.is_stage_current(STAGE, [source], PARAMS, outputs)
+
+
+def test_reset_ignores_the_recorded_stages(run):
+    manifest_path, source, outputs = run
+    assert not RunManifest(manifest_path, reset=True).is_stage_current(STAGE, [source], PARAMS, outputs)
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    manifest_path = _write(str(tmp_path / MANIFEST_FILE_NAME), "{not json")
+    source = _write(str(tmp_path / "source.csv"), "a;b\n")
+
+    assert not RunManifest(manifest_path).is_stage_current(STAGE, [source], PARAMS, [])
+
+
+def test_save_replaces_the_manifest_atomically(run, monkeypatch):
+    manifest_path, source, outputs = run
+    assert not os.path.exists(manifest_path + ".tmp")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        saved = f.read()
+    assert set(json.loads(saved)["stages"][STAGE]["outputs"]) == set(outputs)
+
+    def interrupted_dump(obj, f, **kwargs):
+        f.write('{"stages": {')
+        raise KeyboardInterrupt
+
+    # A save interrupted while writing leaves the previous manifest untouched
+    manifest = RunManifest(manifest_path)
+    monkeypatch.setattr(run_manifest.json, "dump", interrupted_dump)
+    with pytest.raises(KeyboardInterrupt):
+        manifest.start_stage(STAGE, [source], {**PARAMS, "N": 3})
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        assert f.read() == saved
@@ -0,0 +1,190 @@
+"""
+Tests of the fast reader of the sheet values: the rows must be the ones of openpyxl's read-only
+iter_rows(values_only=True) on the same file.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import os
+import re
+import sys
+import zipfile
+from datetime import datetime, time
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.sheet_xml_reader import count_sheet_rows, iter_sheet_rows
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    f'<Relationships xmlns="{_PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK_RELS = (
+    f'<Relationships xmlns="{_PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+    f'<Relationship Id="rId3" Type="{_REL_NS}/sharedStrings" Target="sharedStrings.xml"/>'
+    "</Relationships>"
+)
+# Cell styles: 0 general, 1 date (built-in format 14), 2 duration (custom format), 3 date and time
+_STYLES = (
+    f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="[h]:mm:ss"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    "</styleSheet>"
+)
+_SHARED_STRINGS = (
+    f'<sst xmlns="{_MAIN_NS}" count="4" uniqueCount="4">'
+    "<si><t>shared</t></si>"
+    '<si><t xml:space="preserve">  spaced  </t></si>'
+    "<si><t>a &amp; b &lt;c&gt; &#8364; &#x20AC;</t></si>"
+    '<si><r><t>rich </t></r><r><rPr><b/></rPr><t xml:space="preserve">text</t></r></si>'
+    "</sst>"
+)
+
+# Rows of the sheet: shared strings, inline strings, entities, numbers, dates, booleans, errors and formulas,
+# with missing cells and missing rows
+_SHEET_ROWS = (
+    '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="C1" t="s"><v>2</v></c>'
+    '<c r="D1" t="s"><v>3</v></c></row>'
+    '<row r="2"><c r="A2" t="inlineStr"><is><t>inline</t></is></c>'
+    '<c r="B2" t="inlineStr"><is><t xml:space="preserve"> lead and trail </t></is></c>'
+    '<c r="C2" t="inlineStr"><is><t>x &amp;&#10;y &quot;q&quot; &apos;a&apos;</t></is></c>'
+    '<c r="E2" t="inlineStr"><is><r><t>in</t></r><r><rPr><i/></rPr><t>line</t></r></is></c></row>'
+    '<row r="4"><c r="A4"><v>42</v></c><c r="B4"><v>-2.5</v></c><c r="C4"><v>1E-3</v></c>'
+    '<c r="D4" t="b"><v>1</v></c><c r="E4" t="e"><v>#DIV/0!</v></c><c r="F4"/></row>'
+    '<row r="5"><c r="A5" s="1"><v>1</v></c><c r="B5" s="1"><v>45000</v></c><c r="C5" s="3"><v>45000.75</v></c>'
+    '<c r="D5" s="2"><v>1.5</v></c><c r="E5" t="d"><v>2023-12-31T10:20:30</v></c></row>'
+    '<row r="6"><c r="B6"><f>SUM(A4:B4)</f><v>39.5</v></c><c r="C6" t="str"><f>A2&amp;"!"</f><v>inline!</v></c>'
+    "</row>"
+)
+
+
+def _sheet_xml(dimension, rows: str = _SHEET_ROWS) -> str:
+    dimension_tag = f'<dimension ref="{dimension}"/>' if dimension else ""
+    return f'<worksheet xmlns="{_MAIN_NS}">{dimension_tag}<sheetData>{rows}</sheetData></worksheet>'
+
+
+def _prefixed(sheet_xml: str) -> str:
+    """The same worksheet, with its elements in a prefixed namespace."""
+    return re.sub(r"<(/?)([a-zA-Z]+)([\s/>])", r"<\1x:\2\3", sheet_xml).replace("xmlns=", "xmlns:x=")
+
+
+def _write_workbook(path: str, sheet_xml: str, date1904: bool = False) -> str:
+    workbook = (
+        f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+        + ('<workbookPr date1904="1"/>' if date1904 else "")
+        + '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", workbook)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+        archive.writestr("xl/sharedStrings.xml", _SHARED_STRINGS)
+        archive.writestr("xl/worksheets/sheet1.xml", sheet_xml)
+    return path
+
+
+def _openpyxl_rows(path: str):
+    wb = load_workbook(path, read_only=True)
+    try:
+        # Without a dimension, openpyxl yields the missing rows as empty lists instead of tuples
+        return [tuple(row) for row in wb.active.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+@pytest.mark.parametrize("date1904", [False, True])
+@pytest.mark.parametrize("prefixed", [False, True])
+@pytest.mark.parametrize(
+    "dimension",
+    [
+        "A1:F6",  # Exact
+        "A1:H9",  # Larger than the data: rows and columns are padded
+        "A1:C4",  # Smaller than the data: rows and columns are cut
+        None,  # Missing: every row has its own width
+    ],
+)
+def test_rows_match_openpyxl(tmp_path, dimension, prefixed, date1904):
+    sheet_xml = _sheet_xml(dimension)
+    path = _write_workbook(str(tmp_path / "sheet.xlsx"), _prefixed(sheet_xml) if prefixed else sheet_xml, date1904)
+
+    assert list(iter_sheet_rows(path)) == _openpyxl_rows(path)
+
+
+def test_values_are_unescaped_and_converted(tmp_path):
+    path = _write_workbook(str(tmp_path / "sheet.xlsx"), _sheet_xml("A1:F6"))
+    rows = list(iter_sheet_rows(path))
+
+    assert rows[0][:4] == ("shared", "  spaced  ", "a & b <c> € €", "rich text")
+    assert rows[1][:5] == ("inline", " lead and trail ", "x &\ny \"q\" 'a'", None, "inline")
+    assert rows[2] == (None,) * 6  # Missing row
+    assert rows[3] == (42, -2.5, 0.001, True, "#DIV/0!", None)
+    assert rows[4][:2] == (datetime(1900, 1, 1), datetime(2023, 3, 15))
+    assert rows[5][1:3] == ("=SUM(A4:B4)", '=A2&"!"')
+
+
+def test_1904_dates(tmp_path):
+    path = _write_workbook(str(tmp_path / "sheet.xlsx"), _sheet_xml("A1:F6"), date1904=True)
+    rows = list(iter_sheet_rows(path))
+
+    assert rows[4][:3] == (datetime(1904, 1, 2), datetime(2027, 3, 16), datetime(2027, 3, 16, 18, 0))
+    assert rows[4][3] == _openpyxl_rows(path)[4][3]  # Durations do not depend on the calendar
+
+
+def test_workbook_written_by_openpyxl(tmp_path):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.append(["Header", None, "&<>\"'", "  spaces  "])
+    sheet.append([])
+    sheet.append([1, 2.25, datetime(2024, 2, 29, 13, 0), time(8, 30), True, "=A1", None, "x"])
+    sheet["C7"] = "last"
+    path = str(tmp_path / "sheet.xlsx")
+    wb.save(path)
+
+    assert list(iter_sheet_rows(path)) == _openpyxl_rows(path)
+
+
+@pytest.mark.parametrize("dimension", ["A1:F6", "A1:H9", "A1:C4", None])
+def test_count_sheet_rows_ignores_the_dimension(tmp_path, dimension):
+    path = _write_workbook(str(tmp_path / "sheet.xlsx"), _sheet_xml(dimension))
+    assert count_sheet_rows(path) == 6
+
+    empty = _write_workbook(str(tmp_path / "empty.xlsx"), _sheet_xml(dimension, rows=""))
+    assert count_sheet_rows(empty) == 0
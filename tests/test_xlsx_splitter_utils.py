@@ -0,0 +1,83 @@
+"""
+Tests of the legacy split of an Excel file: removal of the odd columns and header template read in read-only mode.
+
+### Usage:
+   ```bash
+   python -m pytest tests
+"""
+
+import os
+import re
+import sys
+import zipfile
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+# Add current working directory to system path for importing modules
+CWD = os.getcwd()
+sys.path.append(CWD)
+
+from common.xlsx.xlsx_splitter_utils import (
+    DEFAULT_COLUMN_WIDTH,
+    HEADER_ROWS,
+    load_header_template,
+    remove_odd_columns,
+)
+
+
+def _sheet(rows: int, cols: int):
+    sheet = Workbook().active
+    for row_index in range(1, rows + 1):
+        for col_index in range(1, cols + 1):
+            if (row_index + col_index) % 5:  # Some cells are missing
+                cell = sheet.cell(row=row_index, column=col_index, value=f"{row_index},{col_index}")
+                cell.font = Font(bold=col_index % 3 == 0)
+    return sheet
+
+
+def _cells(sheet):
+    return sorted(
+        (cell.row, cell.column, cell.value, cell.font.b)
+        for row in sheet.iter_rows()
+        for cell in row
+        if cell.value is not None
+    )
+
+
+@pytest.mark.parametrize("cols", [1, 2, 7, 14])
+def test_remove_odd_columns_matches_delete_cols(cols):
+    expected = _sheet(9, cols)
+    for col_index in reversed(range(1, cols + 1, 2)):
+        expected.delete_cols(col_index)
+    sheet = _sheet(9, cols)
+    remove_odd_columns(sheet)
+
+    assert _cells(sheet) == _cells(expected)
+    assert sheet.max_column == expected.max_column
+
+
+@pytest.mark.parametrize("with_dimension", [True, False])
+def test_load_header_template_column_widths(tmp_path, with_dimension):
+    wb = Workbook()
+    sheet = wb.active
+    for row_index in range(1, HEADER_ROWS + 1):
+        sheet.cell(row=row_index, column=1, value=f"H{row_index}")
+    sheet.cell(row=5, column=9, value="X")
+    path = str(tmp_path / "source.xlsx")
+    wb.save(path)
+    if not with_dimension:
+        # Rewrite the file without the <dimension> tag of the sheet
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(str(tmp_path / "nodim.xlsx"), "w") as target:
+            for item in source.infolist():
+                data = source.read(item)
+                if item.filename == "xl/worksheets/sheet1.xml":
+                    data = re.sub(rb'<dimension ref="[^"]*" ?/>', b"", data)
+                target.writestr(item, data)
+        path = str(tmp_path / "nodim.xlsx")
+
+    header = load_header_template(path)
+
+    assert header.column_widths == {letter: DEFAULT_COLUMN_WIDTH for letter in "ABCDEFGHI"}
+    assert [len(values) for values in header.values] == [9] * HEADER_ROWS